@@ -16,11 +16,13 @@ import asyncio
 import contextlib
 import glob
 import hashlib
+import inspect
 import json
 import logging
 import os
 import pathlib
 import random
+import re
 import shlex
 import shutil
 import signal
@@ -84,6 +86,13 @@ GLOBAL_LOGFILE: ContextVar[Optional[str]] = ContextVar('GLOBAL_LOGFILE', default
 NODE_CPUSETS: ContextVar[Optional[list[str]]] = ContextVar('NODE_CPUSETS')
 CS_CPUSET: ContextVar[Optional[str]] = ContextVar('CS_CPUSET')
 
+# Number of nodes in population and training clusters.
+CLUSTER_SIZE = 3
+# Memory (in GiB) given to each node by start_node(), and a rough estimate of
+# what a load generator needs on top of that.
+NODE_MEMORY_GB = 1
+CS_MEMORY_GB = 2
+
 def configure_cpusets():
     """
     Let's try to schedule Scylla nodes on separate cpusets, and the load generators on yet
@@ -102,6 +111,51 @@ def configure_cpusets():
     config_logger.info(f"Choosing cpusets for nodes: {NODE_CPUSETS.get()}")
     config_logger.info(f"Choosing cpuset for load generators: {CS_CPUSET.get()}")
 
+@dataclass
+class CpusetSlot:
+    node_cpusets: Optional[list[str]]
+    cs_cpuset: Optional[str]
+
+def population_slots() -> list[CpusetSlot]:
+    """
+    Splits the CPUs into disjoint slots, each with cpusets for the nodes of a cluster and
+    for its load generators, so that several datasets can be populated concurrently.
+    Like in configure_cpusets(), each node gets a core and its sibling (assumed to be
+    $cpu + num_cpus/2), so the nodes of every slot have as many shards as training nodes.
+    With too few CPUs (or memory) for more than one slot, returns the cpusets chosen by
+    configure_cpusets().
+    """
+    num_cpus = os.cpu_count()
+    half = num_cpus // 2
+    cores_per_slot = CLUSTER_SIZE + 3
+    memory_gb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**30
+    n = min(half // cores_per_slot, memory_gb // (CLUSTER_SIZE * NODE_MEMORY_GB + CS_MEMORY_GB))
+    if NODE_CPUSETS.get() is None or n <= 1:
+        return [CpusetSlot(NODE_CPUSETS.get(), CS_CPUSET.get())]
+    slots = []
+    for i in range(n):
+        first = i * cores_per_slot
+        # The last slot takes all remaining cores for its load generators.
+        last = half - 1 if i == n - 1 else first + cores_per_slot - 1
+        slots.append(CpusetSlot(
+            node_cpusets=[f"{c},{c+half}" for c in range(first, first + CLUSTER_SIZE)],
+            cs_cpuset=f"{first+CLUSTER_SIZE}-{last},{first+CLUSTER_SIZE+half}-{last+half}",
+        ))
+    config_logger.info(f"Choosing {n} slots of cpusets for concurrent population: {slots}")
+    return slots
+
+def node_shards(cpusets: Optional[list[str]]) -> list[int]:
+    """Returns the number of shards of each node started by start_cluster() with the given cpusets."""
+    if not cpusets:
+        return [2] * CLUSTER_SIZE
+    def cpuset_size(cpuset: str) -> int:
+        size = 0
+        for r in cpuset.split(","):
+            first, _, last = r.partition("-")
+            size += int(last or first) - int(first) + 1
+        return size
+    return [cpuset_size(c) for c in cpusets[:CLUSTER_SIZE]]
+
 ################################################################################
 # Child process utilities
 
@@ -532,7 +586,7 @@ async def with_cluster(executable: PathLike, workdir: PathLike, cpusets: Optiona
     meta = cluster_metadata(workdir)
     cluster_name = meta["name"]
     subnet = meta["subnet"]
-    addrs = [f"{subnet}.{i}" for i in range(1,255)][:3]
+    addrs = [f"{subnet}.{i}" for i in range(1,255)][:CLUSTER_SIZE]
     cpusets = cpusets or NODE_CPUSETS.get()
     extra_opts = await get_bolt_opts(executable)
     training_logger.debug(f"BOLT opts for {executable} are {extra_opts}")
@@ -810,28 +864,109 @@ def executable_exists(executable: PathLike) -> bool:
     """Checks if the file exists and is executable"""
     return bool(shutil.which(executable))
 
+# Bump when helpers shared by all populators (cluster setup, cassandra-stress options, ...)
+# change in a way that affects the populated datasets.
+DATASET_VERSION = 1
+DATASET_MANIFEST = "dataset_manifest.json"
+
+def populator_version(dataset_name: str) -> str:
+    """Returns a hash of the populator's source and of the conf/ files it refers to."""
+    source = inspect.getsource(populators[dataset_name])
+    h = hashlib.sha256(f"{DATASET_VERSION}\n{source}".encode())
+    for conf in sorted(set(re.findall(r"conf/[\w.-]+", source))):
+        with open(conf, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+async def sstable_format(executable: PathLike) -> str:
+    """Returns the sstable format the executable writes by default, as reported by --help."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Run in a scratch directory, so that an instrumented executable doesn't leave profile files behind.
+        out = await query(["env", "LLVM_PROFILE_FILE=/dev/null", os.path.realpath(executable), "--help"], cwd=tmpdir)
+    m = re.search(rb"--sstable[-_]format arg \(=(\w+)\)", out)
+    return m.group(1).decode() if m else "unknown"
+
+def dataset_manifest(dataset_name: str, sstable_format: str) -> dict:
+    """Returns the manifest a dataset populated now would have.
+
+    A dataset can be reused as long as its manifest matches: it doesn't record the
+    executable itself, because the same datasets are used to train different builds
+    (PGO, CSPGO, BOLT) of the same sources.
+    """
+    return {
+        "populator_version": populator_version(dataset_name),
+        "cluster_layout": {"nodes": CLUSTER_SIZE, "shards": node_shards(NODE_CPUSETS.get())},
+        "sstable_format": hashlib.sha256(sstable_format.encode()).hexdigest(),
+    }
+
+def read_dataset_manifest(t_dir: PathLike) -> Optional[dict]:
+    try:
+        with open(f"{t_dir}/{DATASET_MANIFEST}") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+async def populate_dataset(executable: PathLike, dataset_name: str, dataset_dir: PathLike, manifest: dict) -> None:
+    """Populates a dataset from scratch and replaces the old one, if any."""
+    t = dataset_name
+    t_dir = fr"{dataset_dir}/{t}"
+    tmpdir = fr"{dataset_dir}/tmp-{t}"
+    training_logger.info(f"Populating dataset {t_dir} on cpusets {NODE_CPUSETS.get()}, {CS_CPUSET.get()}.")
+    await bash(fr"rm -rf {q(tmpdir)} && mkdir -p {q(tmpdir)}")
+    await populators[t](executable, tmpdir)
+    # If we have been using a profile-instrumented Scylla binary for populating,
+    # remove its leftover profile files in the cluster directory.
+    await bash(fr"find {q(tmpdir)} '(' -name '*.profraw' -o -name '*.fdata' ')' -delete")
+    with open(f"{tmpdir}/{DATASET_MANIFEST}", "w") as f:
+        json.dump(manifest, f, indent=2)
+    await bash(fr"rm -rf {q(t_dir)} && mv {q(tmpdir)}/ {q(t_dir)}")
+    training_logger.info(f"Dataset {t_dir} populated.")
+
 async def populate_datasets(executable: PathLike, dataset_names: list[str], dataset_dir: PathLike) -> None:
-    """Populates the given datasets if they don't already exist.
+    """Populates the given datasets if they don't already exist or are stale.
 
     A "dataset" is simply a copy of the entire cluster workdir -- it consists
     of multiple Scylla workdirs and a bit of metadata.
     After this function, there will be a $dataset_dir/$x cluster workdir for each dataset x.
     These cluster workdirs can be copied somewhere for training and restored with start_cluster().
+
+    Each dataset carries a manifest (see dataset_manifest()). A dataset whose manifest
+    doesn't match the current one -- because its populator or the conf files it uses
+    changed, the nodes have a different number of shards, or the executable writes a
+    different sstable format -- is populated again.
+
+    Datasets are populated concurrently, each on its own slot of disjoint cpusets
+    (see population_slots()).
     """
-    for t in dataset_names:
+    fmt = await sstable_format(executable)
+    stale = {}
+    for t in dict.fromkeys(dataset_names):
         t_dir = fr"{dataset_dir}/{t}"
+        manifest = dataset_manifest(t, fmt)
         if not os.path.exists(t_dir):
             training_logger.info(f"Dataset {t_dir} doesn't exist. Populating.")
-            tmpdir = fr"{dataset_dir}/tmp-{t}"
-            await bash(fr"rm -rf {q(tmpdir)} && mkdir -p {q(tmpdir)}")
-            await populators[t](executable, tmpdir)
-            # If we have been using a profile-instrumented Scylla binary for populating,
-            # remove its leftover profile files in the cluster directory.
-            await bash(fr"find {q(tmpdir)} '(' -name '*.profraw' -o -name '*.fdata' ')' -delete")
-            await bash(fr"mv {q(tmpdir)}/ {q(dataset_dir)}/{t}")
-            training_logger.info(f"Dataset {t_dir} populated.")
+        elif (old := read_dataset_manifest(t_dir)) != manifest:
+            changed = [k for k in manifest if not old or old.get(k) != manifest[k]]
+            training_logger.info(f"Dataset {t_dir} is stale (changed: {', '.join(changed)}). Populating again.")
         else:
-            training_logger.info(f"Dataset {t_dir} already exists. Not populating.")
+            training_logger.info(f"Dataset {t_dir} is up to date. Not populating.")
+            continue
+        stale[t] = manifest
+
+    slots: asyncio.Queue[CpusetSlot] = asyncio.Queue()
+    for slot in population_slots()[:len(stale)]:
+        slots.put_nowait(slot)
+
+    async def populate(t: str) -> None:
+        slot = await slots.get()
+        try:
+            # The cpusets are context variables, so this only affects this task.
+            async with with_context(NODE_CPUSETS, slot.node_cpusets), with_context(CS_CPUSET, slot.cs_cpuset):
+                await populate_dataset(executable, t, dataset_dir, stale[t])
+        finally:
+            slots.put_nowait(slot)
+
+    await clean_gather(*[populate(t) for t in stale])
 
 async def train_full(executable: PathLike, output_profile_file: PathLike, dataset_dir: PathLike) -> None:
     """Runs all known training workloads on the given executable, using
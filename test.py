@@ -41,6 +41,7 @@ import treelib
 from scripts import coverage
 from test import ALL_MODES, HOST_ID, TOP_SRC_DIR, path_to, TEST_DIR, TESTPY_PREPARED_ENVIRONMENT
 from test.pylib import coverage_utils
+from test.pylib.db.reader import has_test_history
 from test.pylib.suite.base import (
     SUITE_CONFIG_FILENAME,
     Test,
@@ -114,8 +115,11 @@ class ThreadsCalculator:
         )
         self.default_num_jobs_mem = max(1, int(available_mem // test_mem))
 
-    def get_number_of_threads(self, nr_cpus: int) -> int:
+    def get_number_of_threads(self, nr_cpus: int, admission_control: bool = False) -> int:
         default_num_jobs_cpu = max(1, math.ceil(nr_cpus / self.cpus_per_test_job))
+        if admission_control:
+            # Memory is accounted per test (and per pooled cluster) by the admission control.
+            return default_num_jobs_cpu
         return min(self.default_num_jobs_mem, default_num_jobs_cpu)
 
 
@@ -221,6 +225,15 @@ def parse_cmd_line() -> argparse.Namespace:
     parser.add_argument("--tmpdir", action="store", default=str(TOP_SRC_DIR / "testlog"),
                         help="Path to temporary test data and log files.  The data is further segregated per build mode.")
     parser.add_argument("--gather-metrics", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--schedule-by-history", action=argparse.BooleanOptionalAction, default=True,
+                        help="Use durations and memory peaks of the tests from the previous runs (stored in the metrics "
+                             "database in `tmpdir`) to start the longest tests first and to spread memory-heavy tests "
+                             "over the run.  Has no effect if there are no metrics from the previous runs")
+    parser.add_argument("--admission-control", action=argparse.BooleanOptionalAction, default=True,
+                        help="Start a test only when the memory and CPUs it is expected to use are available instead of "
+                             "limiting the number of jobs by memory (the number of jobs is derived from CPUs and the "
+                             "memory of pooled clusters is reserved while they live).  Expected resources are declared with the "
+                             "`resources` mark or learned from the metrics database")
     parser.add_argument("--max-failures", type=int, default=0,
                         help="Maximum number of failures to tolerate before cancelling rest of tests.")
     parser.add_argument('--mode', choices=ALL_MODES, action="append", dest="modes",
@@ -290,6 +303,22 @@ def parse_cmd_line() -> argparse.Namespace:
     parser.add_argument("--cluster-pool-size", action="store", default=None, type=int,
                         help="Set the pool_size for PythonTest and its descendants. Alternatively environment variable "
                              "CLUSTER_POOL_SIZE can be used to achieve the same")
+    parser.add_argument("--cluster-pool-spares", action="store", default=None, type=int,
+                        help="Number of clean clusters the cluster pool keeps booted in background (up to pool_size), "
+                             "so tests don't wait for a cluster to start.  Alternatively environment variable "
+                             "CLUSTER_POOL_SPARES can be used to achieve the same")
+    parser.add_argument("--cluster-template", action="store_true", default=False,
+                        help="Bootstrap the first cluster of a suite once, save its data as a template and clone new "
+                             "clusters from it instead of bootstrapping them from empty.  Alternatively environment "
+                             "variable CLUSTER_TEMPLATE=1 can be used to achieve the same")
+    parser.add_argument("--compress-artifacts", action="store_true", default=False,
+                        help="Compress the logs and data directories of Scylla servers kept after the run (e.g., of failed "
+                             "suites) with zstd in the background.  Alternatively environment variable COMPRESS_ARTIFACTS=1 "
+                             "can be used to achieve the same")
+    parser.add_argument("--coverage-map", action="store", default=None, type=str,
+                        help="Run every test case of C++ tests in `coverage` mode with its own raw profile and update the "
+                             "given per-test coverage map with them.  The map is used to select the tests affected by a "
+                             "change: ./test/pylib/coverage_utils.py test-impact select --coverage-map ...")
     parser.add_argument('--manual-execution', action='store_true', default=False,
                         help='Let me manually run the test executable at the moment this script would run it')
     parser.add_argument('--byte-limit', action="store", default=randint(0, 2000), type=int,
@@ -333,7 +362,7 @@ def parse_cmd_line() -> argparse.Namespace:
             nr_cpus = int(subprocess.check_output(
                 ['taskset', '-c', args.cpus, 'python3', '-c',
                  'import os; print(len(os.sched_getaffinity(0)))']))
-        args.jobs = ThreadsCalculator(args.modes).get_number_of_threads(nr_cpus)
+        args.jobs = ThreadsCalculator(args.modes).get_number_of_threads(nr_cpus, args.admission_control)
 
     if not args.coverage_modes and args.coverage:
         args.coverage_modes = list(args.modes)
@@ -400,8 +429,13 @@ def run_pytest(options: argparse.Namespace) -> tuple[int, list[SimpleNamespace]]
             f'--tmpdir={temp_dir}',
             f'--maxfail={options.max_failures}',
             f'--alluredir={report_dir / f"allure_{HOST_ID}"}',
-            f'--dist=worksteal',
         ])
+        if options.schedule_by_history and has_test_history(temp_dir):
+            # `load` scheduler hands tests over to the workers in the collection order as they become free,
+            # so tests sorted by the history plan are started longest first.
+            args.extend(['--schedule-by-history', '--dist=load'])
+        else:
+            args.append('--dist=worksteal')
     if options.verbose:
         args.append('-v')
     if options.quiet:
@@ -414,6 +448,8 @@ def run_pytest(options: argparse.Namespace) -> tuple[int, list[SimpleNamespace]]
         args.append(f'--random-seed={options.random_seed}')
     if options.gather_metrics:
         args.append('--gather-metrics')
+    if options.admission_control:
+        args.append('--admission-control')
     if options.timeout:
         args.append(f'--timeout={options.timeout}')
     if options.session_timeout:
@@ -424,6 +460,14 @@ def run_pytest(options: argparse.Namespace) -> tuple[int, list[SimpleNamespace]]
         args.append(f'-k={options.k}')
     if options.extra_scylla_cmdline_options:
         args.append(f'--extra-scylla-cmdline-options={options.extra_scylla_cmdline_options}')
+    if options.cluster_pool_spares is not None:
+        args.append(f'--cluster-pool-spares={options.cluster_pool_spares}')
+    if options.cluster_template:
+        args.append('--cluster-template')
+    if options.compress_artifacts:
+        args.append('--compress-artifacts')
+    if options.coverage_map:
+        args.append(f'--coverage-map={options.coverage_map}')
     if not options.save_log_on_success:
         args.append('--allure-no-capture')
     else:
@@ -629,6 +673,14 @@ async def main() -> int:
 
     if 'coverage' in options.modes:
         coverage.generate_coverage_report(path_to("coverage", "tests"))
+        if options.coverage_map:
+            # The report uses the profiles of test cases too, so they are removed only after it's generated.
+            await coverage_utils.update_coverage_map(
+                map_path=options.coverage_map,
+                profiles_path=path_to("coverage", "test"),
+                clear_on_success=True,
+                semaphore=asyncio.Semaphore(multiprocessing.cpu_count()),
+            )
 
     if options.coverage:
         await process_coverage(options)
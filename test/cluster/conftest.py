@@ -19,7 +19,7 @@ from multiprocessing import Event
 from pathlib import Path
 from typing import TYPE_CHECKING
 from test import TOP_SRC_DIR, path_to
-from test.pylib.runner import testpy_test_fixture_scope
+from test.pylib.runner import SERVERS_RESOURCES, testpy_test_fixture_scope
 from test.pylib.random_tables import RandomTables
 from test.pylib.util import unique_name
 from test.pylib.manager_client import ManagerClient
@@ -291,6 +291,9 @@ async def manager(request: pytest.FixtureRequest,
                 record_property("TEST_LOGS", full_url)
 
         cluster_status = await manager_client.after_test(test_case_name, not failed)
+        if cluster_status.get("resources"):
+            # Stored to the metrics database as usage of the test, see test/pylib/runner.py
+            request.node.stash[SERVERS_RESOURCES] = cluster_status["resources"]
     finally:
         await manager_client.stop()  # Stop client session and close driver after each test
 
@@ -9,6 +9,7 @@ import pytest
 from cassandra.protocol import InvalidRequest, ReadFailure                         # type: ignore
 from cassandra.query import SimpleStatement                                        # type: ignore
 from test.cluster.util import wait_for_token_ring_and_group0_consistency
+from test.pylib.random_tables import Column, FloatType, IntType, TextType, UUIDType
 
 pytestmark = pytest.mark.prepare_3_racks_cluster
 
@@ -123,3 +124,23 @@ async def test_paged_result(manager, random_tables):
     # Check all pages
     res = await cql.run_async(stmt, all_pages = True)
     assert len(res) == nrows
+
+
+@pytest.mark.asyncio
+async def test_bulk_inserted_rows(manager, random_tables):
+    """Rows inserted in bulk, with CQL or through SSTables, are the same as rows inserted one by one"""
+    cql = manager.cql
+    assert cql is not None
+    nrows = 100
+    tables = [await random_tables.add_table(columns=[Column("pk", IntType), Column("c_01", TextType),
+                                                     Column("v_01", FloatType), Column("v_02", UUIDType),
+                                                     Column("v_03", TextType)])
+              for _ in range(3)]
+    for _ in range(nrows):
+        await tables[0].insert_seq()
+    await tables[1].insert_seq_bulk(nrows, concurrency=8, batch_size=16)
+    await tables[2].load_seq_sstables(nrows)
+    rows = [sorted(tuple(row) for row in await cql.run_async(f"SELECT * FROM {table}")) for table in tables]
+    assert len(rows[0]) == nrows
+    assert rows[1] == rows[0]
+    assert rows[2] == rows[0]
@@ -9,23 +9,157 @@
 
 import argparse
 import json
-import matplotlib.pyplot as plt
+import math
+import pathlib
+import sys
 
 cmdline_parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-cmdline_parser.add_argument('results', nargs=1, help='JSON file with full perf_fast_forward results')
+cmdline_parser.add_argument('results', nargs='+',
+                            help='JSON file with full perf_fast_forward results, or a perf_fast_forward output directory;'
+                                 ' with --compare, the first one is the baseline')
 cmdline_parser.add_argument('-o', '--output', help='name of the output file')
+cmdline_parser.add_argument('--labels', help='comma-separated list of names of the results, defaults to their paths')
 cmdline_parser.add_argument('--histogram', action='store_true', help='plot a histogram of the frag/s results')
 cmdline_parser.add_argument('--histogram-bins-count', default=50, help='number of histogram bins')
 cmdline_parser.add_argument('--histogram-stats', default='frag/s', help='comma-separated list of result statistic to prepare histograms of')
+cmdline_parser.add_argument('--compare', action='store_true',
+                            help='compare the results with the first (baseline) ones: print a table of test cases sorted'
+                                 ' by speedup, worst first; exits with 1 if any regressed')
+cmdline_parser.add_argument('--compare-stat', default='frag/s',
+                            help='result statistic to compare; statistics ending in "/s" are better when higher, others when lower')
+cmdline_parser.add_argument('--regression-threshold', type=float, default=0.05,
+                            help='relative slowdown above which a test case is reported as a regression')
+cmdline_parser.add_argument('--significance', type=float, default=2,
+                            help='how many standard errors the slowdown has to exceed to be reported as a regression')
+cmdline_parser.add_argument('--top', type=int, help='print only this many worst test cases of each comparison')
+cmdline_parser.add_argument('--plot', action='store_true', help='plot the speedups of the compared test cases')
 
-args = cmdline_parser.parse_args()
 
-results = json.loads(open(args.results[0]).read())
+def test_name(results):
+    """Name of a test case: its test group and parameters."""
+    group = results['test_group_properties']['name']
+    parameters = results['results']['parameters']
+    # Parameters whose names contain a comma aggregate the other ones.
+    params = ' '.join(f'{k}={v}' if k else str(v) for k, v in parameters.items()
+                      if ',' not in k and k != 'test_run_count')
+    run = int(parameters.get('test_run_count', 1))
+    return f'{group}: {params}' + (f' #{run}' if run > 1 else '')
 
-if args.histogram:
-    histogram_stats = args.histogram_stats.split(',')
 
-    stats = results['results']['stats']
+def load_results(path):
+    """Load results of a file or all results in a perf_fast_forward output directory.
+
+    Returns {(dataset, test name): [per-iteration stats]}. Summary (.json)
+    results are used only for test cases without full (.all.json) results,
+    they hold a single iteration.
+    """
+    path = pathlib.Path(path)
+    files = sorted(path.rglob('*.json')) if path.is_dir() else [path]
+    ret = {}
+    summaries = {}
+    for f in files:
+        results = json.loads(f.read_text())
+        if results.get('test_group_properties', {}).get('name') == 'population':
+            continue
+        key = (results['test_group_properties']['dataset'], test_name(results))
+        stats = results['results']['stats']
+        if isinstance(stats, list):
+            ret[key] = stats
+        else:
+            summaries[key] = [stats]
+    for key, stats in summaries.items():
+        ret.setdefault(key, stats)
+    return ret
+
+
+def mean_and_stderr(values):
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, math.sqrt(variance / n)
+
+
+def compare(baseline, candidate, stat):
+    """Compare the stat of test cases present in both results.
+
+    Returns a list of (dataset, test, baseline mean, candidate mean, speedup,
+    standard error of the speedup), sorted by speedup, worst first. Speedup
+    is > 1 when the candidate is better. Its standard error is derived from
+    the per-iteration variance of both results (delta method).
+    """
+    higher_is_better = stat.endswith('/s')
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        b, b_err = mean_and_stderr([s[stat] for s in baseline[key]])
+        c, c_err = mean_and_stderr([s[stat] for s in candidate[key]])
+        if b == 0 or c == 0:
+            continue
+        speedup = c / b if higher_is_better else b / c
+        err = speedup * math.sqrt((b_err / b) ** 2 + (c_err / c) ** 2)
+        rows.append((key[0], key[1], b, c, speedup, err))
+    rows.sort(key=lambda r: r[4])
+    return rows
+
+
+def is_regression(row):
+    speedup, err = row[4], row[5]
+    return 1 - speedup > args.regression_threshold and 1 - speedup > args.significance * err
+
+
+def print_comparison(baseline_label, candidate_label, rows, missing):
+    print(f'{candidate_label} vs {baseline_label} ({args.compare_stat}):')
+    header = ('dataset', 'test', baseline_label, candidate_label, 'speedup', '')
+    lines = [(dataset, test, f'{b:.6g}', f'{c:.6g}', f'{speedup:.3f} ± {err:.3f}', 'REGRESSION' if is_regression(row) else '')
+             for row in rows[:args.top] for dataset, test, b, c, speedup, err in [row]]
+    widths = [max(len(line[i]) for line in lines + [header]) for i in range(len(header))]
+    for line in [header] + lines:
+        print('  '.join(v.ljust(w) for v, w in zip(line, widths)).rstrip())
+    regressions = sum(1 for row in rows if is_regression(row))
+    if rows:
+        geomean = math.exp(sum(math.log(row[4]) for row in rows) / len(rows))
+        print(f'{len(rows)} test cases, {regressions} regressions, geometric mean speedup {geomean:.3f}')
+    if missing:
+        print(f'{missing} test cases present in only one of the results were skipped')
+    print()
+    return regressions
+
+
+def plot_comparisons(comparisons):
+    import matplotlib.pyplot as plt
+
+    dpi = 96
+    width = 1200
+    height = max(400, sum(16 * len(rows) + 100 for _, rows in comparisons))
+    plt.figure(figsize=(width/dpi, height/dpi), dpi=dpi)
+    count = 0
+    for title, rows in comparisons:
+        count = count + 1
+        ax = plt.subplot(len(comparisons), 1, count)
+        labels = [f'{dataset} {test}' for dataset, test, *_ in rows]
+        speedups = [row[4] for row in rows]
+        colors = ['tab:red' if is_regression(row) else 'tab:green' if row[4] > 1 else 'tab:gray' for row in rows]
+        ax.barh(range(len(rows)), [s - 1 for s in speedups], left=1, xerr=[row[5] for row in rows], color=colors)
+        ax.set_yticks(range(len(rows)))
+        ax.set_yticklabels(labels, fontsize=6)
+        ax.invert_yaxis()
+        ax.axvline(1, color='black', linewidth=0.5)
+        ax.set_axisbelow(True)
+        plt.grid(True, axis='x')
+        plt.xlabel(f'{args.compare_stat} speedup')
+        plt.title(title)
+    plt.tight_layout()
+    if args.output:
+        plt.savefig(args.output)
+    else:
+        plt.show()
+
+
+def plot_histograms(results, labels):
+    import matplotlib.pyplot as plt
+
+    histogram_stats = args.histogram_stats.split(',')
 
     dpi = 96
     width = 1200
@@ -34,23 +168,55 @@ if args.histogram:
 
     count = 0
     for histogram_stat in histogram_stats:
-        values = [stat[histogram_stat] for stat in stats]
-
         count = count + 1
 
         ax = plt.subplot(len(histogram_stats), 1, count)
         if count == 1:
-            plt.title(args.results[0])
+            plt.title(', '.join(labels))
 
         ax.set_axisbelow(True)
         plt.grid(True)
         plt.ylabel('count')
         plt.xlabel(histogram_stat)
-        plt.hist(values, int(args.histogram_bins_count))
+        for stats, label in zip(results, labels):
+            values = [stat[histogram_stat] for stat in stats]
+            plt.hist(values, int(args.histogram_bins_count), alpha=0.5 if len(results) > 1 else 1, label=label)
+        if len(results) > 1:
+            plt.legend()
 
     if args.output:
         plt.savefig(args.output)
     else:
         plt.show()
+
+
+args = cmdline_parser.parse_args()
+
+labels = args.labels.split(',') if args.labels else args.results
+if len(labels) != len(args.results):
+    cmdline_parser.error('--labels must name every result')
+
+if args.compare:
+    if len(args.results) < 2:
+        cmdline_parser.error('--compare needs a baseline and at least one other result')
+    all_results = [load_results(r) for r in args.results]
+    baseline = all_results[0]
+    comparisons = []
+    regressions = 0
+    for candidate, label in zip(all_results[1:], labels[1:]):
+        rows = compare(baseline, candidate, args.compare_stat)
+        missing = len(baseline.keys() ^ candidate.keys())
+        regressions += print_comparison(labels[0], label, rows, missing)
+        comparisons.append((f'{label} vs {labels[0]}', rows[:args.top]))
+    if args.plot:
+        plot_comparisons(comparisons)
+    sys.exit(1 if regressions else 0)
+elif args.histogram:
+    results = []
+    for path in args.results:
+        if pathlib.Path(path).is_dir():
+            cmdline_parser.error(f'{path}: histograms need a results file, not a directory')
+        results.append(json.loads(open(path).read())['results']['stats'])
+    plot_histograms(results, labels)
 else:
     print('No action chosen. Doing nothing.')
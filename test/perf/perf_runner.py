@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""
+Run a configured subset of the test/perf benchmarks with fixed CPU pinning,
+store their JSON results in a local sqlite database and compare them against
+a stored baseline.
+
+Every benchmark is run --repeat times; each run contributes one sample per
+metric. Comparison uses a two-sided Mann-Whitney U test and a Hodges-Lehmann
+estimate (with a distribution-free confidence interval) of the relative
+change. A metric regresses when the change is significant and worse than
+--threshold. The exit status is 1 if any metric regressed.
+
+Examples:
+
+    # Record a baseline of the default benchmarks of a release build.
+    ./test/perf/perf_runner.py run --label baseline
+
+    # Run two benchmarks on cpus 2-3 and compare them against the baseline.
+    ./test/perf/perf_runner.py run -b simple_query_read -b mutation_readers --cpuset 2-3 --baseline baseline
+
+    # Compare two stored runs.
+    ./test/perf/perf_runner.py compare baseline 42
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+import argparse
+import datetime
+import json
+import logging
+import math
+import pathlib
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+logger = logging.getLogger("perf_runner")
+
+HIGHER_IS_BETTER = 1
+LOWER_IS_BETTER = -1
+
+# Result formats produced by the benchmarks:
+#  - "stats": perf::write_json_result() (perf-simple-query, perf_commitlog, ...),
+#    written to the file given by --json-result;
+#  - "perf_tests": seastar's perf_tests framework, written to the file given
+#    by --json-output.
+RESULT_FORMATS = {
+    "stats": "--json-result",
+    "perf_tests": "--json-output",
+}
+
+# Metrics worth comparing and which direction is an improvement. Other values
+# in the results (min/max/mad, run counts) describe a single run and are not
+# stored.
+METRIC_DIRECTIONS = {
+    "stats": {
+        "median tps": HIGHER_IS_BETTER,
+        "allocs_per_op": LOWER_IS_BETTER,
+        "logallocs_per_op": LOWER_IS_BETTER,
+        "tasks_per_op": LOWER_IS_BETTER,
+        "instructions_per_op": LOWER_IS_BETTER,
+        "cpu_cycles_per_op": LOWER_IS_BETTER,
+    },
+    "perf_tests": {
+        "median": LOWER_IS_BETTER,
+        "allocs": LOWER_IS_BETTER,
+        "tasks": LOWER_IS_BETTER,
+        "inst": LOWER_IS_BETTER,
+        "cycles": LOWER_IS_BETTER,
+    },
+}
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # "scylla" for tools linked into the scylla executable (the first of
+    # `args` is then the tool name), otherwise a path relative to the build
+    # directory of the mode.
+    binary: str
+    args: list[str] = field(default_factory=list)
+    format: str = "stats"
+
+    def command(self, build_dir: pathlib.Path) -> list[str]:
+        return [str(build_dir / self.binary)] + self.args
+
+
+BENCHMARKS = {b.name: b for b in [
+    Benchmark("simple_query_read", "scylla", ["perf-simple-query", "--duration", "5"]),
+    Benchmark("simple_query_write", "scylla", ["perf-simple-query", "--duration", "5", "--write"]),
+    Benchmark("simple_query_read_tablets", "scylla", ["perf-simple-query", "--duration", "5", "--tablets"]),
+    Benchmark("commitlog", "test/perf/perf_commitlog", ["--duration", "5"]),
+    Benchmark("mutation_readers", "test/perf/perf_mutation_readers", format="perf_tests"),
+    Benchmark("mutation_fragment", "test/perf/perf_mutation_fragment", format="perf_tests"),
+    Benchmark("checksum", "test/perf/perf_checksum", format="perf_tests"),
+    Benchmark("idl", "test/perf/perf_idl", format="perf_tests"),
+    Benchmark("vint", "test/perf/perf_vint", format="perf_tests"),
+    Benchmark("big_decimal", "test/perf/perf_big_decimal", format="perf_tests"),
+]}
+
+
+def load_benchmarks(config: Optional[pathlib.Path]) -> dict[str, Benchmark]:
+    """Return the built-in benchmarks, extended/overridden by a YAML config.
+
+    The config is a list of mappings with the fields of Benchmark, e.g.:
+
+        - name: simple_query_read_bypass_cache
+          binary: scylla
+          args: [perf-simple-query, --duration, 10, --bypass-cache]
+    """
+    benchmarks = dict(BENCHMARKS)
+    if config is None:
+        return benchmarks
+    import yaml
+    with open(config) as f:
+        entries = yaml.safe_load(f) or []
+    for entry in entries:
+        b = Benchmark(name=entry["name"], binary=entry["binary"],
+                      args=[str(a) for a in entry.get("args", [])],
+                      format=entry.get("format", "stats"))
+        if b.format not in RESULT_FORMATS:
+            raise ValueError(f"{config}: benchmark {b.name}: unknown result format {b.format!r}")
+        benchmarks[b.name] = b
+    return benchmarks
+
+
+################################################################################
+# Running benchmarks
+
+def parse_results(results: dict, format: str) -> dict[str, float]:
+    """Extract the comparable metrics of one benchmark run.
+
+    perf_tests results hold several test cases, their metrics are prefixed
+    with the test case name.
+    """
+    directions = METRIC_DIRECTIONS[format]
+    if format == "stats":
+        return {k: float(v) for k, v in results["stats"].items() if k in directions}
+    ret = {}
+    def walk(prefix: str, node: dict) -> None:
+        for name, value in node.items():
+            if not isinstance(value, dict):
+                continue
+            case = f"{prefix}.{name}" if prefix else name
+            if any(isinstance(v, dict) for v in value.values()):
+                walk(case, value)
+            else:
+                for k, v in value.items():
+                    if k in directions:
+                        ret[f"{case}: {k}"] = float(v)
+    walk("", results["results"])
+    return ret
+
+
+def metric_direction(format: str, metric: str) -> int:
+    return METRIC_DIRECTIONS[format][metric.rsplit(": ", 1)[-1]]
+
+
+def run_benchmark(benchmark: Benchmark, build_dir: pathlib.Path, cpuset: str, memory: Optional[str],
+                  log_dir: pathlib.Path, iteration: int, extra_args: list[str] = []) -> tuple[dict, dict[str, float]]:
+    """Run the benchmark once, pinned to `cpuset`.
+
+    Returns the raw JSON results and the extracted metrics. The output of the
+    benchmark goes to a log file in `log_dir`.
+    """
+    log_file = log_dir / f"{benchmark.name}.{iteration}.log"
+    with tempfile.TemporaryDirectory(prefix="perf_runner-") as tmp:
+        result_file = pathlib.Path(tmp) / "result.json"
+        # taskset keeps the non-reactor threads on the cpuset as well.
+        cmd = ["taskset", "-c", cpuset] + benchmark.command(build_dir) + [f"--cpuset={cpuset}"]
+        if memory:
+            cmd.append(f"--memory={memory}")
+        cmd += [RESULT_FORMATS[benchmark.format], str(result_file)] + extra_args
+        logger.debug("running %s", " ".join(cmd))
+        with open(log_file, "w") as log:
+            proc = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{benchmark.name} failed with exit code {proc.returncode}, see {log_file}")
+        with open(result_file) as f:
+            results = json.load(f)
+    return results, parse_results(results, benchmark.format)
+
+
+################################################################################
+# Results database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    created TEXT NOT NULL,
+    host TEXT,
+    version TEXT,
+    mode TEXT,
+    cpuset TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    benchmark TEXT NOT NULL,
+    format TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_by_run ON samples(run_id, benchmark, metric);
+"""
+
+
+class ResultsDB:
+    """sqlite database of benchmark runs, each run holding per-iteration samples."""
+
+    def __init__(self, path: pathlib.Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_run(self, label: str, mode: str, cpuset: str) -> int:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (label, created, host, mode, cpuset) VALUES (?, ?, ?, ?, ?)",
+                (label, datetime.datetime.now().isoformat(timespec="seconds"), socket.gethostname(), mode, cpuset))
+        return cur.lastrowid
+
+    def set_version(self, run_id: int, version: str) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE runs SET version = ? WHERE id = ?", (version, run_id))
+
+    def add_samples(self, run_id: int, benchmark: Benchmark, iteration: int, metrics: dict[str, float]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO samples (run_id, benchmark, format, metric, iteration, value) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, benchmark.name, benchmark.format, metric, iteration, value) for metric, value in metrics.items()])
+
+    def resolve(self, ref: str) -> int:
+        """Return the id of the run `ref`: a run id or the latest run with this label."""
+        row = None
+        if ref.isdigit():
+            row = self.conn.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+        if row is None:
+            row = self.conn.execute("SELECT id FROM runs WHERE label = ? ORDER BY id DESC LIMIT 1", (ref,)).fetchone()
+        if row is None:
+            raise KeyError(f"no run with id or label {ref!r}")
+        return row[0]
+
+    def runs(self) -> list[tuple]:
+        return self.conn.execute(
+            "SELECT r.id, r.label, r.created, r.host, r.version, r.mode, r.cpuset, group_concat(DISTINCT s.benchmark) "
+            "FROM runs r LEFT JOIN samples s ON s.run_id = r.id GROUP BY r.id ORDER BY r.id").fetchall()
+
+    def samples(self, run_id: int) -> dict[tuple[str, str], tuple[str, list[float]]]:
+        """Return {(benchmark, metric): (format, [values])} of the run."""
+        ret = {}
+        for benchmark, format, metric, value in self.conn.execute(
+                "SELECT benchmark, format, metric, value FROM samples WHERE run_id = ? ORDER BY iteration", (run_id,)):
+            ret.setdefault((benchmark, metric), (format, []))[1].append(value)
+        return ret
+
+
+################################################################################
+# Statistics
+
+def median(values: list[float]) -> float:
+    s = sorted(values)
+    n = len(s)
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2
+
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def _normal_ppf(p: float) -> float:
+    """Inverse of the standard normal CDF (bisection, plenty for confidence levels)."""
+    lo, hi = -10.0, 10.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if _normal_cdf(mid) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+# Up to this size of both samples (and without ties) the exact distribution
+# of U is used; it is cheap to compute and the normal approximation is poor
+# for the small number of repetitions benchmarks are usually run with.
+EXACT_MAX_SAMPLES = 25
+
+
+def _u_distribution(n: int, m: int) -> list[float]:
+    """Return the cumulative null distribution P(U <= u) for u = 0..n*m."""
+    # counts[j][u]: number of arrangements of i x-values and j y-values with
+    # U == u, built up row by row over i.
+    counts = [[1] + [0] * (n * m) for _ in range(m + 1)]
+    for i in range(1, n + 1):
+        new = [[0] * (n * m + 1) for _ in range(m + 1)]
+        new[0][0] = 1
+        for j in range(1, m + 1):
+            # The largest value is either an x (it exceeds all j y-values) or a y.
+            prev_x = counts[j]
+            prev_y = new[j - 1]
+            row = new[j]
+            for u in range(i * j + 1):
+                row[u] = (prev_x[u - j] if u >= j else 0) + prev_y[u]
+        counts = new
+    total = math.comb(n + m, n)
+    cdf = []
+    acc = 0
+    for c in counts[m]:
+        acc += c
+        cdf.append(acc / total)
+    return cdf
+
+
+def _ranks(values: list[float]) -> tuple[list[float], list[int]]:
+    """Return the average ranks of values and the sizes of groups of ties."""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def mann_whitney_u(x: list[float], y: list[float]) -> tuple[float, float]:
+    """Two-sided Mann-Whitney U test. Returns (U of x, p-value)."""
+    n, m = len(x), len(y)
+    ranks, ties = _ranks(list(x) + list(y))
+    u = sum(ranks[:n]) - n * (n + 1) / 2
+    if not ties and n <= EXACT_MAX_SAMPLES and m <= EXACT_MAX_SAMPLES:
+        cdf = _u_distribution(n, m)
+        tail = min(u, n * m - u)
+        return u, min(1.0, 2 * cdf[int(tail)])
+    mean = n * m / 2
+    tie_correction = sum(t ** 3 - t for t in ties) / ((n + m) * (n + m - 1))
+    sigma = math.sqrt(n * m / 12 * ((n + m + 1) - tie_correction))
+    if sigma == 0:
+        return u, 1.0
+    z = (abs(u - mean) - 0.5) / sigma
+    return u, min(1.0, 2 * (1 - _normal_cdf(max(z, 0))))
+
+
+def _ci_rank(n: int, m: int, confidence: float) -> int:
+    """Return k such that the k-th smallest and k-th largest pairwise
+    difference bound the confidence interval of the shift (0 if the samples
+    are too small to reach the confidence level)."""
+    alpha = 1 - confidence
+    if n <= EXACT_MAX_SAMPLES and m <= EXACT_MAX_SAMPLES:
+        cdf = _u_distribution(n, m)
+        k = 0
+        while k < len(cdf) and cdf[k] <= alpha / 2:
+            k += 1
+        return k
+    z = _normal_ppf(1 - alpha / 2)
+    return max(0, math.floor(n * m / 2 - z * math.sqrt(n * m * (n + m + 1) / 12)))
+
+
+@dataclass
+class Comparison:
+    benchmark: str
+    metric: str
+    direction: int
+    baseline: list[float]
+    candidate: list[float]
+    # Relative change of candidate vs baseline (0.05 is 5% larger) and its
+    # confidence interval.
+    change: float
+    change_low: float
+    change_high: float
+    p_value: float
+
+    def significant(self, alpha: float) -> bool:
+        return self.p_value < alpha
+
+    def regressed(self, alpha: float, threshold: float) -> bool:
+        return self.significant(alpha) and -self.direction * self.change > threshold
+
+    def improved(self, alpha: float, threshold: float) -> bool:
+        return self.significant(alpha) and self.direction * self.change > threshold
+
+
+def compare_samples(benchmark: str, metric: str, direction: int, baseline: list[float], candidate: list[float],
+                    confidence: float) -> Comparison:
+    """Compare two samples of a metric.
+
+    The relative change is the Hodges-Lehmann estimate of the ratio of the
+    candidate to the baseline (median of all pairwise ratios), with the
+    matching Mann-Whitney confidence interval. Non-positive values fall back
+    to pairwise differences, relative to the baseline median.
+    """
+    _, p = mann_whitney_u(candidate, baseline)
+    if min(baseline) > 0 and min(candidate) > 0:
+        pairs = sorted(c / b - 1 for c in candidate for b in baseline)
+    else:
+        scale = abs(median(baseline)) or 1.0
+        pairs = sorted((c - b) / scale for c in candidate for b in baseline)
+    k = _ci_rank(len(candidate), len(baseline), confidence)
+    low, high = (pairs[k - 1], pairs[-k]) if k > 0 else (-math.inf, math.inf)
+    return Comparison(benchmark, metric, direction, baseline, candidate, median(pairs), low, high, p)
+
+
+def compare_runs(db: ResultsDB, baseline_id: int, candidate_id: int, confidence: float) -> list[Comparison]:
+    baseline = db.samples(baseline_id)
+    candidate = db.samples(candidate_id)
+    ret = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        format, base_values = baseline[key]
+        _, cand_values = candidate[key]
+        ret.append(compare_samples(key[0], key[1], metric_direction(format, key[1]), base_values, cand_values, confidence))
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        logger.warning("%s %s: only present in the %s run, not compared", key[0], key[1],
+                       "baseline" if key in baseline else "candidate")
+    return ret
+
+
+def _fmt_pct(x: float) -> str:
+    return f"{x:+.2%}" if math.isfinite(x) else "inf"
+
+
+def report(comparisons: list[Comparison], alpha: float, threshold: float, verbose: bool) -> int:
+    """Print the comparison and return the number of regressed metrics."""
+    regressions = 0
+    rows = []
+    for c in comparisons:
+        if c.regressed(alpha, threshold):
+            verdict = "REGRESSION"
+            regressions += 1
+        elif c.improved(alpha, threshold):
+            verdict = "improvement"
+        elif verbose:
+            verdict = ""
+        else:
+            continue
+        rows.append((c.benchmark, c.metric, f"{median(c.baseline):.6g}", f"{median(c.candidate):.6g}",
+                     _fmt_pct(c.change), f"[{_fmt_pct(c.change_low)}, {_fmt_pct(c.change_high)}]",
+                     f"{c.p_value:.4f}", verdict))
+    header = ("benchmark", "metric", "baseline", "candidate", "change", "CI", "p", "")
+    widths = [max(len(r[i]) for r in rows + [header]) for i in range(len(header))]
+    for r in [header] + rows:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)).rstrip())
+    print(f"{len(comparisons)} metrics compared, {regressions} regressed")
+    return regressions
+
+
+################################################################################
+# Commands
+
+def git_head_label() -> str:
+    try:
+        return subprocess.check_output(["git", "describe", "--always", "--dirty"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_cmd(args: argparse.Namespace) -> int:
+    benchmarks = load_benchmarks(args.config)
+    names = args.benchmark or list(benchmarks)
+    unknown = [n for n in names if n not in benchmarks]
+    if unknown:
+        logger.error("unknown benchmarks: %s (known: %s)", ", ".join(unknown), ", ".join(benchmarks))
+        return 2
+    build_dir = args.build_dir / args.mode
+    log_dir = args.log_dir / args.mode / "perf"
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    db = ResultsDB(args.db)
+    baseline_id = db.resolve(args.baseline) if args.baseline else None
+    run_id = db.add_run(args.label or git_head_label(), args.mode, args.cpuset)
+    logger.info("run %d, logs in %s", run_id, log_dir)
+    extra_args = args.extra_args.split() if args.extra_args else []
+    version = None
+    for name in names:
+        benchmark = benchmarks[name]
+        for i in range(args.repeat):
+            logger.info("%s: iteration %d/%d", name, i + 1, args.repeat)
+            results, metrics = run_benchmark(benchmark, build_dir, args.cpuset, args.memory, log_dir, i, extra_args)
+            db.add_samples(run_id, benchmark, i, metrics)
+            if version is None:
+                version = results.get("versions", {}).get("scylla-server", {}).get("version")
+    if version:
+        db.set_version(run_id, version)
+
+    if baseline_id is None:
+        db.close()
+        return 0
+    comparisons = compare_runs(db, baseline_id, run_id, 1 - args.alpha)
+    db.close()
+    return 1 if report(comparisons, args.alpha, args.threshold, args.verbose) else 0
+
+
+def compare_cmd(args: argparse.Namespace) -> int:
+    db = ResultsDB(args.db)
+    comparisons = compare_runs(db, db.resolve(args.baseline), db.resolve(args.candidate), 1 - args.alpha)
+    db.close()
+    return 1 if report(comparisons, args.alpha, args.threshold, args.verbose) else 0
+
+
+def list_cmd(args: argparse.Namespace) -> int:
+    db = ResultsDB(args.db)
+    for run in db.runs():
+        print("\t".join("" if v is None else str(v) for v in run))
+    db.close()
+    return 0
+
+
+def add_comparison_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="significance level of the Mann-Whitney test; the confidence intervals are 1-alpha")
+    parser.add_argument("--threshold", type=float, default=0.02,
+                        help="smallest relative change (in the worse direction) reported as a regression")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also print metrics which did not change")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=pathlib.Path, default=pathlib.Path("build/perf_results.sqlite3"),
+                        help="path of the results database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmarks and store their results")
+    run_parser.add_argument("-b", "--benchmark", action="append",
+                            help=f"benchmark to run, can be repeated (default: all, built-in ones are {', '.join(BENCHMARKS)})")
+    run_parser.add_argument("--config", type=pathlib.Path, help="YAML file with additional benchmark definitions")
+    run_parser.add_argument("--build-dir", type=pathlib.Path, default=pathlib.Path("build"), help="build directory")
+    run_parser.add_argument("--mode", default="release", help="build mode of the binaries")
+    run_parser.add_argument("--log-dir", type=pathlib.Path, default=pathlib.Path("testlog"),
+                            help="directory for the output of the benchmarks")
+    run_parser.add_argument("--cpuset", default="0", help="cpus to pin the benchmarks to (taskset/seastar syntax)")
+    run_parser.add_argument("--memory", default="2G", help="memory given to the benchmarks")
+    run_parser.add_argument("--repeat", type=int, default=5, help="number of runs of each benchmark")
+    run_parser.add_argument("--extra-args", help="additional arguments passed to every benchmark")
+    run_parser.add_argument("--label", help="label of the stored run (default: git describe)")
+    run_parser.add_argument("--baseline", help="id or label of a stored run to compare the results with")
+    add_comparison_args(run_parser)
+    run_parser.set_defaults(func=run_cmd)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two stored runs")
+    compare_parser.add_argument("baseline", help="id or label of the baseline run")
+    compare_parser.add_argument("candidate", help="id or label of the candidate run")
+    add_comparison_args(compare_parser)
+    compare_parser.set_defaults(func=compare_cmd)
+
+    list_parser = subparsers.add_parser("list", help="list stored runs")
+    list_parser.set_defaults(func=list_cmd)
+
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s",
+                        level=logging.DEBUG if getattr(args, "verbose", False) else logging.INFO)
+    if getattr(args, "repeat", 2) < 2:
+        parser.error("--repeat must be at least 2 to compare results")
+    try:
+        return args.func(args)
+    except (KeyError, RuntimeError) as e:
+        logger.error("%s", e.args[0] if e.args else e)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""
+Run perf-simple-query over a grid of shard counts, memory sizes, workloads
+and concurrencies, and report how throughput scales with the number of
+shards.
+
+Configurations run in parallel as long as there are enough free cpus (and
+memory) to give each of them its own cpuset; pass --jobs 1 to run them one
+at a time, e.g. when memory bandwidth or the LLC are shared. For every
+workload/memory/concurrency the report shows the throughput, the per-shard
+throughput, its scaling efficiency relative to the smallest shard count,
+and instructions and allocations per operation. The first shard count whose
+efficiency falls below --efficiency-threshold is marked as the point where
+per-shard throughput stops scaling.
+
+Example:
+
+    ./test/perf/perf_simple_query_sweep.py --smp 1,2,4,8 --workload read,write --concurrency 100,400 --csv sweep.csv --plot sweep.png
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+import argparse
+import csv
+import itertools
+import logging
+import os
+import pathlib
+import re
+import sys
+import threading
+
+from perf_runner import Benchmark, median, run_benchmark
+
+logger = logging.getLogger("perf_simple_query_sweep")
+
+WORKLOADS = {
+    "read": [],
+    "write": ["--write"],
+    "delete": ["--delete"],
+    "counters-read": ["--counters"],
+    "counters-write": ["--counters", "--write"],
+}
+
+METRICS = ("median tps", "instructions_per_op", "allocs_per_op")
+
+
+def parse_size(size: str) -> int:
+    """Parse a seastar memory size (e.g. 512M, 2G) into bytes."""
+    m = re.fullmatch(r"(\d+)([kKmMgGtT]?)", size)
+    if not m:
+        raise argparse.ArgumentTypeError(f"invalid memory size {size!r}")
+    return int(m.group(1)) << (10 * " kmgt".index(m.group(2).lower() or " "))
+
+
+def parse_list(type):
+    return lambda s: [type(v) for v in s.split(",")]
+
+
+@dataclass(frozen=True)
+class Config:
+    smp: int
+    memory: str
+    workload: str
+    concurrency: int
+
+    @property
+    def name(self) -> str:
+        return f"simple_query.{self.workload}.smp{self.smp}.m{self.memory}.c{self.concurrency}"
+
+    @property
+    def group(self) -> tuple[str, str, int]:
+        return (self.workload, self.memory, self.concurrency)
+
+
+class CpuAllocator:
+    """Hands out disjoint cpusets (and shares of a memory budget) to concurrent runs."""
+
+    def __init__(self, cpus: list[int], memory: int, jobs: Optional[int]):
+        self._free = sorted(cpus)
+        self._memory = memory
+        self._jobs = jobs or len(cpus)
+        self._cond = threading.Condition()
+
+    def acquire(self, count: int, memory: int) -> list[int]:
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._free) >= count and self._memory >= memory and self._jobs > 0)
+            cpus, self._free = self._free[:count], self._free[count:]
+            self._memory -= memory
+            self._jobs -= 1
+            return cpus
+
+    def release(self, cpus: list[int], memory: int) -> None:
+        with self._cond:
+            self._free = sorted(self._free + cpus)
+            self._memory += memory
+            self._jobs += 1
+            self._cond.notify_all()
+
+
+def run_config(config: Config, allocator: CpuAllocator, args: argparse.Namespace) -> dict[str, float]:
+    benchmark = Benchmark(config.name, "scylla",
+                          ["perf-simple-query", "--duration", str(args.duration), "--concurrency", str(config.concurrency)]
+                          + WORKLOADS[config.workload])
+    memory = parse_size(config.memory)
+    samples = {m: [] for m in METRICS}
+    for i in range(args.repeat):
+        cpus = allocator.acquire(config.smp, memory)
+        cpuset = ",".join(str(c) for c in cpus)
+        try:
+            logger.info("%s: iteration %d/%d on cpus %s", config.name, i + 1, args.repeat, cpuset)
+            _, metrics = run_benchmark(benchmark, args.build_dir / args.mode, cpuset, config.memory, args.log_dir, i,
+                                       args.extra_args.split() if args.extra_args else [])
+        finally:
+            allocator.release(cpus, memory)
+        for m in METRICS:
+            samples[m].append(metrics[m])
+    return {m: median(v) for m, v in samples.items()}
+
+
+def scaling_rows(results: dict[Config, dict[str, float]], threshold: float) -> list[dict]:
+    """Per-configuration rows of the scaling table, grouped and ordered by shard count."""
+    rows = []
+    by_group = {}
+    for config in results:
+        by_group.setdefault(config.group, []).append(config)
+    for group in sorted(by_group):
+        configs = sorted(by_group[group], key=lambda c: c.smp)
+        base = results[configs[0]]["median tps"] / configs[0].smp
+        knee_found = False
+        for config in configs:
+            r = results[config]
+            per_shard = r["median tps"] / config.smp
+            efficiency = per_shard / base if base else 0
+            knee = not knee_found and efficiency < threshold
+            knee_found = knee_found or knee
+            rows.append({
+                "workload": config.workload,
+                "memory": config.memory,
+                "concurrency": config.concurrency,
+                "smp": config.smp,
+                "tps": r["median tps"],
+                "tps/shard": per_shard,
+                "efficiency": efficiency,
+                "insns/op": r["instructions_per_op"],
+                "allocs/op": r["allocs_per_op"],
+                "knee": knee,
+            })
+    return rows
+
+
+def print_table(rows: list[dict]) -> None:
+    header = ("workload", "memory", "concurrency", "smp", "tps", "tps/shard", "efficiency", "insns/op", "allocs/op", "")
+    lines = [(r["workload"], r["memory"], str(r["concurrency"]), str(r["smp"]), f"{r['tps']:.0f}", f"{r['tps/shard']:.0f}",
+              f"{r['efficiency']:.2f}", f"{r['insns/op']:.0f}", f"{r['allocs/op']:.1f}",
+              "<- stops scaling" if r["knee"] else "") for r in rows]
+    widths = [max(len(line[i]) for line in lines + [header]) for i in range(len(header))]
+    for line in [header] + lines:
+        print("  ".join(v.ljust(w) for v, w in zip(line, widths)).rstrip())
+
+
+def write_csv(rows: list[dict], path: pathlib.Path) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def plot(rows: list[dict], path: pathlib.Path) -> None:
+    import matplotlib.pyplot as plt
+
+    groups = {}
+    for r in rows:
+        groups.setdefault((r["workload"], r["memory"], r["concurrency"]), []).append(r)
+
+    dpi = 96
+    width = 1200
+    height = 800
+    fig, (ax_tps, ax_shard) = plt.subplots(2, 1, figsize=(width/dpi, height/dpi), dpi=dpi)
+    for (workload, memory, concurrency), group in groups.items():
+        label = f"{workload} -m{memory} c={concurrency}"
+        smp = [r["smp"] for r in group]
+        ax_tps.plot(smp, [r["tps"] for r in group], marker="o", label=label)
+        line, = ax_shard.plot(smp, [r["tps/shard"] for r in group], marker="o", label=label)
+        for r in group:
+            if r["knee"]:
+                ax_shard.plot(r["smp"], r["tps/shard"], marker="x", markersize=12, color=line.get_color())
+    for ax, ylabel in ((ax_tps, "throughput (tps)"), (ax_shard, "throughput per shard (tps)")):
+        ax.set_xscale("log", base=2)
+        ax.set_xticks(sorted({r["smp"] for r in rows}))
+        ax.get_xaxis().set_major_formatter(plt.ScalarFormatter())
+        ax.set_xlabel("smp")
+        ax.set_ylabel(ylabel)
+        ax.set_axisbelow(True)
+        ax.grid(True)
+    ax_tps.legend(fontsize="small")
+    ax_shard.set_title("x: per-shard throughput stops scaling")
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def parse_cpus(cpus: str) -> list[int]:
+    """Parse a cpu list in taskset syntax (e.g. 0-3,8,10-11)."""
+    ret = set()
+    for part in cpus.split(","):
+        first, _, last = part.partition("-")
+        ret.update(range(int(first), int(last or first) + 1))
+    return sorted(ret)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--smp", type=parse_list(int), default=[1, 2, 4], help="comma-separated list of shard counts")
+    parser.add_argument("--memory", type=parse_list(str), default=["2G"],
+                        help="comma-separated list of memory sizes, per run (not per shard)")
+    parser.add_argument("--workload", type=parse_list(str), default=["read"],
+                        help=f"comma-separated list of workloads, of {', '.join(WORKLOADS)}")
+    parser.add_argument("--concurrency", type=parse_list(int), default=[100], help="comma-separated list of workers per shard")
+    parser.add_argument("--duration", type=int, default=5, help="duration of each run in seconds")
+    parser.add_argument("--repeat", type=int, default=1, help="number of runs of each configuration; the median is reported")
+    parser.add_argument("--extra-args", help="additional arguments passed to perf-simple-query")
+    parser.add_argument("--cpus", help="cpus available to the sweep (taskset syntax, default: the affinity of this process)")
+    parser.add_argument("--total-memory", type=parse_size,
+                        help="memory available to concurrent runs (default: 90%% of physical memory)")
+    parser.add_argument("-j", "--jobs", type=int, help="maximum number of concurrent runs (default: as many as fit)")
+    parser.add_argument("--efficiency-threshold", type=float, default=0.9,
+                        help="per-shard throughput, relative to the smallest shard count, below which scaling is considered to stop")
+    parser.add_argument("--build-dir", type=pathlib.Path, default=pathlib.Path("build"), help="build directory")
+    parser.add_argument("--mode", default="release", help="build mode of scylla")
+    parser.add_argument("--log-dir", type=pathlib.Path,
+                        help="directory for the output of the runs (default: testlog/<mode>/perf/sweep)")
+    parser.add_argument("--csv", type=pathlib.Path, help="write the scaling table to this CSV file")
+    parser.add_argument("--plot", type=pathlib.Path, help="plot throughput and per-shard throughput to this file")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s", level=logging.INFO)
+
+    unknown = [w for w in args.workload if w not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+    cpus = parse_cpus(args.cpus) if args.cpus else sorted(os.sched_getaffinity(0))
+    total_memory = args.total_memory or int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") * 0.9)
+    configs = [Config(*c) for c in itertools.product(sorted(set(args.smp)), args.memory, args.workload, args.concurrency)]
+    for c in configs:
+        if c.smp > len(cpus):
+            parser.error(f"{c.name}: needs {c.smp} cpus, only {len(cpus)} available")
+        if parse_size(c.memory) > total_memory:
+            parser.error(f"{c.name}: needs {c.memory} of memory, only {total_memory} bytes available")
+    args.log_dir = args.log_dir or pathlib.Path("testlog") / args.mode / "perf" / "sweep"
+    args.log_dir.mkdir(parents=True, exist_ok=True)
+
+    allocator = CpuAllocator(cpus, total_memory, args.jobs)
+    # Run the largest configurations first, smaller ones fill the remaining cpus.
+    configs.sort(key=lambda c: (-c.smp, -parse_size(c.memory)))
+    with ThreadPoolExecutor(max_workers=len(configs)) as executor:
+        futures = {c: executor.submit(run_config, c, allocator, args) for c in configs}
+        try:
+            results = {c: f.result() for c, f in futures.items()}
+        except RuntimeError as e:
+            logger.error("%s", e)
+            for f in futures.values():
+                f.cancel()
+            return 1
+
+    rows = scaling_rows(results, args.efficiency_threshold)
+    print_table(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.plot:
+        plot(rows, args.plot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
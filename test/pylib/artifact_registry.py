@@ -8,6 +8,8 @@ from typing import Callable, Coroutine, List, Dict, Optional
 import asyncio
 import logging
 
+from test.pylib.compressed_artifacts import ArtifactCompressor
+
 Artifact = Coroutine
 
 
@@ -23,11 +25,16 @@ class ArtifactRegistry:
     resources and artifacts, such as open ports, directories with temporary
     files or running auxiliary processes. Contains a map of all glboal
     resources, and as soon as the resource is taken by the test it is
-    represented in the artifact registry. """
+    represented in the artifact registry.
+
+    Artifacts which are kept after the run (logs and data directories of
+    failed suites) can be compressed by exit artifacts in the background,
+    using the shared bounded pool of `compressor`. """
 
     def __init__(self) -> None:
         self.suite_artifacts: Dict[Suite, List[Artifact]] = {}
         self.exit_artifacts: Dict[Optional[Suite], List[Artifact]] = {}
+        self.compressor = ArtifactCompressor()
 
     async def cleanup_before_exit(self) -> None:
         logging.info("Cleaning up before exit...")
@@ -0,0 +1,199 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""Templates of freshly bootstrapped clusters.
+
+Booting a cluster from empty working directories means bootstrapping system keyspaces and raft group0 on every
+node, which takes tens of seconds.  A template is a copy of the working directories of a throwaway cluster which
+has just bootstrapped and was stopped gracefully.  New clusters of the same suite and mode are cloned from it: the
+working directories are copied (using reflinks where the file system supports them), scylla.yaml is rewritten
+with the new IPs, and all nodes are started at once.  The nodes keep their host IDs and notice the IP change on
+boot the same way as after `server_change_ip()`.
+
+All clones share the cluster name and host IDs of the template, so they must never reach the template nodes'
+addresses or each other.  The throwaway cluster runs on IPs from TEMPLATE_SUBNETS, which HostRegistry never
+leases, and is destroyed right after the capture.  system.peers is dropped from the template, so a clone doesn't
+even know the old addresses and learns the addresses of its nodes from the seeds.
+
+A template is stored in a directory with all nodes' working directories and a manifest.  It's built in a
+temporary directory and renamed into place, so a template which exists is complete.  A template built by
+another Scylla executable or with other suite options is ignored and replaced.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import errno
+import fcntl
+import json
+import logging
+import os
+import random
+import shutil
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from test.pylib.host_registry import Host
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+# HostRegistry takes 127.<xdist worker + 1>.*.*, so the last class B network of 127.0.0.0/8 is never leased
+# for test clusters.
+TEMPLATE_SUBNETS = "127.255.{}"
+
+# Tables with IPs of the other nodes.
+PEERS_TABLES = ("peers",)
+
+
+async def copy_tree(source: Path, destination: Path) -> None:
+    """Copy a directory preserving attributes.  File data is shared using reflinks where possible.
+
+    Hard links are not used: Scylla rewrites some files in place (e.g., it recycles commitlog segments), which
+    would corrupt the template.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "cp", "-a", "--reflink=auto", "-T", str(source), str(destination),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to copy {source} to {destination}: {stderr.decode(errors='replace').strip()}")
+
+
+def drop_peers(workdir: Path) -> None:
+    """Remove sstables of the tables with IPs of the other nodes from a working directory of a stopped node.
+
+    The node was drained, so the commitlog has nothing to replay into these tables.
+    """
+    for table in PEERS_TABLES:
+        for table_dir in workdir.glob(f"data/system/{table}-*"):
+            for path in table_dir.iterdir():
+                if path.is_file():
+                    path.unlink()
+
+
+class TemplateHosts:
+    """Lease IPs for a throwaway cluster a template is captured from (see HostRegistry for the interface.)
+
+    A class C subnet of TEMPLATE_SUBNETS is locked the same way HostRegistry locks its subnet, so concurrent
+    captures don't share IPs.  Call close() after the cluster is destroyed.
+    """
+
+    # File locks don't exclude the same process, so subnets locked by this process are tracked here.
+    subnets_in_use: set[str] = set()
+
+    def __init__(self) -> None:
+        max_attempts = 20
+        for _ in range(max_attempts):
+            self.subnet = TEMPLATE_SUBNETS.format(random.randrange(0, 255))
+            if self.subnet in self.subnets_in_use:
+                continue
+            self.lock_filename = Path(os.getenv('TMPDIR', '/tmp')) / f"scylla-template-{self.subnet}"
+            self.lock_file = self.lock_filename.open('w')
+            try:
+                fcntl.lockf(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError as e:
+                self.lock_file.close()
+                if e.errno not in (errno.EACCES, errno.EAGAIN):
+                    raise
+        else:
+            raise RuntimeError(f"Failed to acquire a template subnet lock after {max_attempts} attempts")
+        self.subnets_in_use.add(self.subnet)
+        self.next_host_id = 0
+
+    async def lease_host(self) -> Host:
+        self.next_host_id += 1
+        return Host(f"{self.subnet}.{self.next_host_id}")
+
+    async def release_host(self, host: Host) -> None:
+        pass
+
+    def close(self) -> None:
+        self.lock_filename.unlink(missing_ok=True)
+        self.lock_file.close()
+        self.subnets_in_use.discard(self.subnet)
+
+
+class ClusterTemplate:
+    """A template of a cluster of `size` nodes for a suite and mode.
+
+    `options` are the suite's Scylla config and command line options the template is booted with, a template
+    booted with other options is not used.
+    """
+
+    def __init__(self, path: Path, scylla_exe: Path | str, size: int, options: dict[str, Any]):
+        self.path = path
+        self.scylla_exe = scylla_exe
+        self.size = size
+        # As read back from the manifest.
+        self.options = json.loads(json.dumps(options))
+
+        # Set if cloning failed: don't try again in this process, boot from empty instead.
+        self.disabled = False
+
+        # Set while a cluster of this process captures the template, so other clusters don't do the same.
+        self.capturing = False
+
+    def _executable(self) -> dict[str, Any]:
+        stat = os.stat(self.scylla_exe)
+        return {"path": str(self.scylla_exe), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def node_path(self, node: int) -> Path:
+        return self.path / f"node{node}"
+
+    def load(self) -> dict[str, Any] | None:
+        """Return the manifest of the template if it can be used."""
+        if self.disabled:
+            return None
+        return self._read_manifest()
+
+    def _read_manifest(self) -> dict[str, Any] | None:
+        try:
+            manifest = json.loads((self.path / MANIFEST_FILENAME).read_text())
+        except (OSError, ValueError):
+            return None
+        if (manifest.get("executable") != self._executable()
+                or manifest.get("options") != self.options
+                or len(manifest.get("nodes", [])) != self.size):
+            return None
+        return manifest
+
+    async def capture(self, cluster_name: str, nodes: list[tuple[str, Path]]) -> None:
+        """Save the working directories of stopped nodes given as (IP, workdir) pairs."""
+        tmp_path = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.mkdir(parents=True)
+        try:
+            await asyncio.gather(*(copy_tree(workdir, tmp_path / f"node{node}")
+                                   for node, (_, workdir) in enumerate(nodes)))
+            for node in range(len(nodes)):
+                drop_peers(tmp_path / f"node{node}")
+            (tmp_path / MANIFEST_FILENAME).write_text(json.dumps({
+                "cluster_name": cluster_name,
+                "executable": self._executable(),
+                "options": self.options,
+                "nodes": [{"ip_addr": ip_addr} for ip_addr, _ in nodes],
+            }, indent=2))
+
+            # Replace a template built by another executable or with other options.
+            if self.path.exists() and self._read_manifest() is None:
+                shutil.rmtree(self.path, ignore_errors=True)
+            try:
+                tmp_path.rename(self.path)
+            except OSError:
+                logger.info("Cluster template %s was captured concurrently", self.path)
+                return
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        logger.info("Captured cluster template %s of %d nodes", self.path, len(nodes))
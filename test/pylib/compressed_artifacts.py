@@ -0,0 +1,209 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""Compression of test artifacts kept after the run: Scylla logs and working directories.
+
+A log is compressed with zstd in independent frames of FRAME_SIZE bytes, so any part of it can be decompressed
+without the preceding ones.  The result is a valid zstd file (`zstd -d` and `zstdcat` read it as a whole), and
+the frames are listed in a seek index next to it (`<log>.zst.idx`, a JSON line per frame with the offsets in
+the original and the compressed file.)  A file can be compressed while it's still appended to: every call of
+StreamingCompressor.compress_available() compresses the complete frames written since the previous one, so
+ArtifactCompressor compresses the logs of running servers between tests and only their tails are left to
+compress when the servers are gone.
+
+A working directory is packed into `<workdir>.tar.zst`.
+
+The `zstd` command line tool is used.  If it's not installed, artifacts are not compressed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+
+logger = logging.getLogger(__name__)
+
+ZSTD_LEVEL = 3
+FRAME_SIZE = 4 * 1024 * 1024
+COMPRESSED_SUFFIX = ".zst"
+INDEX_SUFFIX = ".idx"
+TREE_SUFFIX = ".tar.zst"
+DEFAULT_MAX_WORKERS = 4
+
+
+class Frame(NamedTuple):
+    offset: int
+    size: int
+    compressed_offset: int
+    compressed_size: int
+
+
+def zstd_available() -> bool:
+    return shutil.which("zstd") is not None
+
+
+def compressed_path(path: Path) -> Path:
+    return path.with_name(path.name + COMPRESSED_SUFFIX)
+
+
+def _index_path(compressed: Path) -> Path:
+    return compressed.with_name(compressed.name + INDEX_SUFFIX)
+
+
+def _zstd(args: list[str], data: bytes) -> bytes:
+    return subprocess.run(["zstd", "-q", "-c", *args], input=data, capture_output=True, check=True).stdout
+
+
+class StreamingCompressor:
+    """Compress a file, which may still be appended to, frame by frame.
+
+    The compressed file is written under a temporary name, finish() compresses the rest of the file, writes
+    the seek index, renames the compressed file into place and removes the original.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.compressed = compressed_path(path)
+        self.tmp_compressed = self.compressed.with_name(self.compressed.name + ".tmp")
+        self.frames: list[Frame] = []
+        self.pos = 0
+        self.compressed_pos = 0
+
+    def compress_available(self, final: bool = False) -> None:
+        """Compress the complete frames appended since the last call, and the incomplete last one if `final`."""
+        with self.path.open("rb") as source, self.tmp_compressed.open("ab") as output:
+            source.seek(self.pos)
+            while data := source.read(FRAME_SIZE):
+                if len(data) < FRAME_SIZE and not final:
+                    break
+                frame = _zstd([f"-{ZSTD_LEVEL}"], data)
+                output.write(frame)
+                self.frames.append(Frame(offset=self.pos, size=len(data),
+                                         compressed_offset=self.compressed_pos, compressed_size=len(frame)))
+                self.pos += len(data)
+                self.compressed_pos += len(frame)
+
+    def finish(self) -> Path:
+        self.compress_available(final=True)
+        _index_path(self.compressed).write_text("".join(json.dumps(frame) + "\n" for frame in self.frames))
+        self.tmp_compressed.rename(self.compressed)
+        self.path.unlink()
+        return self.compressed
+
+    def abort(self) -> None:
+        self.tmp_compressed.unlink(missing_ok=True)
+
+
+def remove_compressed(path: Path) -> None:
+    """Remove the compressed versions of the file or directory, complete or not."""
+    compressed = compressed_path(path)
+    for leftover in (compressed, _index_path(compressed), compressed.with_name(compressed.name + ".tmp"),
+                     path.with_name(path.name + TREE_SUFFIX)):
+        leftover.unlink(missing_ok=True)
+
+
+def compress_file(path: Path, compressor: StreamingCompressor | None = None) -> Path:
+    """Replace the file with its compressed version, continuing the work of `compressor` if given."""
+    compressor = compressor or StreamingCompressor(path)
+    try:
+        return compressor.finish()
+    except:
+        compressor.abort()
+        raise
+
+
+def compress_tree(path: Path) -> Path:
+    """Replace the directory with a compressed tar archive."""
+    archive = path.with_name(path.name + TREE_SUFFIX)
+    subprocess.run(["tar", "--zstd", "-cf", str(archive), "-C", str(path.parent), path.name],
+                   capture_output=True, check=True)
+    shutil.rmtree(path)
+    return archive
+
+
+class CompressedFile:
+    """Random access to a file compressed by StreamingCompressor.
+
+    Only the frames which contain the requested range are read and decompressed.  A file compressed by other
+    means (without a seek index) is decompressed as a whole.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path if path.name.endswith(COMPRESSED_SUFFIX) else compressed_path(path)
+        try:
+            self.frames: list[Frame] | None = [Frame(*json.loads(line))
+                                               for line in _index_path(self.path).read_text().splitlines()]
+        except FileNotFoundError:
+            self.frames = None
+
+    @property
+    def size(self) -> int:
+        if self.frames is None:
+            return len(self.read())
+        return self.frames[-1].offset + self.frames[-1].size if self.frames else 0
+
+    def read(self, start: int = 0, end: int | None = None) -> bytes:
+        """Return the bytes [start, end) of the original file."""
+        if self.frames is None:
+            return _zstd(["-d"], self.path.read_bytes())[start:end]
+        frames = [frame for frame in self.frames
+                  if frame.offset + frame.size > start and (end is None or frame.offset < end)]
+        if not frames:
+            return b""
+        with self.path.open("rb") as file:
+            file.seek(frames[0].compressed_offset)
+            data = file.read(sum(frame.compressed_size for frame in frames))
+        base = frames[0].offset
+        return _zstd(["-d"], data)[start - base:None if end is None else end - base]
+
+
+class ArtifactCompressor:
+    """Compress artifacts in a bounded thread pool (every frame is compressed by a `zstd` process.)
+
+    Files which are still written can be compressed by parts with compress_available(), compress_file()
+    finishes the work.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compress")
+        self.streaming: dict[Path, StreamingCompressor] = {}
+
+    async def _run(self, func, path: Path, *args) -> Path | None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            logger.warning("Failed to compress %s: %s", path, exc)
+            return None
+
+    async def compress_available(self, path: Path) -> None:
+        if path.is_file():
+            compressor = self.streaming.setdefault(path, StreamingCompressor(path))
+            await self._run(compressor.compress_available, path)
+
+    async def compress_file(self, path: Path) -> None:
+        compressor = self.streaming.pop(path, None)
+        if path.is_file():
+            if compressed := await self._run(compress_file, path, path, compressor):
+                logger.debug("Compressed %s to %s", path, compressed)
+        elif compressor is not None:
+            compressor.abort()
+
+    def discard(self, path: Path) -> None:
+        """Drop the partially compressed version of the file, e.g., when the file is removed."""
+        if (compressor := self.streaming.pop(path, None)) is not None:
+            compressor.abort()
+
+    async def compress_tree(self, path: Path) -> None:
+        if path.is_dir():
+            if compressed := await self._run(compress_tree, path, path):
+                logger.debug("Compressed %s to %s", path, compressed)
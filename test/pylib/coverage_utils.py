@@ -8,7 +8,14 @@
 #
 import argparse
 import asyncio
+import bisect
+import json
 import multiprocessing
+import shutil
+import struct
+import tempfile
+import time
+import zlib
 from pathlib import Path, PurePath
 from typing import (
     Union,
@@ -30,7 +37,7 @@ from collections.abc import Iterable as IterableType
 import os
 from collections import namedtuple
 from itertools import repeat
-from functools import wraps, partial
+from functools import wraps
 import logging
 import sys
 import inspect
@@ -41,6 +48,7 @@ import lcov_utils
 
 del sys.path[0]
 import concurrent.futures
+import unidiff
 from urllib.parse import quote, unquote
 
 # NOTE: A lot of the functions in this file uses the form: func(*, param1, param2....)
@@ -204,12 +212,133 @@ async def create_subprocess_shell(*args, logger = COVERAGE_TOOLS_LOGGER, **kwarg
         raise e
 
 
+# ELF files are inspected in process instead of running eu-readelf for every file, only the header,
+# the section headers and the note sections are read.
+ELF_MAGIC = b"\x7fELF"
+SHT_PROGBITS = 1
+SHT_NOTE = 7
+SHT_NOBITS = 8
+SHN_XINDEX = 0xFFFF
+NT_GNU_BUILD_ID = 3
+PROFILED_SECTION_RE = re.compile(r"__llvm_cov(map|fun)*")
+
+ElfSection = namedtuple("ElfSection", ["name", "type", "offset", "size", "align"])
+
+
+def read_elf_sections(path: PathLike) -> Optional[List[ElfSection]]:
+    """Reads the section headers of an ELF file, returns None if the file is not an ELF file."""
+    with open(path, "rb") as f:
+        ident = f.read(16)
+        if len(ident) < 16 or ident[:4] != ELF_MAGIC or ident[4] not in (1, 2) or ident[5] not in (1, 2):
+            return None
+        is_64 = ident[4] == 2
+        order = "<" if ident[5] == 1 else ">"
+        if is_64:
+            header = struct.Struct(order + "HHIQQQIHHHHHH")
+            section_header = struct.Struct(order + "IIQQQQIIQQ")
+        else:
+            header = struct.Struct(order + "HHIIIIIHHHHHH")
+            section_header = struct.Struct(order + "IIIIIIIIII")
+        data = f.read(header.size)
+        if len(data) < header.size:
+            return None
+        _, _, _, _, _, shoff, _, _, _, _, shentsize, shnum, shstrndx = header.unpack(data)
+        if shoff == 0 or shentsize < section_header.size:
+            return []
+
+        def read_section_header(index: int):
+            f.seek(shoff + index * shentsize)
+            # name, type, flags, addr, offset, size, link, info, addralign, entsize
+            return section_header.unpack(f.read(section_header.size))
+
+        first = read_section_header(0)
+        if shnum == 0:
+            shnum = first[5]
+        if shstrndx == SHN_XINDEX:
+            shstrndx = first[6]
+        headers = [read_section_header(i) for i in range(shnum)]
+        strtab = headers[shstrndx]
+        f.seek(strtab[4])
+        names = f.read(strtab[5])
+    return [
+        ElfSection(names[h[0] : names.find(b"\0", h[0])].decode(errors = "replace"), h[1], h[4], h[5], h[8])
+        for h in headers
+    ]
+
+
+def read_elf_build_id(path: PathLike, sections: Optional[List[ElfSection]] = None) -> Optional[str]:
+    """Reads the GNU build id of an ELF file from its note sections, returns None if there is no build id."""
+    if sections is None:
+        sections = read_elf_sections(path)
+    if not sections:
+        return None
+    with open(path, "rb") as f:
+        order = "<" if f.read(6)[5] == 1 else ">"
+        note_header = struct.Struct(order + "III")
+        for section in sections:
+            if section.type != SHT_NOTE:
+                continue
+            align = section.align if section.align in (4, 8) else 4
+            f.seek(section.offset)
+            notes = f.read(section.size)
+            pos = 0
+            while pos + note_header.size <= len(notes):
+                namesz, descsz, note_type = note_header.unpack_from(notes, pos)
+                pos += note_header.size
+                name = notes[pos : pos + namesz]
+                pos += -(-namesz // align) * align
+                desc = notes[pos : pos + descsz]
+                pos += -(-descsz // align) * align
+                if note_type == NT_GNU_BUILD_ID and name == b"GNU\0":
+                    return desc.hex()
+    return None
+
+
+# Raw profiles list the build ids of the profiled binaries right after the header, the size of the header
+# depends on the raw profile format version (see INSTR_PROF_RAW_HEADER in llvm's InstrProfData.inc).
+# Binary ids are in the raw profiles since version 6 (the BinaryIdsSize field follows the version.)
+RAW_PROFILE_MAGIC = 0xFF6C70726F667281
+RAW_PROFILE_HEADER_FIELDS = {6: 11, 7: 11, 8: 11, 9: 14, 10: 16}
+RAW_PROFILE_VERSION_MASK = 0xFFFFFFFF
+
+
+def read_raw_profile_binary_ids(path: PathLike) -> Optional[List[str]]:
+    """Reads the profiled binary ids from the header of a raw profile.
+    Returns None if the file is not a raw profile of a known version, or its header doesn't make sense.
+    """
+    with open(path, "rb") as f:
+        data = f.read(24)
+        if len(data) < 24:
+            return None
+        for order in "<>":
+            if struct.unpack_from(order + "Q", data)[0] == RAW_PROFILE_MAGIC:
+                break
+        else:
+            return None
+        version, binary_ids_size = struct.unpack_from(order + "QQ", data, 8)
+        header_fields = RAW_PROFILE_HEADER_FIELDS.get(version & RAW_PROFILE_VERSION_MASK)
+        if header_fields is None or binary_ids_size > 64 * 1024:
+            return None
+        f.seek(8 * header_fields)
+        binary_ids = f.read(binary_ids_size)
+    if len(binary_ids) != binary_ids_size:
+        return None
+    ids = []
+    pos = 0
+    while pos < binary_ids_size:
+        if pos + 8 > binary_ids_size:
+            return None
+        (id_len,) = struct.unpack_from(order + "Q", binary_ids, pos)
+        pos += 8
+        if not 0 < id_len <= 64 or pos + id_len > binary_ids_size:
+            return None
+        ids.append(binary_ids[pos : pos + id_len].hex())
+        pos += -(-id_len // 8) * 8
+    return ids or None
+
+
 # A set of commands to be used by the FileType enumeration
 CONSUME_FIRST_INPUT_FIELD = "cut -d ',' -f1"
-IS_PROFILED_COMMAND = (
-    "test `eu-readelf -S {} | grep -E '__llvm_cov(map|fun)*[ ]+PROGBITS' | wc -l` -ge 2"
-)
-IS_DEBUG_ONLY_COMMAND = "eu-readelf -S {} | grep '.text[ ]*NOBITS'"
 
 
 class FileType(Enum):
@@ -260,39 +389,41 @@ class FileType(Enum):
 
     @staticmethod
     @traced_func
-    async def is_profiled(f: PathLike) -> bool:
+    async def is_profiled(f: PathLike, sections: Optional[List[ElfSection]] = None) -> bool:
         """Checks if the file is profiled by poking into
         the sections in the elf
 
         Args:
             f (PathLike): The file to check for profile
+            sections (Optional[List[ElfSection]], optional): The sections of the file if they were already read.
 
         Returns:
             bool: True if the file is profiled, False otherwise
         """
-        proc = await create_subprocess_shell(
-            IS_PROFILED_COMMAND.format(f), stdout = DEVNULL, stderr = DEVNULL
-        )
-        await proc.wait()
-        return proc.returncode == 0
+        if sections is None:
+            sections = read_elf_sections(f) or []
+        profiled_sections = [
+            section for section in sections
+            if section.type == SHT_PROGBITS and PROFILED_SECTION_RE.search(section.name)
+        ]
+        return len(profiled_sections) >= 2
 
     @staticmethod
     @traced_func
-    async def is_debug_only(f: PathLike) -> bool:
+    async def is_debug_only(f: PathLike, sections: Optional[List[ElfSection]] = None) -> bool:
         """Checks if the elf file is debug only (no code) by poking into
         the sections in the elf
 
         Args:
             f (PathLike): The file to check for profile
+            sections (Optional[List[ElfSection]], optional): The sections of the file if they were already read.
 
         Returns:
             bool: True if the file is profiled, False otherwise
         """
-        proc = await create_subprocess_shell(
-            IS_DEBUG_ONLY_COMMAND.format(f), stdout = DEVNULL, stderr = DEVNULL
-        )
-        await proc.wait()
-        return proc.returncode == 0
+        if sections is None:
+            sections = read_elf_sections(f) or []
+        return any(section.name == ".text" and section.type == SHT_NOBITS for section in sections)
 
     @staticmethod
     async def get_file_type(f: PathLike) -> Self:
@@ -309,9 +440,10 @@ class FileType(Enum):
         for ft in FileType:
             if m := ft.value[0].fullmatch(file_description):
                 if ft in ELF_TYPES:
-                    profiled = "PROFILED_" if await FileType.is_profiled(f) else ""
+                    sections = read_elf_sections(f) or []
+                    profiled = "PROFILED_" if await FileType.is_profiled(f, sections) else ""
                     debug_only = (
-                        "DEBUG_ONLY_" if await FileType.is_debug_only(f) else ""
+                        "DEBUG_ONLY_" if await FileType.is_debug_only(f, sections) else ""
                     )
                     return FileType[debug_only + profiled + ft.name]
                 return ft
@@ -350,7 +482,6 @@ async def gather_limited_concurrency(
     finally:
         [coro.cancel() for coro in coros]
 
-GET_BIN_ID_SHELL_CMD = "eu-readelf -n  {} | grep 'Build ID:' | head -1"
 @traced_func
 async def get_binary_id(
     *, path: PathLike, logger: LoggerType = COVERAGE_TOOLS_LOGGER
@@ -362,20 +493,61 @@ async def get_binary_id(
         logger (LoggerType, optional): The logger to which log information. Defaults to COVERAGE_TOOLS_LOGGER.
 
     Raises:
-        RuntimeError: If the readelf command fails for some reason
+        RuntimeError: If the file couldn't be read for some reason
 
     Returns:
         str: The found id if it exists else None
     """
-    cmd = GET_BIN_ID_SHELL_CMD.format(path)
-    proc = await create_subprocess_shell(cmd, stdout = PIPE, stderr = PIPE)
-    stdout, stderr = await proc.communicate()
-    if proc.returncode != 0:
-        raise RuntimeError(f"could not read {path} build id: {stderr.decode()}")
-    id_fields = stdout.decode().splitlines()
-    if len(id_fields) == 0:
-        return None
-    return id_fields[-1].strip().split(" ")[-1]
+    try:
+        return read_elf_build_id(path)
+    except (OSError, struct.error) as e:
+        raise RuntimeError(f"could not read {path} build id: {e}")
+
+
+BINARY_IDS_CACHE_NAME = ".binary_ids_cache.json"
+
+
+class BinaryIdsCache:
+    """Build ids and file types of binaries, persisted in a JSON file in their directory.
+    An entry is valid while the size, mtime and inode of the binary are the same, a relinked binary
+    always gets a new mtime.
+    """
+
+    def __init__(self, directory: PathLike, logger: LoggerType = COVERAGE_TOOLS_LOGGER):
+        self.path = Path(directory) / BINARY_IDS_CACHE_NAME
+        self.logger = logger
+        self.dirty = False
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def _key(f: Path) -> List[int]:
+        stat = f.stat()
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def get(self, f: Path) -> Optional[tuple[Optional[str], "FileType"]]:
+        entry = self.entries.get(str(f.absolute()))
+        if entry is None or entry["key"] != self._key(f) or entry["type"] not in FileType.__members__:
+            return None
+        return entry["build_id"], FileType[entry["type"]]
+
+    def set(self, f: Path, build_id: Optional[str], file_type: "FileType"):
+        self.entries[str(f.absolute())] = {"key": self._key(f), "build_id": build_id, "type": file_type.name}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(self.entries))
+            tmp_path.replace(self.path)
+            self.dirty = False
+        except OSError as e:
+            self.logger.warning(f"Failed to save the binary ids cache {self.path}: {e}")
+
 
 @traced_func
 async def get_binary_ids_map(
@@ -412,23 +584,36 @@ async def get_binary_ids_map(
         logger.error(err)
         raise FileNotFoundError(err)
     dirs = list({path for path in paths if path.is_dir()})
-    files = {path for path in paths if not path.is_dir()}
-    files_per_dir = [[f for f in dir.rglob("*") if f.is_file() and os.access(f, os.X_OK)] for dir in dirs]
-    files.update({f for dirfiles in files_per_dir for f in dirfiles})
-    files = list(files)
-    types = await gather_limited_concurrency(*(FileType.get_file_type(f) for f in files), semaphore = semaphore, logger = logger)
-    if filter:
-        filter = list(filter)
-        files = [f for f,ft in zip(files, types) if ft in filter]
-    build_ids = await gather_limited_concurrency(
-        *(get_binary_id(path = f, logger = logger) for f in files),
+    # Files found in a directory are cached in it, files given explicitly are cached in their parent directory
+    files_to_cache_dir = {path: path.parent for path in paths if not path.is_dir()}
+    for dir in dirs:
+        files_to_cache_dir.update(
+            {f: dir for f in dir.rglob("*") if f.is_file() and os.access(f, os.X_OK)}
+        )
+    files = list(files_to_cache_dir)
+    caches = {cache_dir: BinaryIdsCache(cache_dir, logger = logger) for cache_dir in set(files_to_cache_dir.values())}
+    missing = [f for f in files if caches[files_to_cache_dir[f]].get(f) is None]
+    logger.debug(f"Binary ids cache: {len(files) - len(missing)} hits, {len(missing)} misses")
+    missing_types = await gather_limited_concurrency(
+        *(FileType.get_file_type(f) for f in missing), semaphore = semaphore, logger = logger
+    )
+    missing_build_ids = await gather_limited_concurrency(
+        *(get_binary_id(path = f, logger = logger) for f in missing),
         semaphore = semaphore,
         logger = logger,
     )
+    for f, build_id, ft in zip(missing, missing_build_ids, missing_types):
+        caches[files_to_cache_dir[f]].set(f, build_id, ft)
+    for cache in caches.values():
+        cache.save()
+    ids_and_types = {f: caches[files_to_cache_dir[f]].get(f) for f in files}
+    if filter:
+        filter = list(filter)
+        files = [f for f in files if ids_and_types[f][1] in filter]
     if with_types:
-        files_to_ids_map = {file: build_id for build_id, file in zip(zip(build_ids, types), files)}
+        files_to_ids_map = {f: ids_and_types[f] for f in files}
     else :
-        files_to_ids_map = {file: build_id for build_id, file in zip(build_ids, files)}
+        files_to_ids_map = {f: ids_and_types[f][0] for f in files}
 
     return files_to_ids_map
 
@@ -457,6 +642,9 @@ async def get_profiled_binary_ids(
         List[str]: A list of binary ids profiled in this profile.
     """
 
+    # Raw profiles are the vast majority, their ids are read from the header without running llvm-profdata
+    if ids := read_raw_profile_binary_ids(path):
+        return ids
     proc = await create_subprocess_shell(
         GET_PROFILED_BINARIES_SHELL_CMD.format(path),
         stdout = PIPE,
@@ -476,6 +664,46 @@ async def get_profiled_binary_ids(
     return info
 
 
+@traced_func
+async def group_profiles_by_binary_ids(
+    *,
+    profiles: Iterable[PathLike],
+    semaphore: Semaphore = Semaphore(1),
+    logger: LoggerType = COVERAGE_TOOLS_LOGGER,
+) -> Dict[tuple[str, ...], List[Path]]:
+    """Groups profiles by the (sorted) ids of the binaries they profile in a single scan.
+    The ids of raw profiles are read from their headers in process, only the rest of the profiles
+    (e.g., indexed ones) are inspected by llvm-profdata.
+
+    Args:
+        profiles (Iterable[PathLike]): The profiles to group
+        semaphore (Semaphore, optional): Concurrency limitation for the operation. Defaults to Semaphore(1) (no concurrency).
+        logger (LoggerType, optional): logger to which log information. Defaults to COVERAGE_TOOLS_LOGGER.
+
+    Raises:
+        RuntimeError: If the ids of some profile couldn't be found.
+
+    Returns:
+        Dict[tuple[str, ...], List[Path]]: The profiles of every combination of binary ids.
+    """
+    # A profile given more than once is merged once.
+    profiles = list(dict.fromkeys(Path(p) for p in profiles))
+    profile_ids = [read_raw_profile_binary_ids(profile) for profile in profiles]
+    unknown = [profile for profile, ids in zip(profiles, profile_ids) if ids is None]
+    logger.debug(f"Read binary ids of {len(profiles) - len(unknown)} raw profiles, {len(unknown)} left for llvm-profdata")
+    unknown_ids = iter(await gather_limited_concurrency(
+        *(get_profiled_binary_ids(path = profile, logger = logger) for profile in unknown),
+        semaphore = semaphore,
+        logger = logger,
+    ))
+    groups = {}
+    for profile, ids in zip(profiles, profile_ids):
+        if ids is None:
+            ids = next(unknown_ids)
+        groups.setdefault(tuple(sorted(ids)), []).append(profile)
+    return groups
+
+
 # The best way to merge profiles is by the file build id that they map, somewhen in the future,
 # it might also be desirable to merge profiles from different binaries, but lcov format does it better
 # as it is source dependent so for now we will stick to it.
@@ -514,17 +742,8 @@ async def merge_profiles(
         and a list of errors that happened during merge.
         It is the user responsibility to the result for errors and act accordingly.
     """
-    profiles = [Path(p) for p in profiles]
     path_for_merged = Path(path_for_merged)
-    profile_ids = await gather_limited_concurrency(
-        *(get_profiled_binary_ids(path = profile, logger = logger) for profile in profiles),
-        semaphore = semaphore,
-        logger = logger,
-    )
-    [ids.sort() for ids in profile_ids]
-    profile_merge_map = {}
-    for ids, profile in zip(profile_ids, profiles):
-        profile_merge_map.setdefault(tuple(ids), set()).add(profile)
+    profile_merge_map = await group_profiles_by_binary_ids(profiles = profiles, semaphore = semaphore, logger = logger)
 
     async def do_merge_profile(
         ids: Iterable[str], profiles: Iterable[PathLike]
@@ -666,6 +885,49 @@ LCOV_TAG_WITH_TEST_SHELL_CMD = (
     "sed 's/^TN:.*/TN:{test_name}/g' {input_lcov} > {output_lcov}"
 )
 
+
+TN_LINE_RE = re.compile(r"^[ \t]*TN:.*$", re.MULTILINE)
+SF_LINE_RE = re.compile(r"^[ \t]*SF:(.*?)[ \t\r]*$", re.MULTILINE)
+
+
+def _trace_partition(source_file: str, partitions: int) -> int:
+    return zlib.crc32(str(Path(source_file)).encode()) % partitions
+
+
+def _partition_traces(lcovs: List[Path], partition_files: List[Path], test_tag: Optional[str]) -> None:
+    """Split the records of lcov traces into partition files by their source file (a worker of lcov_combine_traces.)
+
+    The records are copied as is (only the test name is replaced if `test_tag` is given), records of the same
+    test and source file are merged when the partition files are merged.
+    """
+    outputs = [open(partition_file, "w") for partition_file in partition_files]
+    try:
+        for lcov in lcovs:
+            for text in lcov_utils.LcovFile.read_records(lcov):
+                source_file = SF_LINE_RE.search(text)
+                if source_file is None or Path(source_file[1]) == lcov_utils.LcovFile.EMPTY_LCOV_PSEUDO_FILE:
+                    continue
+                text = text.strip("\n")
+                if test_tag is not None:
+                    text, tagged = TN_LINE_RE.subn(f"TN:{test_tag}", text, count = 1)
+                    if not tagged:
+                        text = f"TN:{test_tag}\n{text}"
+                outputs[_trace_partition(source_file[1], len(outputs))].write(f"{text}\nend_of_record\n")
+    finally:
+        for output in outputs:
+            output.close()
+
+
+def _merge_trace_files(files: List[Path], output_lcov: Path) -> None:
+    """Merge partition files into a new one and remove them (a worker of lcov_combine_traces.)"""
+    merged = lcov_utils.LcovFile()
+    for file in files:
+        merged.load(file)
+    merged.write(output_lcov, generate_empty = True, incompatible_empty = True)
+    for file in files:
+        file.unlink()
+
+
 @traced_func
 async def lcov_combine_traces(
     *,
@@ -681,12 +943,21 @@ async def lcov_combine_traces(
     from the command line is that this function can parallelize the process, especially when a lot of lcov files are
     merged.
 
+    The merge runs in a pool of processes and never holds the whole result in memory:
+    1. The records of the traces are split into partition files by their source file, `files_per_chunk` traces
+       per task, so records which have to be merged always end up in the same partition.
+    2. The files of every partition are merged pairwise in a tree, every merge is a separate task.
+    3. The merged partitions don't share source files, so they are just concatenated into the output.
+
     Args:
         lcovs (Iterable[PathLike]): A list of source lcov trace files to merge
-        output_lcov (PathLike): the final output lcov file
-        branch_coverage (bool, optional): Whether to include branch coverage data or not (if exists). Defaults to True.
-        files_per_chunk (Union[int, None], optional): How many files to combine per parallel task. Defaults to None.
-        concurrency (ConcurrencyParam, optional): A concurrency limiting parameter for the execution. Defaults to None.
+        output_lcov (PathLike): the final output lcov file, if not given, the result is returned as an LcovFile
+        test_tag (Optional[str], optional): A test name to tag all of the records with. Defaults to None.
+        clear_on_success (bool, optional): Remove the source trace files once merged. Defaults to False.
+        files_per_chunk (Union[int, None], optional): How many files to partition per parallel task. Defaults to None
+            (the files are spread evenly between the workers).
+        semaphore (Semaphore, optional): Concurrency limitation for the operation, the number of worker processes.
+            Defaults to Semaphore(1) (no concurrency).
         logger (LoggerType, optional): A logger to which log information. Defaults to COVERAGE_TOOLS_LOGGER.
 
     Raises:
@@ -696,60 +967,311 @@ async def lcov_combine_traces(
 
     lcovs = [Path(lcov) for lcov in lcovs]
 
-    if files_per_chunk is None or files_per_chunk > len(lcovs):
-        files_per_chunk = len(lcovs)
-
-    def merge_lcovs(lcov_spec: List[Union[lcov_utils.LcovFile, Path]]):
-        lcov_objs: List[lcov_utils.LcovFile] = []
-        if (len(lcov_spec) == 1) and isinstance(lcov_spec[0], lcov_utils.LcovFile):
-            return lcov_spec[0]
-        for lcov in lcov_spec:
-            if isinstance(lcov, Path):
-                lcov_objs.append(lcov_utils.LcovFile(lcov))
-            else:
-                lcov_objs.append(lcov)
-        lcov_result = lcov_utils.LcovFile()
-
-        for lcov in lcov_objs:
-            if test_tag:
-                lcov.tag_with_test(test_tag)
-            lcov_result.union(lcov)
-        return lcov_result
-
-    files_to_merge = lcovs
     # Consume all of the available concurrency in the semaphore
-    concurrency = 0
+    acquired = 0
     while not semaphore.locked():
         await semaphore.acquire()
-        concurrency += 1
+        acquired += 1
+    concurrency = max(acquired, 1)
+    if files_per_chunk is None:
+        files_per_chunk = -(-len(lcovs) // concurrency)
+    files_per_chunk = max(files_per_chunk, 1)
+    chunks = [lcovs[i : i + files_per_chunk] for i in range(0, len(lcovs), files_per_chunk)]
     try:
-        with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
-            while len(files_to_merge) > 1:
-                files_to_merge = [
-                    files_to_merge[i : i + files_per_chunk]
-                    for i in range(0, len(files_to_merge), files_per_chunk)
-                ]
-                merge_funcs = [partial(merge_lcovs, chunk) for chunk in files_to_merge]
-                # We use "normal" gather here since we have the concurrency limited by the executor
-                files_to_merge = await asyncio.gather(
-                    *(loop.run_in_executor(executor, func) for func in merge_funcs)
+        with (
+            tempfile.TemporaryDirectory(dir = Path(output_lcov).parent if output_lcov else None) as merge_dir,
+            concurrent.futures.ProcessPoolExecutor(concurrency) as executor,
+        ):
+            merge_dir = Path(merge_dir)
+
+            def partition_file(partition: int, name: str) -> Path:
+                return merge_dir / f"partition-{partition}-{name}.info"
+
+            try:
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            executor,
+                            _partition_traces,
+                            chunk,
+                            [partition_file(partition, f"chunk-{i}") for partition in range(concurrency)],
+                            test_tag,
+                        )
+                        for i, chunk in enumerate(chunks)
+                    )
                 )
-            result: List[lcov_utils.LcovFile] = await loop.run_in_executor(
-                executor, partial(merge_lcovs, files_to_merge)
+            except Exception as e:
+                raise RuntimeError(f"Failed to partition lcov traces: {e}") from e
+
+            async def reduce_partition(partition: int) -> Optional[Path]:
+                files = [
+                    path
+                    for i in range(len(chunks))
+                    if (path := partition_file(partition, f"chunk-{i}")).stat().st_size > 0
+                ]
+                level = 0
+                # The records of a chunk file are only copied from the traces, so a single file is loaded and
+                # written too, to merge the records of the same test and source file.
+                while len(files) > 1 or (files and level == 0):
+                    groups = [files[i : i + 2] for i in range(0, len(files) - 1, 2)] or [files]
+                    merged = [partition_file(partition, f"level-{level}-{i}") for i in range(len(groups))]
+                    try:
+                        await asyncio.gather(
+                            *(
+                                loop.run_in_executor(executor, _merge_trace_files, group, output)
+                                for group, output in zip(groups, merged)
+                            )
+                        )
+                    except Exception as e:
+                        raise RuntimeError(f"Failed to merge lcov traces: {e}") from e
+                    files = merged + files[2 * len(groups) :]
+                    level += 1
+                return files[0] if files else None
+
+            partitions = await asyncio.gather(*(reduce_partition(partition) for partition in range(concurrency)))
+            partitions = [partition for partition in partitions if partition is not None]
+            logger.debug(
+                f"Merged {len(lcovs)} lcov traces in {len(chunks)} chunks into {len(partitions)} partitions"
             )
-            if output_lcov:
-                result.write(output_lcov)
-                if clear_on_success:
-                    for lcov in lcovs:
-                        if isinstance(lcov, Path):
-                            lcov.unlink()
+            result_lcov = Path(output_lcov) if output_lcov else merge_dir / "merged.info"
+            if partitions:
+                with open(result_lcov, "wb") as output:
+                    for partition in partitions:
+                        with open(partition, "rb") as f:
+                            shutil.copyfileobj(f, output)
             else:
-                return result
+                lcov_utils.LcovFile.write_empty(result_lcov)
+            if not output_lcov:
+                return await loop.run_in_executor(None, lcov_utils.LcovFile, result_lcov)
+        if clear_on_success:
+            for lcov in lcovs:
+                lcov.unlink()
     finally:
         # Release all consumed concurrency back into the semaphore
-        for _ in range(concurrency):
+        for _ in range(acquired):
             semaphore.release()
 
+# Test impact analysis: a persisted map of source lines covered by every test, used to select only the tests
+# whose covered lines are touched by a change.
+# The coverage of a single test is taken from its own raw profile, the test case name is encoded into the
+# distinct id of the profile (see scripts/coverage.py), e.g.: build/coverage/test/boost/foo_test.profraw.<hex>
+PER_TEST_PROFILE_RE = re.compile(r"(?P<executable>.+)\.profraw\.(?P<test_case>[0-9a-f]+)")
+SOURCE_FILE_SUFFIXES = (".cc", ".hh", ".h", ".cpp", ".hpp")
+
+
+def per_test_distinct_id(test_case: str) -> str:
+    """The distinct id of the raw profile of a test case, it can contain only [-_a-z0-9] characters."""
+    return test_case.encode().hex()
+
+
+def _line_ranges(lines: List[int]) -> List[List[int]]:
+    """Compress sorted line numbers into [first, last] ranges."""
+    ranges = []
+    for line in lines:
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ranges
+
+
+def _ranges_intersect(ranges: List[List[int]], lines: List[int]) -> bool:
+    """Check if any of the sorted lines falls into one of the sorted ranges."""
+    starts = [first for first, _ in ranges]
+    for line in lines:
+        i = bisect.bisect_right(starts, line) - 1
+        if i >= 0 and ranges[i][1] >= line:
+            return True
+    return False
+
+
+TestSelection = namedtuple(
+    "TestSelection", ["tests", "total_tests", "changed_files", "changed_lines", "unmapped_files", "duration"]
+)
+
+
+def format_test_selection(selection: TestSelection) -> str:
+    percent = 100 * len(selection.tests) / selection.total_tests if selection.total_tests else 0
+    report = (
+        f"Selected {len(selection.tests)} of {selection.total_tests} tests ({percent:.1f}%) "
+        f"for {selection.changed_lines} changed lines in {len(selection.changed_files)} files "
+        f"in {selection.duration:.3f}s"
+    )
+    if selection.unmapped_files:
+        report += f"\nChanged files not covered by any test: {', '.join(selection.unmapped_files)}"
+    return report
+
+
+class CoverageMap:
+    """Source lines covered by every test, persisted in a JSON file.
+
+    The map is updated from lcov traces whose records are tagged with test names (see LcovFile.tag_with_test),
+    the coverage of a test replaces its previous coverage, so the map can be kept up to date by runs of subsets
+    of the tests.  Source files are kept relative to `source_root`, like paths in git diffs.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: PathLike, source_root: PathLike = Path.cwd()):
+        self.path = Path(path)
+        self.source_root = Path(source_root).absolute()
+        # test name -> source file -> sorted [first, last] ranges of covered lines
+        self.tests: Dict[str, Dict[str, List[List[int]]]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get("version") == self.VERSION:
+                self.tests = data["tests"]
+
+    def _source_key(self, source_file: Path) -> str:
+        source_file = Path(source_file)
+        if source_file.is_absolute() and source_file.is_relative_to(self.source_root):
+            return str(source_file.relative_to(self.source_root))
+        return str(source_file)
+
+    def update(self, lcov: lcov_utils.LcovFile) -> None:
+        """Replace the coverage of the tests the records of the trace are tagged with."""
+        coverage = {test_name: {} for test_name, _ in lcov.records.keys()}
+        for (test_name, source_file), record in lcov.records.items():
+            lines = sorted(line for line, hits in record.line_hits.items() if hits > 0)
+            if lines:
+                coverage[test_name][self._source_key(source_file)] = _line_ranges(lines)
+        self.tests.update(coverage)
+
+    def save(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": self.VERSION, "tests": self.tests}))
+        tmp_path.replace(self.path)
+
+    def select(self, changed_lines: Mapping[str, Iterable[int]], ignore_unmapped: bool = False) -> TestSelection:
+        """Select the tests which cover any of the changed lines (by source file.)
+
+        A changed C++ source file which isn't covered by any test (e.g., a new file or a header with declarations
+        only) can affect any test, so all tests are selected then, unless `ignore_unmapped` is set.
+        """
+        start = time.perf_counter()
+        changed = {source: sorted(set(lines)) for source, lines in changed_lines.items()}
+        mapped_files = {source for coverage in self.tests.values() for source in coverage}
+        unmapped_files = sorted(source for source in changed
+                                if source not in mapped_files and source.endswith(SOURCE_FILE_SUFFIXES))
+        if unmapped_files and not ignore_unmapped:
+            tests = sorted(self.tests)
+        else:
+            tests = sorted(test_name for test_name, coverage in self.tests.items()
+                           if any(source in coverage and _ranges_intersect(coverage[source], lines)
+                                  for source, lines in changed.items()))
+        return TestSelection(tests=tests,
+                             total_tests=len(self.tests),
+                             changed_files=sorted(changed),
+                             changed_lines=sum(len(lines) for lines in changed.values()),
+                             unmapped_files=unmapped_files,
+                             duration=time.perf_counter() - start)
+
+
+def changed_lines_from_patch(patch: unidiff.PatchSet) -> Dict[str, set[int]]:
+    """Lines of the original source files changed by a patch (made with `git diff -U0`.)
+
+    A pure insertion changes no original line, so the lines around it are taken.  Added files have no original
+    lines and are reported with an empty set.
+    """
+    changed = {}
+    patched_file: unidiff.PatchedFile
+    for patched_file in patch:
+        # Not `is_added_file`: it's true for a single insertion at the beginning of an existing file too.
+        is_added_file = patched_file.source_file == "/dev/null"
+        source_file = patched_file.target_file if is_added_file else patched_file.source_file
+        lines = changed.setdefault(re.sub(r"^[ab]/", "", source_file), set())
+        if is_added_file:
+            continue
+        for hunk in patched_file:
+            if hunk.source_length > 0:
+                lines.update(range(hunk.source_start, hunk.source_start + hunk.source_length))
+            else:
+                lines.update((hunk.source_start, hunk.source_start + 1))
+    return changed
+
+
+async def git_changed_lines(base: str = "HEAD", logger: LoggerType = COVERAGE_TOOLS_LOGGER) -> Dict[str, set[int]]:
+    """Lines changed in the working tree compared to `base` commit."""
+    proc = await create_subprocess_exec(
+        "git", "diff", "-U0", "--no-renames", "--no-color", base, stdout = PIPE, stderr = PIPE, logger = logger
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"git diff {base} failed: {stderr.decode()}")
+    return changed_lines_from_patch(unidiff.PatchSet(stdout.decode(errors = "replace")))
+
+
+@traced_func
+async def update_coverage_map(
+    *,
+    map_path: PathLike,
+    profiles_path: PathLike,
+    excludes: Iterable[str] = [],
+    clear_on_success: bool = False,
+    semaphore: Semaphore = Semaphore(1),
+    logger: LoggerType = COVERAGE_TOOLS_LOGGER,
+) -> CoverageMap:
+    """Update the coverage map with the coverage of every test case which has its own raw profile.
+
+    Args:
+        map_path (PathLike): The coverage map file, created if it doesn't exist.
+        profiles_path (PathLike): A directory to search raw profiles of test cases in, the profiles are expected
+            next to the test executables, with the test case name encoded in the distinct id (see per_test_distinct_id).
+        excludes (Iterable[str], optional): Regexes of source files to ignore. Defaults to [].
+        clear_on_success (bool, optional): Remove the raw profiles once they are processed. Defaults to False.
+        semaphore (Semaphore, optional): Concurrency limitation for the operation. Defaults to Semaphore(1) (no concurrency).
+        logger (LoggerType, optional): logger to which log information. Defaults to COVERAGE_TOOLS_LOGGER.
+
+    Raises:
+        RuntimeError: If a profile couldn't be converted.
+    """
+    profiles_path = Path(profiles_path)
+    coverage_map = CoverageMap(map_path)
+    exclude_params = sum(map(lambda exclude: ["-ignore-filename-regex", exclude], excludes), [])
+    loop = asyncio.get_running_loop()
+
+    async def add_test_coverage(profile: Path, executable: Path, test_case: str):
+        test_name = f"test/{executable.relative_to(profiles_path)}.cc::{test_case}"
+        profdata = profile.with_name(profile.name + ".profdata")
+        lcov_path = profile.with_name(profile.name + ".info")
+        try:
+            proc = await create_subprocess_exec(
+                "llvm-profdata", "merge", "--sparse", profile, "-o", profdata, stdout = DEVNULL, stderr = PIPE,
+                logger = logger,
+            )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(f"Could not index {profile}: {stderr.decode()}")
+            with open(lcov_path, "w") as lcov_file:
+                proc = await create_subprocess_exec(
+                    "llvm-cov", "export", "--format", "lcov", *exclude_params, "-instr-profile", profdata, executable,
+                    stdout = lcov_file, stderr = PIPE, logger = logger,
+                )
+                _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(f"Could not convert {profile} to lcov: {stderr.decode()}")
+            lcov = await loop.run_in_executor(None, lcov_utils.LcovFile, lcov_path)
+        finally:
+            profdata.unlink(missing_ok = True)
+            lcov_path.unlink(missing_ok = True)
+        lcov.tag_with_test(test_name)
+        coverage_map.update(lcov)
+        if clear_on_success:
+            profile.unlink()
+
+    profiles = [(profile, match) for profile in profiles_path.rglob("*.profraw.*")
+                if (match := PER_TEST_PROFILE_RE.fullmatch(profile.name))]
+    logger.info(f"Updating coverage map {map_path} with {len(profiles)} test profiles")
+    await gather_limited_concurrency(
+        *(add_test_coverage(profile, profile.with_name(match["executable"]), bytes.fromhex(match["test_case"]).decode())
+          for profile, match in profiles),
+        semaphore = semaphore,
+        logger = logger,
+    )
+    coverage_map.save()
+    return coverage_map
+
+
 @traced_func
 async def html_fixup(*, html_dir: Path):
     """Fix genhtml generated links, there is a bug in genhtml where it doesn't properly encode links to
@@ -1032,6 +1554,31 @@ async def patch_coverage_cmd(args):
     remapped_tracefile.write(args.output_trace)
 
 
+async def update_coverage_map_cmd(args):
+    excludes = []
+    if args.excludes_file:
+        excludes = [line for line in args.excludes_file.read_text().splitlines() if line and not line.startswith("#")]
+    await update_coverage_map(
+        map_path = args.coverage_map,
+        profiles_path = args.profiles_path,
+        excludes = excludes,
+        clear_on_success = args.clear_on_success,
+        semaphore = args.concurrency,
+        logger = COVERAGE_TOOLS_LOGGER,
+    )
+
+
+async def select_tests_cmd(args):
+    if args.diff_file:
+        changed = changed_lines_from_patch(unidiff.PatchSet.from_filename(args.diff_file))
+    else:
+        changed = await git_changed_lines(args.base)
+    selection = CoverageMap(args.coverage_map).select(changed, ignore_unmapped = args.ignore_unmapped)
+    print(format_test_selection(selection), file = sys.stderr)
+    for test_name in selection.tests:
+        print(test_name)
+
+
 async def html_fixup_cmd(args):
     await html_fixup(html_dir = args.html_dir)
 
@@ -1567,6 +2114,58 @@ async def main():
 
     html_fixup_parser.set_defaults(func = html_fixup_cmd)
 
+    test_impact_commands = subparsers.add_parser(
+        "test-impact", help = "Select tests affected by a change using per-test coverage"
+    )
+    test_impact_commands.set_defaults(func = print_help, parser = test_impact_commands)
+    test_impact_commands_subparsers = test_impact_commands.add_subparsers()
+    update_coverage_map_parser = test_impact_commands_subparsers.add_parser(
+        "update",
+        help = "Update a coverage map with the coverage of test cases which were run with their own raw profiles "
+        "(./test.py --mode coverage --coverage-map ...)",
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter,
+    )
+    update_coverage_map_parser.add_argument(
+        "--coverage-map", type = Path, required = True, help = "The coverage map file to update"
+    )
+    update_coverage_map_parser.add_argument(
+        "--profiles-path",
+        type = Path,
+        default = Path("build/coverage/test"),
+        help = "The directory with the test executables and their raw profiles",
+    )
+    update_coverage_map_parser.add_argument(
+        "--excludes-file",
+        type = Path,
+        default = None,
+        help = "A file with regexes of source files to ignore, one per line (e.g., coverage_excludes.txt)",
+    )
+    update_coverage_map_parser.add_argument(
+        "--clear-on-success", action = "store_true", help = "Remove the raw profiles once they are processed"
+    )
+    update_coverage_map_parser.set_defaults(func = update_coverage_map_cmd)
+
+    select_tests_parser = test_impact_commands_subparsers.add_parser(
+        "select",
+        help = "Print the tests whose covered lines are changed, compared to a base commit or by a diff file",
+        formatter_class = argparse.ArgumentDefaultsHelpFormatter,
+    )
+    select_tests_parser.add_argument(
+        "--coverage-map", type = Path, required = True, help = "The coverage map file"
+    )
+    select_tests_parser.add_argument(
+        "--base", "-b", type = str, default = "HEAD", help = "The commit to compare the working tree to"
+    )
+    select_tests_parser.add_argument(
+        "--diff-file", type = Path, default = None, help = "A diff made with `git diff -U0` to use instead of --base"
+    )
+    select_tests_parser.add_argument(
+        "--ignore-unmapped",
+        action = "store_true",
+        help = "Don't select all tests if a changed C++ source file isn't covered by any test",
+    )
+    select_tests_parser.set_defaults(func = select_tests_cmd)
+
     help_parser = subparsers.add_parser("help", help = "Print a full help message")
     help_parser.set_defaults(func = print_help, parser = parser)
     args = parser.parse_args()
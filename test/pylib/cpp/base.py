@@ -194,13 +194,18 @@ class CppTestCase(pytest.Item):
             is_switched_on=self.config.getoption("--gather-metrics"),
             test=self.make_testpy_test_object_mock(),
         )
+        env = self.parent.test_env
+        if self.parent.build_mode == "coverage" and self.config.getoption("--coverage-map"):
+            # Every test case gets its own raw profile, to know which lines are covered by which test case.
+            from test.pylib.coverage_utils import per_test_distinct_id
+            env = {**env, **coverage_script.env(self.parent.exe_path, distinct_id=per_test_distinct_id(self.name))}
         resource_gather.make_cgroup()
         process = resource_gather.run_process(
             args=[self.parent.exe_path, *test_args, *self.test_custom_args],
             timeout=TIMEOUT_DEBUG if self.parent.build_mode in DEBUG_MODES else TIMEOUT,
             output_file=output_file,
             cwd=TOP_SRC_DIR,
-            env=self.parent.test_env,
+            env=env,
         )
         resource_gather.write_metrics_to_db(
             metrics=resource_gather.get_test_metrics(),
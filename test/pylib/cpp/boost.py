@@ -12,6 +12,8 @@ import subprocess
 import tempfile
 import pathlib
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache, cached_property
 from itertools import chain
 from pathlib import Path
@@ -24,12 +26,24 @@ import allure
 from test.pylib.cpp.base import CppFile, CppTestFailure
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from concurrent.futures import Future
+
+    import pytest
 
     from test.pylib.cpp.base import CppTestCase
 
 
 COMBINED_TESTS = "combined_tests"
 
+# Test listings are cached in this directory next to the executables and used while an executable has the same
+# size, mtime and inode.  Bump the version if the format of the listings changes.
+LIST_CACHE_DIRNAME = ".test_lists"
+LIST_CACHE_VERSION = 1
+
+# Every xdist worker lists the executables it collects, so the threads listing them are shared by the workers.
+MAX_LIST_THREADS_PER_WORKER = 4
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,9 +70,23 @@ class BoostTestFile(CppFile):
 
         return self.test_name in self.suite_config.get("no_parallel_cases", [])
 
+    @classmethod
+    def pytest_collect_file(cls, file_path: pathlib.Path, parent: pytest.Collector) -> pytest.Collector | None:
+        collector = super().pytest_collect_file(file_path=file_path, parent=parent)
+        if collector is not None:
+            # All files of a directory are found before the first one is collected.
+            _collected_files.add(file_path)
+        return collector
+
     def list_test_cases(self) -> list[str]:
         if self.no_parallel:
             return [self.test_name]
+        executables = (self.build_basedir / path.stem
+                       for path in sorted(_collected_files) if path.parent == self.path.parent)
+        if not self.combined:
+            # This executable first, it's needed right now.
+            executables = chain([self.exe_path], executables)
+        prefetch_boost_test_lists(executables, config=self.config)
         return get_boost_test_list_json_content(executable=self.exe_path,combined=self.combined).get(self.test_name, [])
 
     def run_test_case(self, test_case: CppTestCase) -> tuple[list[CppTestFailure], Path] | tuple[None, Path]:
@@ -110,8 +138,99 @@ class BoostTestFile(CppFile):
 
 pytest_collect_file = BoostTestFile.pytest_collect_file
 
+
+def _executable_key(executable: pathlib.Path) -> dict[str, int]:
+    stat = executable.stat()
+    return {"version": LIST_CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+def _cached_listing(executable: pathlib.Path, kind: str, list_tests: Callable[[], dict]) -> dict:
+    """Return the listing of the executable saved on disk if the executable didn't change, otherwise run
+    `list_tests()` and save its result.
+    """
+    cache_path = executable.parent / LIST_CACHE_DIRNAME / f"{executable.name}.{kind}.json"
+    key = _executable_key(executable)
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["key"] == key:
+            return cached["tests"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tests = list_tests()
+
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"key": key, "tests": tests}, default=sorted), encoding="utf-8")
+        tmp_path.replace(cache_path)
+    except OSError as exc:
+        logger.warning("Failed to cache the test list of %s: %s", executable, exc)
+    return tests
+
+
+_collected_files: set[pathlib.Path] = set()
+_list_executor: ThreadPoolExecutor | None = None
+_list_futures: dict[pathlib.Path, Future] = {}
+_list_futures_lock = threading.Lock()
+
+
+def _shutdown_list_executor() -> None:
+    global _list_executor
+
+    with _list_futures_lock:
+        if _list_executor is not None:
+            _list_executor.shutdown(wait=False, cancel_futures=True)
+            _list_executor = None
+        _list_futures.clear()
+
+
+def prefetch_boost_test_lists(executables: Iterable[pathlib.Path], config: pytest.Config) -> None:
+    """Start listing the test executables in background threads.
+
+    Listing an executable which is not cached yet means running it, so it's done for all collected executables
+    of a suite at once when the first one is needed.  Listings not started by the end of the session are
+    cancelled.
+    """
+    global _list_executor
+
+    with _list_futures_lock:
+        if _list_executor is None:
+            workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+            _list_executor = ThreadPoolExecutor(
+                max_workers=max(1, min(MAX_LIST_THREADS_PER_WORKER, (os.cpu_count() or 1) // workers)),
+                thread_name_prefix="boost_list",
+            )
+            config.add_cleanup(_shutdown_list_executor)
+        for executable in executables:
+            if executable not in _list_futures and executable.is_file():
+                _list_futures[executable] = _list_executor.submit(_load_boost_test_list_json_content, executable)
+
+
 @cache
 def get_boost_test_list_json_content(executable: pathlib.Path, combined: bool = False)-> dict[str, list[list[str, set[str]]]]:
+    """
+    Same as _list_boost_test_json_content(), but the result is cached on disk, and the listing started by
+    prefetch_boost_test_lists() is used if there is one.
+    """
+    with _list_futures_lock:
+        future = None if combined else _list_futures.get(executable)
+    if future is not None:
+        return future.result()
+    return _load_boost_test_list_json_content(executable=executable, combined=combined)
+
+
+def _load_boost_test_list_json_content(executable: pathlib.Path,
+                                       combined: bool = False) -> dict[str, list[list[str, set[str]]]]:
+    tests = _cached_listing(
+        executable=executable,
+        kind="json_content.combined" if combined else "json_content",
+        list_tests=lambda: _list_boost_test_json_content(executable=executable, combined=combined),
+    )
+    return {name: [[test_name, set(labels)] for test_name, labels in test_list] for name, test_list in tests.items()}
+
+
+def _list_boost_test_json_content(executable: pathlib.Path, combined: bool = False)-> dict[str, list[list[str, set[str]]]]:
     """
     mimic get_boost_test_list_content but using --list_json_content which provides more structured data including test labels
 
@@ -161,6 +280,15 @@ def get_boost_test_list_json_content(executable: pathlib.Path, combined: bool =
 
 @cache
 def get_boost_test_list_content(executable: pathlib.Path, combined: bool = False) -> dict[str, list[str]]:
+    """Same as _list_boost_test_content(), but the result is cached on disk."""
+    return _cached_listing(
+        executable=executable,
+        kind="content.combined" if combined else "content",
+        list_tests=lambda: _list_boost_test_content(executable=executable, combined=combined),
+    )
+
+
+def _list_boost_test_content(executable: pathlib.Path, combined: bool = False) -> dict[str, list[str]]:
     """List the content of test tree in an executable.
 
     Return a dict where key is the name of test file and value is a list of tests in this file.  In case of
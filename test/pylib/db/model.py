@@ -14,6 +14,12 @@ class CgroupMetric:
     test_id: int
     host_id: str
     timestamp: datetime
+    # Percentage of time some tasks were stalled on the resource in the last 10 seconds (PSI `some avg10`).
+    cpu_pressure: float = None
+    io_pressure: float = None
+    memory_pressure: float = None
+    io_read_bytes: int = None
+    io_write_bytes: int = None
 
 
 @define
@@ -28,6 +34,19 @@ class Metric:
     time_taken: float = None
     usage_sec: float = None
     user_sec: float = None
+    # Total time some or all tasks were stalled on the resource (PSI `total`.)
+    cpu_pressure_some_sec: float = None
+    cpu_pressure_full_sec: float = None
+    io_pressure_some_sec: float = None
+    io_pressure_full_sec: float = None
+    memory_pressure_some_sec: float = None
+    memory_pressure_full_sec: float = None
+    # Maximal sampled `some avg10` pressure.
+    cpu_pressure_max: float = None
+    io_pressure_max: float = None
+    memory_pressure_max: float = None
+    io_read_bytes: int = None
+    io_write_bytes: int = None
 
 
 @define
@@ -46,3 +65,16 @@ class Test:
     mode: str
     run_id: int
     test_name: str
+
+
+@define
+class TestHistory:
+    directory: str
+    test_name: str
+    runs: int
+    time_taken: float
+    memory_peak: int = None
+    cpus: float = None
+    # Fraction of the test time some of its tasks were stalled on CPU or I/O.
+    cpu_pressure: float = None
+    io_pressure: float = None
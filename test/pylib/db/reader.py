@@ -0,0 +1,114 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+from pathlib import Path
+
+from test.pylib.db.model import TestHistory
+from test.pylib.db.writer import METRICS_TABLE, TESTS_TABLE
+
+
+logger = logging.getLogger(__name__)
+
+DB_NAME_PATTERN = 'sqlite_*.db'
+
+
+class SQLiteReader:
+    def __init__(self, database_path: Path):
+        """
+        Initializes the SQLiteReader object.
+
+        Args:
+            database_path: Path to the SQLite database file.
+        """
+        self.database_path = database_path
+
+    def get_test_history(self, mode: str) -> list[TestHistory]:
+        """
+        Aggregates metrics of successful test runs for the mode.
+
+        Args:
+            mode: Build mode of the tests.
+
+        Return:
+            list[TestHistory]: Average duration, maximal memory peak, average number of CPUs used and average
+                fractions of time stalled on CPU and I/O per test.
+        """
+        # Open the database read-only, other test.py instances can write to it at the same time.
+        with sqlite3.connect(f'file:{self.database_path}?mode=ro', uri=True, timeout=30) as conn:
+            # Databases of older runs may have no pressure columns.
+            columns = {row[1] for row in conn.execute(f'PRAGMA table_info({METRICS_TABLE})')}
+            pressure = {resource: f'AVG(m.{resource}_pressure_some_sec / NULLIF(m.time_taken, 0))'
+                                  if f'{resource}_pressure_some_sec' in columns else 'NULL'
+                        for resource in ('cpu', 'io')}
+            cursor = conn.execute(f'''
+                SELECT t.directory, t.test_name, COUNT(*), AVG(m.time_taken), MAX(CAST(m.memory_peak AS INTEGER)),
+                       AVG(m.usage_sec / NULLIF(m.time_taken, 0)), {pressure['cpu']}, {pressure['io']}
+                FROM {TESTS_TABLE} t JOIN {METRICS_TABLE} m ON m.test_id = t.id
+                WHERE t.mode = ? AND m.success AND m.time_taken IS NOT NULL
+                GROUP BY t.directory, t.test_name
+            ''', (mode,))
+            return [TestHistory(directory=directory, test_name=strip_run_suffix(test_name, mode), runs=runs,
+                                time_taken=time_taken, memory_peak=memory_peak, cpus=cpus,
+                                cpu_pressure=cpu_pressure, io_pressure=io_pressure)
+                    for directory, test_name, runs, time_taken, memory_peak, cpus, cpu_pressure, io_pressure
+                    in cursor.fetchall()]
+
+
+def strip_run_suffix(test_name: str, mode: str) -> str:
+    """Remove `.{mode}.{run_id}` suffix added to names of pytest items, it is different between runs."""
+    return re.sub(rf'\.{re.escape(mode)}\.\d+$', '', test_name)
+
+
+def read_test_history(tmpdir: Path, mode: str) -> dict[tuple[str, str], TestHistory]:
+    """
+    Reads history of the tests for the mode from all metrics databases found in `tmpdir`.
+
+    Every test.py run writes its own database (see DEFAULT_DB_NAME), so results of the previous runs are
+    merged here: durations, CPU usage and pressure are weighted by the number of runs, memory peak is the maximum seen.
+
+    Return:
+        dict: TestHistory by (directory, test_name).
+    """
+    history: dict[tuple[str, str], TestHistory] = {}
+    for database_path in sorted(tmpdir.glob(DB_NAME_PATTERN)):
+        try:
+            records = SQLiteReader(database_path).get_test_history(mode)
+        except sqlite3.Error as e:
+            logger.warning('Unable to read tests history from %s: %s', database_path, e)
+            continue
+        for record in records:
+            key = (record.directory, record.test_name)
+            if (known := history.get(key)) is None:
+                history[key] = record
+                continue
+            runs = known.runs + record.runs
+            known.time_taken = (known.time_taken * known.runs + record.time_taken * record.runs) / runs
+            for field in ('cpus', 'cpu_pressure', 'io_pressure'):
+                if (value := getattr(record, field)) is not None:
+                    known_value = getattr(known, field)
+                    setattr(known, field, value if known_value is None else
+                            (known_value * known.runs + value * record.runs) / runs)
+            known.runs = runs
+            if record.memory_peak is not None:
+                known.memory_peak = max(known.memory_peak or 0, record.memory_peak)
+    return history
+
+
+def has_test_history(tmpdir: Path) -> bool:
+    """Check if there are metrics of any test runs in `tmpdir`."""
+    for database_path in tmpdir.glob(DB_NAME_PATTERN):
+        try:
+            with sqlite3.connect(f'file:{database_path}?mode=ro', uri=True, timeout=30) as conn:
+                if conn.execute(f'SELECT 1 FROM {METRICS_TABLE} LIMIT 1').fetchone():
+                    return True
+        except sqlite3.Error:
+            continue
+    return False
@@ -4,9 +4,14 @@
 # SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
 #
 
+import atexit
 import datetime
+import logging
+import queue
 import sqlite3
 import os
+import threading
+import time
 from typing import List
 from multiprocessing import Lock
 from contextlib import contextmanager
@@ -22,6 +27,10 @@ SYSTEM_RESOURCE_METRICS_TABLE = 'system_resource_metrics'
 CGROUP_MEMORY_METRICS_TABLE = 'cgroup_memory_metrics'
 DEFAULT_DB_NAME = f'sqlite_{HOST_ID}.db'
 DATE_TIME_TEMPLATE = '%Y-%m-%d %H:%M:%S.%f'
+FLUSH_INTERVAL = 1.0  # seconds
+MAX_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
 
 create_table = [
     f'''
@@ -75,6 +84,30 @@ create_table = [
     '''
 ]
 
+# Columns added after the tables above: they are added to the tables of databases created before.
+added_columns = {
+    METRICS_TABLE: {
+        'cpu_pressure_some_sec': 'REAL',
+        'cpu_pressure_full_sec': 'REAL',
+        'io_pressure_some_sec': 'REAL',
+        'io_pressure_full_sec': 'REAL',
+        'memory_pressure_some_sec': 'REAL',
+        'memory_pressure_full_sec': 'REAL',
+        'cpu_pressure_max': 'REAL',
+        'io_pressure_max': 'REAL',
+        'memory_pressure_max': 'REAL',
+        'io_read_bytes': 'INTEGER',
+        'io_write_bytes': 'INTEGER',
+    },
+    CGROUP_MEMORY_METRICS_TABLE: {
+        'cpu_pressure': 'REAL',
+        'io_pressure': 'REAL',
+        'memory_pressure': 'REAL',
+        'io_read_bytes': 'INTEGER',
+        'io_write_bytes': 'INTEGER',
+    },
+}
+
 def adapt_datetime_iso(val):
     """Adapt datetime.datetime to timezone-naive ISO 8601 date."""
     return val.isoformat()
@@ -82,6 +115,83 @@ def adapt_datetime_iso(val):
 sqlite3.register_adapter(datetime.datetime, adapt_datetime_iso)
 
 
+class _BatchWriter:
+    """
+    The single writer of queued rows to a database in this process.
+
+    A dedicated thread takes rows from the queue and inserts them with executemany(), a batch per
+    transaction: everything queued within FLUSH_INTERVAL seconds, up to MAX_BATCH_SIZE rows.  Putting
+    an event into the queue makes the thread write the rows queued before it right away and set the event.
+    """
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        connection = sqlite3.connect(self.database_path, timeout=30)
+        connection.execute('PRAGMA foreign_keys=ON')
+        connection.execute('PRAGMA synchronous=off')
+        while True:
+            items = [self.queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while not isinstance(items[-1], threading.Event) and len(items) < MAX_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._insert(connection, [item for item in items if not isinstance(item, threading.Event)])
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, rows: list[tuple[str, tuple[str, ...], tuple]]) -> None:
+        # Rows of the same table with the same columns are inserted by one statement.
+        groups: dict[tuple[str, tuple[str, ...]], list[tuple]] = {}
+        for table_name, columns, values in rows:
+            groups.setdefault((table_name, columns), []).append(values)
+        try:
+            with SQLiteWriter._lock, connection:
+                for (table_name, columns), values in groups.items():
+                    placeholders = ', '.join(['?'] * len(columns))
+                    connection.executemany(
+                        f'INSERT INTO {table_name} ({", ".join(columns)}) VALUES ({placeholders})', values)
+        except sqlite3.Error as e:
+            logger.error('Failed to write %d rows to %s: %s', len(rows), connection, e)
+
+    def flush(self) -> None:
+        """Wait until all rows queued so far are written."""
+        if self.thread.is_alive():
+            written = threading.Event()
+            self.queue.put(written)
+            written.wait()
+
+
+_batch_writers: dict[tuple[int, str], _BatchWriter] = {}
+_batch_writers_lock = threading.Lock()
+
+
+def _get_batch_writer(database_path) -> _BatchWriter:
+    # The writer thread doesn't survive fork(), so there is a writer per process.
+    key = (os.getpid(), str(database_path))
+    with _batch_writers_lock:
+        if key not in _batch_writers:
+            _batch_writers[key] = _BatchWriter(database_path)
+        return _batch_writers[key]
+
+
+@atexit.register
+def _flush_batch_writers() -> None:
+    for (pid, _), batch_writer in list(_batch_writers.items()):
+        if pid == os.getpid():
+            batch_writer.flush()
+
 
 class SQLiteWriter:
     _lock = Lock()
@@ -102,8 +212,21 @@ class SQLiteWriter:
             cursor = conn.cursor()
             cursor.execute('PRAGMA foreign_keys=ON')
             cursor.execute('PRAGMA synchronous=off')
+            # Let readers and the writers of other processes work concurrently.
+            cursor.execute('PRAGMA journal_mode=WAL')
             for table in create_table:
                 cursor.execute(table)
+            for table_name, columns in added_columns.items():
+                existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table_name})')}
+                for column, column_type in columns.items():
+                    if column in existing:
+                        continue
+                    try:
+                        cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN {column} {column_type}')
+                    except sqlite3.OperationalError as e:
+                        # Another process could add it first.
+                        if 'duplicate column' not in str(e):
+                            raise
             conn.commit()
 
     @contextmanager
@@ -169,14 +292,41 @@ class SQLiteWriter:
 
     def write_multiple_rows(self, data_list: List[AttrsInstance], table_name: str) -> None:
         """
-        Inserts multiple rows of data into the specified table.
+        Inserts multiple rows of data into the specified table in one transaction.
+
+        Args:
+            data_list: A list of AttrsInstance objects of the same type, each representing a row of data.
+            table_name: Name of the table where data is being written.
+        """
+        if not data_list:
+            return
+        rows = [asdict(model) for model in data_list]
+        columns = ', '.join(rows[0].keys())
+        placeholders = ', '.join(['?'] * len(rows[0]))
+        with self._lock:
+            with self.get_cursor() as cursor:
+                cursor.executemany(f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})',
+                                   [tuple(row.values()) for row in rows])
+
+    def queue_row(self, model, table_name: str) -> None:
+        """
+        Queues a row to be inserted into the specified table by the writer thread of the process.
+
+        Rows are written in batches in the background, so this is cheap enough to be called for every
+        sample of a monitor.  Use flush() to make sure queued rows are written.
 
         Args:
-            data_list: A list of AttrsInstance objects, each representing a row of data.
+            model: A AttrsInstance object with a data to insert.
             table_name: Name of the table where data is being written.
         """
-        for model in data_list:
-            self.write_row(model, table_name)
+        data = asdict(model)
+        _get_batch_writer(self.database_path).queue.put((table_name, tuple(data.keys()), tuple(data.values())))
+
+    def flush(self) -> None:
+        """
+        Waits until all rows queued by this process are written.
+        """
+        _get_batch_writer(self.database_path).flush()
 
     def write_row_if_not_exist(self, model, table_name: str) -> int:
         """
@@ -59,6 +59,8 @@ class HostRegistry:
         # locked and reused.
         worker_id = os.getenv('PYTEST_XDIST_WORKER', 'gw0')
         second_octet = int(worker_id[2:]) + 1
+        # 127.255.*.* is used by throwaway clusters of cluster templates (see cluster_template.py.)
+        assert second_octet < 255, f"too many xdist workers to give each one its own subnet: {worker_id}"
         # HostRegistry is a singleton, so there should be no possibility to mess and overlap in IP for one use
         # however, when there are several users using the same machine for testing, they can overlap,
         # so this simple retry should help to eliminate the overlap and just find another random IP
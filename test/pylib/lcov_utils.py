@@ -5,8 +5,13 @@
 #
 # SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
 #
+import bisect
+import re
 import unidiff
+from array import array
 from typing import (
+    Iterable,
+    Iterator,
     List,
     OrderedDict as OrderedDictType,
     Tuple,
@@ -18,12 +23,13 @@ from typing import (
     Mapping,
 )
 from collections import OrderedDict
+from collections.abc import MutableMapping
 from pathlib import Path
 import unidiff.patch
 from unidiff import PatchSet, PatchedFile
 from unidiff.patch import Hunk, Line
 import copy
-from itertools import repeat, accumulate
+from itertools import repeat, accumulate, compress
 
 # TN: test name
 # SF: source file path
@@ -58,6 +64,129 @@ class MakeLcovRouter(type):
         return super().__new__(cls, name, bases, dct)
 
 
+# Line and branch hits are kept in typed arrays instead of dicts of Python ints, a trace of a whole test
+# suite has millions of them.  Line hits are indexed by the line number, ABSENT marks lines which are not
+# in the record.  Branches are kept sorted by (line, block, branch), packed into a single int, with their
+# counts in a parallel array, NOT_EVALUATED stands for the "-" count.
+ABSENT = -1
+NOT_EVALUATED = -1
+BRANCH_ID_BITS = 20
+BRANCH_ID_MASK = (1 << BRANCH_ID_BITS) - 1
+MAX_LINE = 1 << (63 - 2 * BRANCH_ID_BITS)
+
+
+def pack_branch(line: int, block: int, branch: int) -> int:
+    assert 0 <= line < MAX_LINE and 0 <= block <= BRANCH_ID_MASK and 0 <= branch <= BRANCH_ID_MASK
+    return (line << (2 * BRANCH_ID_BITS)) | (block << BRANCH_ID_BITS) | branch
+
+
+def unpack_branch(key: int) -> Tuple[int, int, int]:
+    return key >> (2 * BRANCH_ID_BITS), (key >> BRANCH_ID_BITS) & BRANCH_ID_MASK, key & BRANCH_ID_MASK
+
+
+def branch_line(key: int) -> int:
+    return key >> (2 * BRANCH_ID_BITS)
+
+
+def _absent_lines(count: int) -> array:
+    return array("q", [ABSENT]) * count
+
+
+def _padded(hits: array, size: int) -> array:
+    return hits + _absent_lines(size - len(hits)) if len(hits) < size else hits
+
+
+def _trimmed(hits: array) -> array:
+    end = len(hits)
+    while end > 0 and hits[end - 1] == ABSENT:
+        end -= 1
+    return hits[:end]
+
+
+class LineHits(MutableMapping):
+    """A dict-like view of the line hits of a record: line number -> hits."""
+
+    def __init__(self, record: "LcovRecord"):
+        self.record = record
+
+    def __getitem__(self, line: int) -> int:
+        hits = self.record._line_hits
+        if 0 <= line < len(hits) and hits[line] != ABSENT:
+            return hits[line]
+        raise KeyError(line)
+
+    def __setitem__(self, line: int, value: int):
+        hits = self.record._line_hits
+        if line >= len(hits):
+            hits.extend(repeat(ABSENT, line + 1 - len(hits)))
+        hits[line] = value
+
+    def __delitem__(self, line: int):
+        self[line]
+        self.record._line_hits[line] = ABSENT
+
+    def __contains__(self, line) -> bool:
+        hits = self.record._line_hits
+        return 0 <= line < len(hits) and hits[line] != ABSENT
+
+    def __iter__(self) -> Iterator[int]:
+        return (line for line, hits in enumerate(self.record._line_hits) if hits != ABSENT)
+
+    def __len__(self) -> int:
+        return len(self.record._line_hits) - self.record._line_hits.count(ABSENT)
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return ((line, hits) for line, hits in enumerate(self.record._line_hits) if hits != ABSENT)
+
+    def __eq__(self, other) -> bool:
+        return dict(self.items()) == dict(other.items())
+
+
+class BranchHits(MutableMapping):
+    """A dict-like view of the branch hits of a record: (line, block, branch) -> hits or None."""
+
+    def __init__(self, record: "LcovRecord"):
+        self.record = record
+
+    def _find(self, key: Tuple[int, int, int]) -> Tuple[int, int, bool]:
+        packed = pack_branch(*key)
+        keys = self.record._branch_keys
+        i = bisect.bisect_left(keys, packed)
+        return packed, i, i < len(keys) and keys[i] == packed
+
+    def __getitem__(self, key: Tuple[int, int, int]) -> Optional[int]:
+        _, i, found = self._find(key)
+        if not found:
+            raise KeyError(key)
+        count = self.record._branch_counts[i]
+        return None if count == NOT_EVALUATED else count
+
+    def __setitem__(self, key: Tuple[int, int, int], value: Optional[int]):
+        packed, i, found = self._find(key)
+        count = NOT_EVALUATED if value is None else value
+        if found:
+            self.record._branch_counts[i] = count
+        else:
+            self.record._branch_keys.insert(i, packed)
+            self.record._branch_counts.insert(i, count)
+
+    def __delitem__(self, key: Tuple[int, int, int]):
+        _, i, found = self._find(key)
+        if not found:
+            raise KeyError(key)
+        del self.record._branch_keys[i]
+        del self.record._branch_counts[i]
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return map(unpack_branch, self.record._branch_keys)
+
+    def __len__(self) -> int:
+        return len(self.record._branch_keys)
+
+    def __eq__(self, other) -> bool:
+        return dict(self.items()) == dict(other.items())
+
+
 class LcovRecord(metaclass = MakeLcovRouter):
     routes = [
         "TN",
@@ -78,11 +207,12 @@ class LcovRecord(metaclass = MakeLcovRouter):
     def __init__(self) -> None:
         self._test_name: Optional[str] = None
         self.source_file: Optional[Path] = None
-        self.line_hits: dict[int, int] = dict()
+        self._line_hits = array("q")
 
         self.function_hits: dict[Tuple(int, str), int] = dict()
         self.functions_to_lines: dict[str, int] = dict()
-        self.branch_hits: dict[Tuple[int, int, int], Optional[int]] = dict()
+        self._branch_keys = array("q")
+        self._branch_counts = array("q")
         self.sealed: bool = False
         self.FNF = None
         self.FNH = None
@@ -91,10 +221,83 @@ class LcovRecord(metaclass = MakeLcovRouter):
         self.LF = None
         self.LH = None
 
+    # The patterns start with a literal newline, so the regex engine can skip to the line starts quickly.
+    BRDA_RE = re.compile(r"\nBRDA:(\d+),(\d+),(\d+),(-|\d+)[ \t\r]*(?=\n)")
+    FN_RE = re.compile(r"\nFN:(\d+),([^,\s]+)[ \t\r]*(?=\n)")
+    FNDA_RE = re.compile(r"\nFNDA:(\d+),([^,\s]+)[ \t\r]*(?=\n)")
+    DATA_RE = re.compile(r"\n(?:" + "|".join(pattern.pattern[2:] for pattern in (BRDA_RE, FN_RE, FNDA_RE)) + ")")
+
+    @classmethod
+    def parse(cls, text: str) -> Self:
+        """Parse a record from its text without the end_of_record line.
+
+        This is the fast path of LcovFile.load().  DA lines (the vast majority) are cut out of the text with
+        str.split() and converted to the array at once, BRDA, FN and FNDA lines are matched by regular
+        expressions over the whole text, and the rest goes through add_line().
+        """
+        record = cls()
+        head, *da_lines = ("\n" + text).split("\nDA:")
+        other_lines = [head]
+        for i in [i for i, da_line in enumerate(da_lines) if "\n" in da_line]:
+            da_lines[i], tail = da_lines[i].split("\n", 1)
+            other_lines.append(tail)
+        text = "\n" + "\n".join(other_lines) + "\n"
+        for line in cls.DATA_RE.sub("", text).splitlines():
+            if line.strip():
+                record.add_line(line)
+        functions_to_lines = record.functions_to_lines
+        function_hits = record.function_hits
+        for line, func_name in cls.FN_RE.findall(text):
+            assert func_name not in functions_to_lines
+            line = int(line)
+            functions_to_lines[func_name] = line
+            function_hits.setdefault((line, func_name), 0)
+        for hits, func_name in cls.FNDA_RE.findall(text):
+            function_hits[(functions_to_lines[func_name], func_name)] = int(hits)
+        if da_lines:
+            da = array("q", map(int, ",".join(da_lines).split(",")))
+            assert len(da) == 2 * len(da_lines), "DA lines are expected to have two fields: line number, hits"
+            lines = da[0::2]
+            line_hits = _padded(record._line_hits, max(lines) + 1)
+            # The first hits of a line count, as in add_DA()
+            for line, hits in zip(reversed(lines), reversed(da[1::2])):
+                line_hits[line] = hits
+            record._line_hits = line_hits
+        branches = dict()
+        for line, block, branch, count in reversed(cls.BRDA_RE.findall(text)):
+            # The first count of a branch counts, as in add_BRDA()
+            branches[pack_branch(int(line), int(block), int(branch))] = int(count) if count != "-" else NOT_EVALUATED
+        if branches:
+            keys = sorted(branches)
+            record._branch_keys = array("q", keys)
+            record._branch_counts = array("q", map(branches.__getitem__, keys))
+        record.add_end_of_record([])
+        return record
+
+    @property
+    def line_hits(self) -> LineHits:
+        return LineHits(self)
+
+    @line_hits.setter
+    def line_hits(self, line_hits: Mapping[int, int]):
+        self._line_hits = array("q")
+        view = LineHits(self)
+        for line, hits in line_hits.items():
+            view[line] = hits
+
+    @property
+    def branch_hits(self) -> BranchHits:
+        return BranchHits(self)
+
+    @branch_hits.setter
+    def branch_hits(self, branch_hits: Mapping[Tuple[int, int, int], Optional[int]]):
+        counts = {pack_branch(*key): NOT_EVALUATED if hits is None else hits for key, hits in branch_hits.items()}
+        keys = sorted(counts)
+        self._branch_keys = array("q", keys)
+        self._branch_counts = array("q", map(counts.__getitem__, keys))
+
     def empty(self):
-        return (
-            len(self.line_hits) + len(self.function_hits) + len(self.branch_hits)
-        ) == 0
+        return (self.lines_found + len(self.function_hits) + self.branches_found) == 0
 
     @property
     def test_name(self):
@@ -110,19 +313,20 @@ class LcovRecord(metaclass = MakeLcovRouter):
 
     @property
     def branches_found(self):
-        return len(self.branch_hits)
+        return len(self._branch_keys)
 
     @property
     def branches_hit(self):
-        return sum([int(bool(hits and hits > 0)) for hits in self.branch_hits.values()])
+        counts = self._branch_counts
+        return len(counts) - counts.count(NOT_EVALUATED) - counts.count(0)
 
     @property
     def lines_found(self):
-        return len(self.line_hits)
+        return len(self._line_hits) - self._line_hits.count(ABSENT)
 
     @property
     def lines_hit(self):
-        return sum([int(hits and hits > 0) for hits in self.line_hits.values()])
+        return self.lines_found - self._line_hits.count(0)
 
     def add(self, type_str: str, fields: List[str]):
         assert not self.sealed
@@ -199,11 +403,13 @@ class LcovRecord(metaclass = MakeLcovRouter):
         self._refresh_functions_to_lines()
         return True
 
-    def remove_lines(self, line_numbers: List[int]):
+    def remove_lines(self, line_numbers: Iterable[int]):
         self.validate_integrity()
+        line_numbers = set(line_numbers)
+        hits = self._line_hits
         for line_number in line_numbers:
-            if line_number in self.line_hits:
-                del self.line_hits[line_number]
+            if 0 <= line_number < len(hits):
+                hits[line_number] = ABSENT
         functions_to_remove = list(
             {
                 (line, func_name)
@@ -214,42 +420,40 @@ class LcovRecord(metaclass = MakeLcovRouter):
         for key in functions_to_remove:
             del self.function_hits[key]
             del self.functions_to_lines[key[1]]
-        branches_to_remove = [
-            branch for branch in self.branch_hits if branch[0] in line_numbers
-        ]
-        for branch in branches_to_remove:
-            del self.branch_hits[branch]
+        self.remove_branches(line_numbers)
         self.validate_integrity()
 
     def remove_line(self, line_number: int):
         self.remove_lines([line_number])
 
-    def remove_branches(self, branch_line_numbers: List[int]):
-        branch_keys_to_remove = {
-            key for key in self.branch_hits.keys() if key[0] in branch_line_numbers
-        }
-        for branch_to_remove in branch_keys_to_remove:
-            del self.branch_hits[branch_to_remove]
+    def remove_branches(self, branch_line_numbers: Iterable[int]):
+        branch_line_numbers = set(branch_line_numbers)
+        self._filter_branches(
+            [branch_line(key) not in branch_line_numbers for key in self._branch_keys]
+        )
 
     def remove_branch(self, branch_line):
         self.remove_branches([branch_line])
 
+    def _filter_branches(self, keep: List[bool]):
+        self._branch_keys = array("q", compress(self._branch_keys, keep))
+        self._branch_counts = array("q", compress(self._branch_counts, keep))
+
     def validate_integrity(self):
-        assert (
-            len(set(self.functions_to_lines.values()) - set(self.line_hits.keys())) == 0
+        hits = self._line_hits
+        assert all(
+            0 <= line < len(hits) and hits[line] != ABSENT
+            for line in set(self.functions_to_lines.values())
         )
-        assert (
-            len(
-                set([x[0] for x in self.branch_hits.keys()])
-                - set(self.line_hits.keys())
-            )
-            == 0
+        assert all(
+            line < len(hits) and hits[line] != ABSENT
+            for line in set(map(branch_line, self._branch_keys))
         )
 
     def get_lines(self) -> set[int]:
-        return set(self.line_hits.keys())
+        return set(self.line_hits)
 
-    def filter_lines(self, lines: List[int]):
+    def filter_lines(self, lines: Iterable[int]):
         self.remove_lines(self.get_lines().difference(set(lines)))
         self._refresh_functions_to_lines()
 
@@ -259,33 +463,36 @@ class LcovRecord(metaclass = MakeLcovRouter):
         # First filter all the None mapped lines
         lines_to_keep = self.get_lines().intersection(set(lines_mapping.keys()))
         self.filter_lines(lines_to_keep)
-        line_hits = self.line_hits
-        self.line_hits = dict()
-        for line, hits in line_hits.items():
-            new_line = lines_mapping[line]
-            self.line_hits[new_line] = hits
+        line_hits = list(self.line_hits.items())
+        self._line_hits = array("q")
+        view = self.line_hits
+        for line, hits in line_hits:
+            view[lines_mapping[line]] = hits
         function_hits = self.function_hits
         self.function_hits = dict()
         for (line, func_name), hits in function_hits.items():
             new_key = (lines_mapping[line], func_name)
             self.function_hits[new_key] = hits
-        branch_hits = self.branch_hits
-        self.branch_hits = dict()
-        for (line, block, branch), count in branch_hits.items():
-            new_key = (lines_mapping[line], block, branch)
-            self.branch_hits[new_key] = count
+        self.branch_hits = {
+            (lines_mapping[line], block, branch): count
+            for (line, block, branch), count in self.branch_hits.items()
+        }
 
     def transform_line_hitrates(self, transform: Callable[[Optional[int]], int]):
-        for line in self.line_hits.keys():
-            self.line_hits[line] = transform(self.line_hits[line])
+        self._line_hits = array(
+            "q", [transform(hits) if hits != ABSENT else ABSENT for hits in self._line_hits]
+        )
 
     def transform_function_hitrates(self, transform: Callable[[Optional[int]], int]):
         for key in self.function_hits.keys():
             self.function_hits[key] = transform(self.function_hits[key])
 
     def transform_branch_hitrates(self, transform: Callable[[Optional[int]], int]):
-        for key in self.branch_hits.keys():
-            self.branch_hits[key] = transform(self.branch_hits[key])
+        def transform_count(count: int) -> int:
+            count = transform(None if count == NOT_EVALUATED else count)
+            return NOT_EVALUATED if count is None else count
+
+        self._branch_counts = array("q", map(transform_count, self._branch_counts))
 
     def transform_hitrates(self, transform: Callable[[Optional[int]], int]):
         self.transform_line_hitrates(transform)
@@ -294,10 +501,11 @@ class LcovRecord(metaclass = MakeLcovRouter):
 
     def _get_branches_line_hitrate(self) -> Mapping[int, int]:
         this_branch_line_hits = dict()
-        for key in self.branch_hits.keys():
-            this_branch_line_hits.setdefault(key[0], 0)
-            if self.branch_hits[key] is not None:
-                this_branch_line_hits[key[0]] += self.branch_hits[key]
+        for key, count in zip(self._branch_keys, self._branch_counts):
+            line = branch_line(key)
+            this_branch_line_hits.setdefault(line, 0)
+            if count != NOT_EVALUATED:
+                this_branch_line_hits[line] += count
         return this_branch_line_hits
 
     def _refresh_functions_to_lines(self):
@@ -312,22 +520,37 @@ class LcovRecord(metaclass = MakeLcovRouter):
         Arguments:
             other {Self} -- the other component to union with
         """
-        for line in other.line_hits.keys():
-            if line not in self.line_hits:
-                self.line_hits[line] = other.line_hits[line]
-            else:
-                self.line_hits[line] += other.line_hits[line]
+        size = max(len(self._line_hits), len(other._line_hits))
+        self._line_hits = array(
+            "q",
+            [
+                this if that == ABSENT else that if this == ABSENT else this + that
+                for this, that in zip(_padded(self._line_hits, size), _padded(other._line_hits, size))
+            ],
+        )
         for key in other.function_hits.keys():
             if key not in self.function_hits:
                 self.function_hits[key] = other.function_hits[key]
             else:
                 self.function_hits[key] += other.function_hits[key]
         self._refresh_functions_to_lines()
-        for key in other.branch_hits.keys():
-            if key not in self.branch_hits or self.branch_hits[key] is None:
-                self.branch_hits[key] = other.branch_hits[key]
-            elif other.branch_hits[key] is not None:
-                self.branch_hits[key] += other.branch_hits[key]
+        if self._branch_keys == other._branch_keys:
+            # The common case of records of the same source built the same way
+            self._branch_counts = array(
+                "q",
+                [
+                    that if this == NOT_EVALUATED else this if that == NOT_EVALUATED else this + that
+                    for this, that in zip(self._branch_counts, other._branch_counts)
+                ],
+            )
+        elif len(other._branch_keys) > 0:
+            counts = dict(zip(self._branch_keys, self._branch_counts))
+            for key, that in zip(other._branch_keys, other._branch_counts):
+                this = counts.get(key, NOT_EVALUATED)
+                counts[key] = that if this == NOT_EVALUATED else this if that == NOT_EVALUATED else this + that
+            keys = sorted(counts)
+            self._branch_keys = array("q", keys)
+            self._branch_counts = array("q", map(counts.__getitem__, keys))
         return self
 
     def intersection(self, other: Self) -> Self:
@@ -343,20 +566,14 @@ class LcovRecord(metaclass = MakeLcovRouter):
         Arguments:
             other {Self} -- the other component to intersect with
         """
-        covered_lines = dict()
-        lines_to_merge = self.get_lines().intersection(other.get_lines())
-        lines_to_merge = [
-            line
-            for line in lines_to_merge
-            if self.line_hits[line] > 0 and other.line_hits[line] > 0
-        ]
-        if other == self:
-            for line in lines_to_merge:
-                covered_lines[line] = self.line_hits[line]
-        else:
-            for line in lines_to_merge:
-                covered_lines[line] = self.line_hits[line] + other.line_hits[line]
-        self.line_hits = covered_lines
+        same = other == self
+        self._line_hits = array(
+            "q",
+            [
+                (this if same else this + that) if this > 0 and that > 0 else ABSENT
+                for this, that in zip(self._line_hits, other._line_hits)
+            ],
+        )
         covered_functions = dict()
         functions_to_merge = set(self.function_hits.keys()).intersection(
             set(other.function_hits.keys())
@@ -367,7 +584,7 @@ class LcovRecord(metaclass = MakeLcovRouter):
             if self.function_hits[(line, func_name)] > 0
             and other.function_hits[(line, func_name)] > 0
         ]
-        if other == self:
+        if same:
             for key in functions_to_merge:
                 covered_functions[key] = self.function_hits[key]
         else:
@@ -377,45 +594,22 @@ class LcovRecord(metaclass = MakeLcovRouter):
                 )
         self.function_hits = covered_functions
         self._refresh_functions_to_lines()
-        covered_branches = dict()
         # for branches, count hits per line
-        this_branch_line_hits = dict()
-        for key in self.branch_hits.keys():
-            if self.branch_hits[key] is not None:
-                this_branch_line_hits.setdefault(key[0], 0)
-                this_branch_line_hits[key[0]] += self.branch_hits[key]
-        other_branch_line_hits = dict()
-        for key in other.branch_hits.keys():
-            if other.branch_hits[key] is not None:
-                other_branch_line_hits.setdefault(key[0], 0)
-                other_branch_line_hits[key[0]] += other.branch_hits[key]
-        this_branch_line_hits = {
-            key
-            for key in this_branch_line_hits.keys()
-            if this_branch_line_hits[key] > 0
-        }
-        other_branch_line_hits = {
-            key
-            for key in other_branch_line_hits.keys()
-            if other_branch_line_hits[key] > 0
-        }
-        branches_lines_to_merge = this_branch_line_hits.intersection(
-            other_branch_line_hits
+        this_branch_lines = {line for line, hits in self._get_branches_line_hitrate().items() if hits > 0}
+        other_branch_lines = {line for line, hits in other._get_branches_line_hitrate().items() if hits > 0}
+        branches_lines_to_merge = this_branch_lines.intersection(other_branch_lines)
+        other_counts = dict(zip(other._branch_keys, other._branch_counts))
+        keep = [branch_line(key) in branches_lines_to_merge for key in self._branch_keys]
+        self._filter_branches(keep)
+        self._branch_counts = array(
+            "q",
+            [
+                that if this == NOT_EVALUATED else this if that == NOT_EVALUATED else this + that
+                for this, that in zip(
+                    self._branch_counts, map(other_counts.get, self._branch_keys, repeat(NOT_EVALUATED))
+                )
+            ],
         )
-        for key in self.branch_hits.keys():
-            if key[0] not in branches_lines_to_merge:
-                continue
-            this_hits = self.branch_hits[key]
-            other_hits = other.branch_hits[key]
-            if this_hits is None and other_hits is None:
-                covered_branches[key] = None
-            elif this_hits is None:
-                covered_branches[key] = other_hits
-            elif other_hits is None:
-                covered_branches[key] = this_hits
-            else:
-                covered_branches[key] = this_hits + other_hits
-        self.branch_hits = covered_branches
         return self
 
     def difference(self, other: Self) -> Self:
@@ -431,17 +625,15 @@ class LcovRecord(metaclass = MakeLcovRouter):
         Arguments:
             other {Self} -- the other component to intersect with
         """
-        # first remove every line that is not covered by self (at all)
-        self.remove_lines([line for line, hits in self.line_hits.items() if hits <= 0])
-        # remove every line that is covered by both
-        this_covered_lines = {
-            key for key in self.line_hits.keys() if self.line_hits[key] > 0
-        }
-        other_covered_lines = {
-            key for key in other.line_hits.keys() if other.line_hits[key] > 0
-        }
-        lines_to_remove = this_covered_lines.intersection(other_covered_lines)
-        self.remove_lines(lines_to_remove)
+        # remove every line that is not covered by self (at all) and every line that is covered by both
+        other_hits = _padded(other._line_hits, len(self._line_hits))
+        self.remove_lines(
+            [
+                line
+                for line, (this, that) in enumerate(zip(self._line_hits, other_hits))
+                if this != ABSENT and (this <= 0 or that > 0)
+            ]
+        )
         self._refresh_functions_to_lines()
         # first remove every function that is not covered by self (at all)
         for key in list(self.function_hits.keys()):
@@ -460,29 +652,28 @@ class LcovRecord(metaclass = MakeLcovRouter):
         for key in functions_to_remove:
             del self.function_hits[key]
         self._refresh_functions_to_lines()
-        # first remove every line that is not hit at all
-        branch_line_hits = self._get_branches_line_hitrate()
-        branches_lines_with_hits = {
-            line for key, line in branch_line_hits.items() if branch_line_hits[key] > 0
-        }
-        for key in list(self.branch_hits.keys()):
-            if key[0] not in branch_line_hits:
-                del self.branch_hits[key]
-        for key, hits in list(self.branch_hits.items()):
-            covered_by_this = bool(self.branch_hits[key])
-            covered_by_other = (
-                bool(other.branch_hits[key]) if key in other.branch_hits else False
-            )
-            covered_by_both = covered_by_this and covered_by_other
-            # covered by both
-            if covered_by_both:
-                self.branch_hits[key] = None
+        other_counts = dict(zip(other._branch_keys, other._branch_counts))
+
+        def difference_count(this: int, that: int) -> int:
+            covered_by_this = this > 0
+            covered_by_other = that > 0
+            if covered_by_this and covered_by_other:
+                return NOT_EVALUATED
             elif covered_by_this:  # Only covered by this
-                pass
+                return this
             elif covered_by_other:
-                self.branch_hits[key] = 0
+                return 0
             else:  # covered by neither
-                self.branch_hits[key] = None
+                return NOT_EVALUATED
+
+        self._branch_counts = array(
+            "q",
+            map(
+                difference_count,
+                self._branch_counts,
+                map(other_counts.get, self._branch_keys, repeat(NOT_EVALUATED)),
+            ),
+        )
         return self
 
     def symmetric_difference(self, other: Self) -> Self:
@@ -533,19 +724,17 @@ class LcovRecord(metaclass = MakeLcovRouter):
         f.write(f"FNH:{self.functions_hit}\n")
         # branches
         if self.branches_found > 0:
-            sorted_branches = list(self.branch_hits.keys())
-            sorted_branches.sort()
-            for key in sorted_branches:
-                line, block, branch = key
-                count = self.branch_hits[key]
-                f.write(
-                    f"BRDA:{line},{block},{branch},{count if count is not None else '-'}\n"
+            f.writelines(
+                f"BRDA:{line},{block},{branch},{count if count != NOT_EVALUATED else '-'}\n"
+                for (line, block, branch), count in zip(
+                    map(unpack_branch, self._branch_keys), self._branch_counts
                 )
+            )
             f.write(f"BRF:{self.branches_found}\n")
             f.write(f"BRH:{self.branches_hit}\n")
         # lines
         if self.lines_found > 0:
-            [f.write(f"DA:{line},{count}\n") for line, count in self.line_hits.items()]
+            f.writelines(f"DA:{line},{count}\n" for line, count in self.line_hits.items())
             f.write(f"LF:{self.lines_found}\n")
             f.write(f"LH:{self.lines_hit}\n")
         f.write("end_of_record\n")
@@ -569,11 +758,11 @@ class LcovRecord(metaclass = MakeLcovRouter):
                 return False
             if self.source_file != other.source_file:
                 return False
-            elif self.line_hits != other.line_hits:
+            elif _trimmed(self._line_hits) != _trimmed(other._line_hits):
                 return False
             elif self.function_hits != other.function_hits:
                 return False
-            elif self.branch_hits != other.branch_hits:
+            elif (self._branch_keys, self._branch_counts) != (other._branch_keys, other._branch_counts):
                 return False
             else:
                 return True
@@ -589,6 +778,8 @@ class LcovFile:
     LCOV_EXCL_BR_START_DEFAULT = "LCOV_EXCL_BR_START"
     LCOV_EXCL_BR_STOP_DEFAULT = "LCOV_EXCL_BR_STOP"
     EMPTY_LCOV_PSEUDO_FILE = Path("this_lcov_is_empty")
+    END_OF_RECORD_RE = re.compile(r"^\s*end_of_record[ \t\r]*$", re.MULTILINE)
+    CHUNK_SIZE = 16 * 1024 * 1024
 
     def __init__(
         self,
@@ -618,27 +809,31 @@ class LcovFile:
         else:
             return False
 
-    def load(self, coverage_file: Path):
+    @staticmethod
+    def read_records(coverage_file: Path) -> Iterator[str]:
+        """Yields the text of every record of a trace file (without the end_of_record line).
+        The file is read in chunks of CHUNK_SIZE which are split on end_of_record lines.
+        """
         with open(coverage_file, "r") as f:
-            current_record = None
-            while l := f.readline():
-                if not l.strip():
-                    continue
-                if current_record is None:
-                    current_record = LcovRecord()
-                try:
-                    if current_record.add_line(l):
-                        if (
-                            current_record.source_file
-                            != LcovFile.EMPTY_LCOV_PSEUDO_FILE
-                        ):
-                            self._add_record(current_record)
-                        current_record = None
-                except AssertionError as e:
-                    raise RuntimeError(
-                        f"assertion in loading {coverage_file}, {current_record.source_file}",
-                        e,
-                    )
+            tail = ""
+            while chunk := f.read(LcovFile.CHUNK_SIZE):
+                *records, tail = LcovFile.END_OF_RECORD_RE.split(tail + chunk)
+                yield from records
+
+    def load(self, coverage_file: Path):
+        for text in self.read_records(coverage_file):
+            if not text.strip():
+                continue
+            try:
+                record = LcovRecord.parse(text)
+            except AssertionError as e:
+                source_file = re.search(r"^\s*SF:(.*)$", text, re.MULTILINE)
+                raise RuntimeError(
+                    f"assertion in loading {coverage_file}, {source_file[1] if source_file else None}",
+                    e,
+                )
+            if record.source_file != LcovFile.EMPTY_LCOV_PSEUDO_FILE:
+                self._add_record(record)
         if self.filter_by_tags:
             self.filter_by_source_tags(
                 self.LCOV_EXCL_LINE,
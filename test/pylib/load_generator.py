@@ -0,0 +1,293 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""A CQL workload generator for tests which need to check how the cluster serves requests, e.g., during
+topology changes.
+
+Like `start_writes()` in test/pylib/util.py, it works with a table `(pk int PRIMARY KEY, c int)`, but it runs
+a mix of reads, writes and LWT inserts, either with a fixed concurrency or at a target rate, and collects
+latency histograms and error counts per operation:
+
+    async with LoadGenerator(cql, ks, "test", rate=500, mix={"write": 3, "read": 1}) as load:
+        await manager.api.move_tablet(...)
+        report = load.report()
+    assert report.errors() == 0
+    assert report.percentile(99, "write") < 0.5
+
+Statements are prepared and sent with a token-aware execution profile of the generator, so requests are routed
+to replicas.  Its policy follows the nodes of the cluster, so nodes added during a topology change get their
+share of requests and removed ones get none.
+
+If a rate is given, latency is measured from the time an operation was scheduled to start, not from the time
+it was sent, so a stall of the cluster shows up in the latency of all operations which waited for it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from cassandra import ConsistencyLevel  # type: ignore # pylint: disable=no-name-in-module
+from cassandra.cluster import ExecutionProfile  # type: ignore # pylint: disable=no-name-in-module
+from cassandra.policies import RoundRobinPolicy, TokenAwarePolicy  # type: ignore
+
+if TYPE_CHECKING:
+    from cassandra.cluster import Session  # type: ignore # pylint: disable=no-name-in-module
+
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("write", "read", "lwt")
+LOAD_GENERATOR_PROFILE = "load_generator"
+
+
+class LatencyHistogram:
+    """An HDR-style histogram of latencies with microsecond resolution and ~3% relative precision.
+
+    Values are counted in log-linear buckets: every power of two is split into 2^(SUB_BUCKET_BITS - 1) buckets.
+    """
+
+    SUB_BUCKET_BITS = 6
+
+    def __init__(self):
+        self.counts: Counter[tuple[int, int]] = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _bucket(cls, micros: int) -> tuple[int, int]:
+        shift = max(0, micros.bit_length() - cls.SUB_BUCKET_BITS)
+        return shift, micros >> shift
+
+    @staticmethod
+    def _bucket_limit(bucket: tuple[int, int]) -> float:
+        """The largest value of the bucket in seconds."""
+        shift, sub_bucket = bucket
+        return (((sub_bucket + 1) << shift) - 1) / 1e6
+
+    def record(self, latency: float) -> None:
+        self.counts[self._bucket(int(latency * 1e6))] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Return the latency in seconds which `p` percent of the values don't exceed."""
+        if not self.count:
+            return 0.0
+        threshold = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(self._bucket_limit(bucket), self.max)
+        return self.max
+
+
+class OperationStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors: Counter[str] = Counter()  # by exception type
+
+    def merge(self, other: OperationStats) -> None:
+        self.latency.merge(other.latency)
+        self.errors.update(other.errors)
+
+
+class LoadReport:
+    """Statistics of the operations done during `duration` seconds."""
+
+    def __init__(self, duration: float, operations: dict[str, OperationStats]):
+        self.duration = duration
+        self.operations = operations
+
+    def _stats(self, operation: str | None) -> OperationStats:
+        if operation is not None:
+            return self.operations.get(operation, OperationStats())
+        stats = OperationStats()
+        for operation_stats in self.operations.values():
+            stats.merge(operation_stats)
+        return stats
+
+    def count(self, operation: str | None = None) -> int:
+        """The number of successful operations of the given kind or all operations."""
+        return self._stats(operation).latency.count
+
+    def throughput(self, operation: str | None = None) -> float:
+        return self.count(operation) / self.duration if self.duration else 0.0
+
+    def percentile(self, p: float, operation: str | None = None) -> float:
+        return self._stats(operation).latency.percentile(p)
+
+    def errors(self, operation: str | None = None) -> int:
+        return self._stats(operation).errors.total()
+
+    def __str__(self) -> str:
+        lines = [f"{'operation':<10}{'count':>10}{'ops/s':>10}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+                 f"{'max':>10}{'errors':>8}"]
+        for operation in [*sorted(self.operations), None]:
+            stats = self._stats(operation)
+            latency = stats.latency
+            lines.append(f"{operation or 'total':<10}{latency.count:>10}{self.throughput(operation):>10.1f}"
+                         + "".join(f"{value * 1000:>8.2f}ms" for value in (
+                             latency.mean, latency.percentile(50), latency.percentile(95), latency.percentile(99),
+                             latency.max))
+                         + f"{stats.errors.total():>8}")
+            if stats.errors and operation is not None:
+                lines.extend(f"  {error}: {count}" for error, count in stats.errors.most_common())
+        return "\n".join(lines)
+
+
+class LoadGenerator:
+    """Run a mix of CQL operations on a table `(pk int PRIMARY KEY, c int)` until stopped.
+
+    `mix` maps operations ("write", "read", "lwt") to their relative weights.  Writes and LWT inserts use new
+    keys, reads use keys written before.  Either `concurrency` workers issue operations back to back, or, if
+    `rate` is given, operations are started at the rate (per second) by the workers.
+
+    Errors are counted in the report.  Unless `ignore_errors` is set, the first error stops the workers and
+    is raised by stop().
+    """
+
+    def __init__(self, cql: Session, keyspace: str, table: str,
+                 concurrency: int = 8,
+                 rate: float | None = None,
+                 mix: dict[str, float] | None = None,
+                 ignore_errors: bool = False,
+                 execution_profile: str | None = None,
+                 seed: int | None = None):
+        self.cql = cql
+        self.keyspace = keyspace
+        self.table = table
+        self.concurrency = concurrency
+        self.rate = rate
+        self.mix = mix or {"write": 1}
+        assert set(self.mix) <= set(OPERATIONS), f"Unknown operations in the mix: {set(self.mix) - set(OPERATIONS)}"
+        self.ignore_errors = ignore_errors
+        if execution_profile is None:
+            execution_profile = LOAD_GENERATOR_PROFILE
+            if execution_profile not in cql.cluster.profile_manager.profiles:
+                # Not the "whitelist" profile of the test connection: it sends requests to its contact points only.
+                cql.cluster.add_execution_profile(execution_profile, ExecutionProfile(
+                    load_balancing_policy=TokenAwarePolicy(RoundRobinPolicy()),
+                    request_timeout=cql.cluster.profile_manager.default.request_timeout,
+                ))
+        self.execution_profile = execution_profile
+        self.random = random.Random(seed)
+
+        self.statements = {}
+        self.stats: defaultdict[str, OperationStats] = defaultdict(OperationStats)
+        self.stats_started = 0.0
+        self.written_keys: list[int] = []
+        self.next_key = 0
+        self.next_start = 0.0  # when the next operation should start if `rate` is given
+        self.stop_event = asyncio.Event()
+        self.tasks: list[asyncio.Task] = []
+
+    def _prepare(self) -> None:
+        table = f"{self.keyspace}.{self.table}"
+        self.statements = {
+            "write": self.cql.prepare(f"INSERT INTO {table} (pk, c) VALUES (?, ?)"),
+            "read": self.cql.prepare(f"SELECT * FROM {table} WHERE pk = ?"),
+            "lwt": self.cql.prepare(f"INSERT INTO {table} (pk, c) VALUES (?, ?) IF NOT EXISTS"),
+        }
+        self.statements["write"].consistency_level = ConsistencyLevel.QUORUM
+        self.statements["read"].consistency_level = ConsistencyLevel.QUORUM
+
+    async def start(self) -> None:
+        logger.info("Starting load on %s.%s: concurrency %d, rate %s, mix %s",
+                    self.keyspace, self.table, self.concurrency, self.rate, self.mix)
+        self._prepare()
+        self.report(reset=True)
+        self.next_start = asyncio.get_running_loop().time()
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> LoadReport:
+        """Stop the workers and return the report since the start or the last reset."""
+        self.stop_event.set()
+        results = await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        report = self.report()
+        logger.info("Load on %s.%s stopped:\n%s", self.keyspace, self.table, report)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return report
+
+    async def __aenter__(self) -> LoadGenerator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc is None:
+            await self.stop()
+        else:
+            self.stop_event.set()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def report(self, reset: bool = False) -> LoadReport:
+        """Return the statistics since the start or the last reset.  If `reset` is set, start collecting anew,
+        e.g., to get separate reports for phases of a test."""
+        now = time.monotonic()
+        operations = {}
+        for operation, stats in self.stats.items():
+            operations[operation] = OperationStats()
+            operations[operation].merge(stats)
+        report = LoadReport(duration=now - self.stats_started, operations=operations)
+        if reset:
+            self.stats.clear()
+            self.stats_started = now
+        return report
+
+    def _choose_operation(self) -> tuple[str, list[int]]:
+        operation = self.random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if operation == "read" and self.written_keys:
+            return operation, [self.random.choice(self.written_keys)]
+        if operation == "read":
+            operation = "write"
+        self.next_key += 1
+        return operation, [self.next_key, self.next_key]
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self.stop_event.is_set():
+            if self.rate:
+                scheduled = self.next_start
+                self.next_start += 1 / self.rate
+                if scheduled > loop.time():
+                    await asyncio.sleep(scheduled - loop.time())
+            else:
+                scheduled = loop.time()
+            operation, values = self._choose_operation()
+            try:
+                await self.cql.run_async(self.statements[operation], values,
+                                         execution_profile=self.execution_profile)
+            except Exception as exc:
+                self.stats[operation].errors[type(exc).__name__] += 1
+                if not self.ignore_errors:
+                    logger.error("Load operation %s %s failed: %s", operation, values, exc)
+                    self.stop_event.set()
+                    raise
+                continue
+            self.stats[operation].latency.record(loop.time() - scheduled)
+            if operation != "read":
+                self.written_keys.append(values[0])
+
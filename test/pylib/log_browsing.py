@@ -4,71 +4,359 @@
 
 from __future__ import annotations
 
+from test.pylib.compressed_artifacts import CompressedFile, compressed_path
+from test.pylib.log_index import LogIndex
 from test.pylib.util import universalasync_typed_wrap
 import asyncio
+import ctypes
 import logging
+import mmap
+import os
 import re
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, Tuple
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
 
 import pytest
 
 if TYPE_CHECKING:
     from asyncio import AbstractEventLoop
     from concurrent.futures import ThreadPoolExecutor
+    from collections.abc import Collection, Generator, Iterable, Sequence
+    from datetime import datetime
     from typing import Callable
 
+    from test.pylib.log_index import LogRecord
+
 
 logger = logging.getLogger(__name__)
 
 MarkType = int
 
-class FileSnapshot:
-    """
-    Allows examining a snapshot of a file, assuming the file is append-only.
-    The snapshot is determined at the time of opening.
+READ_CHUNK_SIZE = 1024 * 1024
+POLL_INTERVAL = 0.05  # used if inotify is not available
 
-    Acts as an asynchronous context manager. Consume all lines like this:
+LINE_PATTERN = re.compile(rb"[^\n]*\n|[^\n]+")
 
-        async with FileSnapshot(thread_pool, path) as snap:
-            while (line := await snap.next_line()):
-                # process line
+SEARCH_CHUNK_SIZE = 16 * 1024 * 1024
+LINE_ANCHORS_PATTERN = re.compile(r"\\[AZ]")
 
-    """
+# Each line in scylla-*.log starts with log level.
+ERROR_LINE_PATTERN = re.compile(rb"^ERROR\b", re.MULTILINE)
+INFO_LINE_PATTERN = re.compile(rb"^INFO\b", re.MULTILINE)
+BACKTRACE_PATTERN = re.compile(rb"^[ \t\r\f\v]*Backtrace:[ \t\r\f\v]*$\n?", re.MULTILINE)
+BACKTRACE_ENTRY_PATTERN = re.compile(rb"  (?! )[^\n]*\n?")  # starts with exactly 2 spaces
 
-    def __init__(self, thread_pool: ThreadPoolExecutor, path: Path, from_mark: MarkType = None):
-        self.thread_pool = thread_pool
-        self.path = path
-        self.from_mark = from_mark
-        self.loop = asyncio.get_running_loop()
+IN_MODIFY = 0x00000002
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+
+def _split_lines(data: bytes, offset: int, end: int) -> Iterable[tuple[int, int, str]]:
+    """Split data[:end] read from the offset into lines.  Yield (start offset, end offset, line)."""
+    for match in LINE_PATTERN.finditer(data, 0, end):
+        yield offset + match.start(), offset + match.end(), match.group().decode("utf-8", errors="replace")
 
-    def _open(self):
-        size = self.path.stat().st_size
-        file = self.path.open(encoding="utf-8")
-        return file, size
 
-    def _readline(self) -> Tuple[MarkType, str]:
-        pos = self.file.tell()
-        line = self.file.readline()
-        return pos, line
+def _read_chunk(path: Path, start: int, end: int) -> bytes:
+    with path.open("rb") as file:
+        file.seek(start)
+        return file.read(min(READ_CHUNK_SIZE, end - start))
 
-    async def __aenter__(self):
-        self.file, size = await self.loop.run_in_executor(self.thread_pool, self._open)
-        self.to_mark = size
-        if self.from_mark:
-            await self.loop.run_in_executor(self.thread_pool, self.file.seek, self.from_mark)
-        return self
 
-    async def next_line(self) -> Optional[str]:
-        pos, line = await self.loop.run_in_executor(self.thread_pool, self._readline)
-        if pos >= self.to_mark or not line:
-            return None
-        if pos + len(line) > self.to_mark:
-            return line[:self.to_mark - pos]
-        return line
+class LogWaiter:
+    """Patterns a `ScyllaLogFile.wait_for()` call waits for."""
+
+    def __init__(self, patterns: list[re.Pattern[str]], from_mark: int):
+        self.patterns = patterns
+        self.from_mark = from_mark
+        self.matches: list[tuple[str, re.Match[str]]] = []
+        self.future = asyncio.get_running_loop().create_future()
+        # Lines delivered by the tailer while the waiter reads the log written before it was registered.
+        self.pending: list[tuple[int, int, str]] | None = []
+
+    def feed(self, start: int, end: int, line: str) -> bool:
+        """Match a line.  Return True when all patterns are found."""
+        if end <= self.from_mark or self.future.done():
+            return self.future.done()
+        if start < self.from_mark:
+            line = line.encode()[self.from_mark - start:].decode("utf-8", errors="replace")
+        for pattern in self.patterns.copy():
+            if match := pattern.search(line):
+                logger.debug("Found log message: %s", line)
+                self.matches.append((line, match))
+                self.patterns.remove(pattern)
+        if not self.patterns:
+            self.future.set_result(end)
+            return True
+        return False
+
+
+class LogTailer:
+    """Follow a growing log file and fan new lines out to all waiters.
+
+    There is one tailer per file and event loop, shared by all `wait_for()` calls.  It's woken up by inotify
+    (or polls the file size if inotify is not available), reads the appended data in large chunks, and passes
+    every complete line to the waiters.  When the last waiter is gone, the tailer stops.
+    """
 
-    async def __aexit__(self, exc_type, exc, tb):
-        await self.loop.run_in_executor(self.thread_pool, self.file.close)
+    tailers: dict[tuple[AbstractEventLoop, Path], LogTailer] = {}
+
+    def __init__(self, path: Path, thread_pool: ThreadPoolExecutor, pos: int):
+        self.path = path
+        self.thread_pool = thread_pool
+        self.loop = asyncio.get_running_loop()
+        self.pos = pos  # offset of the first line not read yet
+        self.waiters: list[LogWaiter] = []
+        self.changed = asyncio.Event()
+        self.inotify_fd: int | None = None
+        self._watch()
+        self.task = self.loop.create_task(self._run())
+
+    @classmethod
+    async def get(cls, path: Path, thread_pool: ThreadPoolExecutor) -> LogTailer:
+        loop = asyncio.get_running_loop()
+        key = (loop, path)
+        if (tailer := cls.tailers.get(key)) is None:
+            pos = await loop.run_in_executor(thread_pool, cls._last_line_start, path)
+            # Other tailer could be created while waiting for the executor.
+            if (tailer := cls.tailers.get(key)) is None:
+                tailer = cls.tailers[key] = LogTailer(path, thread_pool, pos)
+        return tailer
+
+    @staticmethod
+    def _last_line_start(path: Path) -> int:
+        """Offset of the beginning of the last (possibly incomplete) line, i.e., the end of the complete lines."""
+        with path.open("rb") as file:
+            end = file.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - READ_CHUNK_SIZE)
+                file.seek(start)
+                if (newline := file.read(end - start).rfind(b"\n")) >= 0:
+                    return start + newline + 1
+                end = start
+        return 0
+
+    def _watch(self) -> None:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            if libc.inotify_add_watch(fd, str(self.path).encode(), IN_MODIFY) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            try:
+                self.loop.add_reader(fd, self._on_inotify)
+            except NotImplementedError:
+                os.close(fd)
+                raise
+        except (AttributeError, OSError, NotImplementedError) as exc:
+            logger.debug("Can't watch %s with inotify, polling: %s", self.path, exc)
+            return
+        self.inotify_fd = fd
+
+    def _on_inotify(self) -> None:
+        try:
+            while os.read(self.inotify_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.changed.set()
+
+    def add_waiter(self, waiter: LogWaiter) -> int:
+        """Register the waiter.  Return the offset from which the tailer will deliver lines to it."""
+        self.waiters.append(waiter)
+        return self.pos
+
+    def remove_waiter(self, waiter: LogWaiter) -> None:
+        if waiter in self.waiters:
+            self.waiters.remove(waiter)
+        if not self.waiters:
+            self.stop()
+
+    def stop(self) -> None:
+        if self.tailers.get((self.loop, self.path)) is self:
+            del self.tailers[(self.loop, self.path)]
+        if self.inotify_fd is not None:
+            self.loop.remove_reader(self.inotify_fd)
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+        self.task.cancel()
+
+    def _read(self, file: BinaryIO) -> bytes:
+        file.seek(self.pos)
+        return file.read(READ_CHUNK_SIZE)
+
+    async def _run(self) -> None:
+        with self.path.open("rb") as file:
+            while True:
+                # Read before waiting for the first change: lines could be appended after the position was found
+                # but before the watch was added.
+                while data := await self.loop.run_in_executor(self.thread_pool, self._read, file):
+                    # An incomplete last line is left in the file and read again with the rest of it.
+                    end = data.rfind(b"\n") + 1
+                    if not end:
+                        if len(data) < READ_CHUNK_SIZE:
+                            break
+                        end = len(data)  # a line longer than a chunk, split it
+                    pos = self.pos
+                    self.pos += end
+                    for start, line_end, line in _split_lines(data, pos, end):
+                        self._dispatch(start, line_end, line)
+                if self.inotify_fd is not None:
+                    await self.changed.wait()
+                    self.changed.clear()
+                else:
+                    await asyncio.sleep(POLL_INTERVAL)
+
+    def _dispatch(self, start: int, end: int, line: str) -> None:
+        for waiter in self.waiters.copy():
+            if waiter.pending is not None:
+                waiter.pending.append((start, end, line))
+            elif waiter.feed(start, end, line):
+                self.waiters.remove(waiter)
+
+
+class LogMatch(NamedTuple):
+    """A line found by `ScyllaLogFile.search()`: the offset of the line in the log file, the line and the match."""
+    offset: int
+    line: str
+    match: re.Match[str]
+
+
+@contextmanager
+def _mapped_log(path: Path, start: int = 0) -> Generator[tuple[mmap.mmap | bytes, int]]:
+    """Map the log file as of now.  The log is append-only, so the mapped part doesn't change.
+
+    Yield the data and the offset of its first byte in the log: the data contains at least the part of the log
+    from `start`.  If the log was compressed after the run, only the frames from `start` on are decompressed.
+    """
+    if not path.exists() and compressed_path(path).exists():
+        yield CompressedFile(path).read(start), start
+        return
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            yield b"", 0
+            return
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            yield mapped, 0
+
+
+def _candidate_lines(text: str, chunk_patterns: list[re.Pattern[str] | None]) -> Iterable[int]:
+    """Find beginnings of lines which may match any of the patterns.
+
+    The patterns are searched in the whole chunk in MULTILINE mode, which finds all lines matched by the
+    original patterns (and maybe some more, so the lines are checked again.)  `\\A` and `\\Z` anchors
+    mean the beginning and the end of the line only for the original pattern, so for a pattern containing
+    them all lines are candidates.
+    """
+    if None in chunk_patterns:
+        pos = 0
+        while pos < len(text):
+            yield pos
+            pos = text.find("\n", pos) + 1 or len(text)
+        return
+    starts = set()
+    for pattern in chunk_patterns:
+        pos = 0
+        while match := pattern.search(text, pos):
+            starts.add(text.rfind("\n", 0, match.start()) + 1)
+            if (pos := text.find("\n", match.start()) + 1) == 0:
+                break
+    yield from sorted(starts)
+
+
+def search_log(path: Path,
+               patterns: list[re.Pattern[str]],
+               filter_pattern: re.Pattern[str] | None = None,
+               from_mark: int | None = None,
+               max_count: int = 0) -> list[LogMatch]:
+    """Search the log for lines matching any of the patterns in one pass over the mapped file.
+
+    The file is decoded and searched by large chunks, each pattern is searched in the whole chunk, and only
+    the lines where it's found are matched line by line.  A line matching several patterns is returned for
+    each of them.
+    """
+    chunk_patterns = [None if LINE_ANCHORS_PATTERN.search(pattern.pattern)
+                      else re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+                      for pattern in patterns]
+    matches = []
+    with _mapped_log(path, from_mark or 0) as (mapped, base):
+        pos = (from_mark or 0) - base
+        end = len(mapped)
+        while pos < end:
+            chunk_end = min(pos + SEARCH_CHUNK_SIZE, end)
+            if chunk_end < end and (newline := mapped.rfind(b"\n", pos, chunk_end)) >= 0:
+                chunk_end = newline + 1
+            data = mapped[pos:chunk_end]
+            # Invalid UTF-8 is kept as surrogates, so the byte offsets of lines can be computed.
+            text = data.decode("utf-8", errors="surrogateescape")
+            is_ascii = data.isascii()
+            char_pos = byte_pos = 0
+            for line_start in _candidate_lines(text, chunk_patterns):
+                line_end = text.find("\n", line_start) + 1 or len(text)
+                line = text[line_start:line_end]
+                if filter_pattern and filter_pattern.search(line):
+                    continue
+                for pattern in patterns:
+                    if match := pattern.search(line):
+                        if is_ascii:
+                            byte_pos = line_start
+                        else:
+                            byte_pos += len(text[char_pos:line_start].encode("utf-8", errors="surrogateescape"))
+                            char_pos = line_start
+                        matches.append(LogMatch(base + pos + byte_pos, line, match))
+                        if len(matches) == max_count:
+                            return matches
+            pos = chunk_end
+    return matches
+
+
+def _find_errors(data: mmap.mmap | bytes, distinct_errors: bool) -> list[str] | list[list[str]]:
+    matches = []
+    seen = set()
+    pos = 0
+    while error := ERROR_LINE_PATTERN.search(data, pos):
+        line_end = LINE_PATTERN.match(data, error.start()).end()
+        if distinct_errors:
+            line = bytes(data[error.start():line_end]).decode("utf-8", errors="replace")
+            if line not in seen:
+                seen.add(line)
+                matches.append(line)
+            pos = line_end
+        else:
+            # The message continues till the next INFO message.
+            info = INFO_LINE_PATTERN.search(data, line_end)
+            pos = info.start() if info else len(data)
+            matches.append([line.decode("utf-8", errors="replace")
+                            for line in LINE_PATTERN.findall(data, error.start(), pos)])
+    return matches
+
+
+def _find_backtraces(data: mmap.mmap | bytes) -> list[str]:
+    backtraces = []
+    pos = 0
+    while header := BACKTRACE_PATTERN.search(data, pos):
+        pos = header.end()
+        while entry := BACKTRACE_ENTRY_PATTERN.match(data, pos):
+            pos = entry.end()
+        backtraces.append(bytes(data[header.start():pos]).decode("utf-8", errors="replace"))
+    return backtraces
+
+
+def grep_log_for_errors(path: Path, distinct_errors: bool = False, from_mark: int | None = None) -> list[str] | list[list[str]]:
+    with _mapped_log(path, from_mark or 0) as (mapped, base), memoryview(mapped) as whole, \
+            whole[(from_mark or 0) - base:] as data:
+        return _find_errors(data, distinct_errors)
+
+
+def find_log_backtraces(path: Path, from_mark: int | None = None) -> list[str]:
+    with _mapped_log(path, from_mark or 0) as (mapped, base), memoryview(mapped) as whole, \
+            whole[(from_mark or 0) - base:] as data:
+        return _find_backtraces(data)
 
 
 @universalasync_typed_wrap
@@ -80,8 +368,9 @@ class ScyllaLogFile:
     def __init__(self, thread_pool: ThreadPoolExecutor, logfile_path: str | Path):
         self.thread_pool = thread_pool  # used for asynchronous IO operations
         self.file = Path(logfile_path)
-        if not self.file.is_file():
+        if not self.file.is_file() and not compressed_path(self.file).is_file():
             pytest.fail(f"Log file {self.file.name} does not exist")
+        self.index = LogIndex(self.file)
 
     async def _run_in_executor[T, **P](self,
                                        func: Callable[P, T],
@@ -118,48 +407,70 @@ class ScyllaLogFile:
 
         loop = asyncio.get_running_loop()
 
-        exprs = [re.compile(pattern) for pattern in exprs]
-        matches = []
-
-        with self.file.open(encoding="utf-8") as log_file:
-            if from_mark is not None:
-                await self._run_in_executor(log_file.seek, from_mark, loop=loop)
+        if not exprs:
+            return from_mark or 0, []
 
+        waiter = LogWaiter(patterns=[re.compile(pattern) for pattern in exprs], from_mark=from_mark or 0)
+        tailer = await LogTailer.get(self.file, self.thread_pool)
+        end = tailer.add_waiter(waiter)
+        try:
             async with asyncio.timeout(timeout):
-                line = ""
-                while exprs:
-                    # Because it may take time for the log message to be flushed, and sometimes we may want to look
-                    # for messages about various delayed events, this function doesn't give up when it reaches
-                    # the end of file, and rather retries until a given timeout.
-                    line += await self._run_in_executor(log_file.readline, loop=loop)
-                    if line:
-                        for pattern in exprs.copy():
-                            if match := pattern.search(line):
-                                logger.debug("Found log message: %s", line)
-                                matches.append((line, match))
-                                exprs.remove(pattern)
-                        if line[-1] == "\n":
-                            line = ""
-                    else:
-                        await asyncio.sleep(0.01)
-
-            return await self._run_in_executor(log_file.tell, loop=loop), matches
-
-    async def _for_each_line_snapshot(self, from_mark: int | None = None):
-        """
-        Yields lines from the file, without considering lines appended after the call started.
+                # Search the log written before the waiter was registered, the tailer delivers the rest of it.
+                pos = waiter.from_mark
+                while pos < end and not waiter.future.done():
+                    data = await loop.run_in_executor(self.thread_pool, _read_chunk, self.file, pos, end)
+                    if not data:
+                        break
+                    chunk_end = data.rfind(b"\n") + 1 if pos + len(data) < end else len(data)
+                    for line in _split_lines(data, pos, chunk_end or len(data)):
+                        if waiter.feed(*line):
+                            break
+                    pos += chunk_end or len(data)
+                pending, waiter.pending = waiter.pending, None
+                for line in pending:
+                    if waiter.feed(*line):
+                        break
+
+                # Because it may take time for the log message to be flushed, and sometimes we may want to look
+                # for messages about various delayed events, this function doesn't give up when it reaches
+                # the end of file, and rather retries until a given timeout.
+                return await waiter.future, waiter.matches
+        finally:
+            tailer.remove_waiter(waiter)
+
+    async def search(self,
+                     *exprs: str | re.Pattern[str],
+                     filter_expr: str | re.Pattern[str] | None = None,
+                     from_mark: int | None = None,
+                     max_count: int = 0) -> list[LogMatch]:
+        """Search the log for lines matching any of the regular expressions, in one pass.
+
+        If `filter_expr` argument is given, only lines which do not match it are returned.
+
+        If `from_mark` argument is given, the log is searched from that position, otherwise from the beginning.
+
+        If `max_count` is greater than 0, return list of matches when it'll reach `max_count` length.
+
+        Return a list of LogMatch tuples (offset, line, match), where offset is the position of the line in the log.
         """
-        async with FileSnapshot(self.thread_pool, self.file, from_mark) as snap:
-            while line := await snap.next_line():
-                yield line
+        return await self._run_in_executor(
+            search_log,
+            self.file,
+            [re.compile(expr) for expr in exprs],
+            re.compile(filter_expr) if filter_expr else None,
+            from_mark,
+            max_count,
+        )
 
     async def grep(self,
-                   expr: str | re.Pattern[str],
+                   expr: str | re.Pattern[str] | Sequence[str | re.Pattern[str]],
                    filter_expr: str | re.Pattern[str] | None = None,
                    from_mark: int | None = None,
                    max_count: int = 0) -> list[tuple[str, re.Match[str]]]:
         """Search the log for lines matching the regular expression.
 
+        Several expressions can be given as a list, all of them are searched in one pass.
+
         If `filter_expr` argument is given, only lines which do not match it are returned.
 
         If `from_mark` argument is given, the log is searched from that position, otherwise from the beginning.
@@ -169,19 +480,9 @@ class ScyllaLogFile:
         Return a list of tuples (line, match), where line is the full line from the log, and match is the re.Match[str]
         object for the matching expression.
         """
-        loop = asyncio.get_running_loop()
-
-        expr = re.compile(expr)
-        filter_func = re.compile(filter_expr).search if filter_expr else lambda _: False
-        matches = []
-
-        async for line in self._for_each_line_snapshot(from_mark=from_mark):
-            if match := not filter_func(line) and expr.search(line):
-                matches.append((line, match))
-                if len(matches) == max_count:
-                    break
-
-        return matches
+        exprs = expr if isinstance(expr, (list, tuple)) else [expr]
+        matches = await self.search(*exprs, filter_expr=filter_expr, from_mark=from_mark, max_count=max_count)
+        return [(line, match) for _, line, match in matches]
 
     async def grep_for_errors(self,
                               distinct_errors: bool = False,
@@ -195,29 +496,7 @@ class ScyllaLogFile:
 
         Return a list of error messages.  Error message can be just one line or a list of lines.
         """
-
-        # Each line in scylla-*.log starts with log level, so, use re.match to search from the beginning of each line.
-        error_pattern = re.compile(r"ERROR\b")
-        info_pattern = re.compile(r"INFO\b")
-        matches = []
-
-        async with FileSnapshot(self.thread_pool, self.file, from_mark) as snap:
-            line = await snap.next_line()
-            while line:
-                if error_pattern.match(line):
-                    if distinct_errors:
-                        if line not in matches:
-                            matches.append(line)
-                    else:
-                        matches.append([line])
-                        while line := await snap.next_line():
-                            if info_pattern.match(line):
-                                break
-                            matches[-1].append(line)
-                        continue
-                line = await snap.next_line()
-
-        return matches
+        return await self._run_in_executor(grep_log_for_errors, self.file, distinct_errors, from_mark)
 
     async def find_backtraces(self, from_mark: int | None = None) -> list[str]:
         """
@@ -227,36 +506,30 @@ class ScyllaLogFile:
         If `from_mark` argument is given, the log is searched from that position, otherwise from the beginning.  
         Return a list of strings, where each string is a complete backtrace (all lines joined together).  
         """
-
-        backtraces = []
-
-        async with FileSnapshot(self.thread_pool, self.file, from_mark) as snap:
-            line = await snap.next_line()
-            while line:
-                if line.strip() == "Backtrace:":
-                    # Found a backtrace, collect all lines that start with exactly 2 spaces
-                    backtrace_lines = [line]
-                    while True:
-                        next_line = await snap.next_line()
-                        if not next_line:
-                            # End of file
-                            line = ""
-                            break
-                        if next_line.startswith("  ") and not next_line.startswith("   "):
-                            # Line starts with exactly 2 spaces (backtrace entry)
-                            backtrace_lines.append(next_line)
-                        else:
-                            # End of backtrace
-                            line = next_line
-                            break
-                    
-                    if backtrace_lines:
-                        # Join all backtrace lines into a single string
-                        backtraces.append(''.join(backtrace_lines))
-                    
-                    # Continue from current line (already read in the inner loop)
-                    continue
-                
-                line = await snap.next_line()
-
-        return backtraces
+        return await self._run_in_executor(find_log_backtraces, self.file, from_mark)
+
+    async def query(self,
+                    levels: Collection[str] | None = None,
+                    loggers: Collection[str] | None = None,
+                    shards: Collection[int] | None = None,
+                    since: datetime | str | None = None,
+                    until: datetime | str | None = None,
+                    from_mark: int | None = None,
+                    expr: str | re.Pattern[str] | None = None) -> list[LogRecord]:
+        """Find log records using the persistent index of the log (see test/pylib/log_index.py.)
+
+        E.g., `await log.query(levels=["ERROR"], loggers=["raft"], shards=[3], since=started)` returns all error
+        messages of the raft logger on shard 3 since `started`.  Only the parts of the log which can contain
+        matching records are read.
+
+        Return a list of LogRecord tuples (offset, timestamp, level, shard, logger, text), where text contains
+        all lines of the record, e.g., a backtrace.
+        """
+        return await self._run_in_executor(partial(self.index.query,
+                                                   levels=levels,
+                                                   loggers=loggers,
+                                                   shards=shards,
+                                                   since=since,
+                                                   until=until,
+                                                   from_mark=from_mark,
+                                                   pattern=expr))
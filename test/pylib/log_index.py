@@ -0,0 +1,348 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""A persistent index of a Scylla log file for queries by log level, logger, shard and time.
+
+The index is kept in a sidecar file next to the log (`<log>.index`) and updated incrementally: every update
+indexes only the records appended since the previous one.  The log is split into blocks of about BLOCK_SIZE
+bytes at record boundaries, and the index has a JSON line for each block with its offsets, the first and the
+last timestamp, and the sets of log levels, loggers and shards of its records.  A query reads only the blocks
+which can contain matching records.
+
+The last record of the log isn't indexed until the next record starts, because more lines of it (e.g.,
+a backtrace) may be written yet.  Queries scan the not indexed tail of the log directly.
+
+A log compressed after the run (see test/pylib/compressed_artifacts.py) is queried using the index of the
+original log, and only the frames containing the blocks to read are decompressed.
+
+The index can be used from the command line too:
+
+    python3 -m test.pylib.log_index testlog/dev/scylla-1.log --level ERROR --logger raft --shard 3 --since '2025-01-01 12:00:00'
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import logging
+import mmap
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from test.pylib.compressed_artifacts import CompressedFile, compressed_path
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Generator, Iterable
+    from typing import IO
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index"
+BLOCK_SIZE = 64 * 1024
+
+# E.g., `INFO  2025-01-01 12:00:00,123 [shard 0:main] raft_topology - message`
+RECORD_HEADER_PATTERN = re.compile(
+    rb"^(?P<level>TRACE|DEBUG|INFO|WARN|ERROR) +"
+    rb"(?P<timestamp>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) "
+    rb"\[shard +(?P<shard>\d+)[^\]\n]*\] "
+    rb"(?P<logger>\S+) - ",
+    re.MULTILINE,
+)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+
+class LogRecord(NamedTuple):
+    offset: int
+    timestamp: str
+    level: str
+    shard: int
+    logger: str
+    text: str  # all lines of the record
+
+
+class LogBlock(NamedTuple):
+    offset: int
+    end: int
+    first: str | None  # timestamps are compared as strings
+    last: str | None
+    levels: frozenset[str]
+    loggers: frozenset[str]
+    shards: frozenset[int]
+
+    def to_json(self) -> str:
+        return json.dumps({"offset": self.offset, "end": self.end, "first": self.first, "last": self.last,
+                           "levels": sorted(self.levels), "loggers": sorted(self.loggers),
+                           "shards": sorted(self.shards)})
+
+    @staticmethod
+    def from_json(entry: dict) -> LogBlock:
+        return LogBlock(offset=entry["offset"], end=entry["end"], first=entry["first"], last=entry["last"],
+                        levels=frozenset(entry["levels"]), loggers=frozenset(entry["loggers"]),
+                        shards=frozenset(entry["shards"]))
+
+
+def format_timestamp(timestamp: datetime | str) -> str:
+    """Convert a timestamp to the format of Scylla log, which can be compared as a string."""
+    if isinstance(timestamp, datetime):
+        return timestamp.strftime(TIMESTAMP_FORMAT)[:-3]
+    return timestamp
+
+
+def until_bound(timestamp: datetime | str) -> str:
+    """The greatest log timestamp not after `timestamp`.
+
+    A timestamp given with less precision than the log has (e.g., without milliseconds) covers the whole
+    second (minute, etc.), so it's padded with a character greater than any of a timestamp.
+    """
+    timestamp = format_timestamp(timestamp)
+    return timestamp + "~" if len(timestamp) < len("0000-00-00 00:00:00,000") else timestamp
+
+
+def _records(data: bytes | mmap.mmap, start: int, end: int) -> Iterable[tuple[int, int, re.Match[bytes]]]:
+    """Yield (start, end, header match) of records in data[start:end].  Lines before the first record are skipped."""
+    previous = None
+    for header in RECORD_HEADER_PATTERN.finditer(data, start, end):
+        if previous is not None:
+            yield previous.start(), header.start(), previous
+        previous = header
+    if previous is not None:
+        yield previous.start(), end, previous
+
+
+@contextmanager
+def _mapped(path: Path) -> Generator[mmap.mmap | bytes]:
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+class LogIndex:
+    """The index of a log file."""
+
+    def __init__(self, log_path: Path | str):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + INDEX_SUFFIX)
+        self.blocks: list[LogBlock] = []
+        self.index_pos = 0  # how much of the index file is loaded into self.blocks
+        self.lock = threading.Lock()  # the index can be queried from several threads of an executor
+
+    @property
+    def indexed_end(self) -> int:
+        return self.blocks[-1].end if self.blocks else 0
+
+    def _compressed(self) -> CompressedFile | None:
+        if not self.log_path.exists() and compressed_path(self.log_path).exists():
+            return CompressedFile(self.log_path)
+        return None
+
+    def _header(self) -> dict:
+        if self._compressed() is not None:
+            return {"version": INDEX_VERSION}
+        stat = self.log_path.stat()
+        return {"version": INDEX_VERSION, "device": stat.st_dev, "inode": stat.st_ino}
+
+    def _valid_header(self, header: dict | None) -> bool:
+        if self._compressed() is not None:
+            # The compressed log doesn't change anymore, the index of the original log applies to it.
+            return isinstance(header, dict) and header.get("version") == INDEX_VERSION
+        return header == self._header()
+
+    def _size(self) -> int:
+        if (compressed := self._compressed()) is not None:
+            return compressed.size
+        return self.log_path.stat().st_size
+
+    @contextmanager
+    def _reader(self) -> Generator[Callable[[int, int | None], tuple[bytes | mmap.mmap, int]]]:
+        """Yield a function which returns the data containing the part [start, end) of the log (till its end if
+        end is None) and the offset of the data in the log.
+
+        The log is mapped as of now, or, if it's compressed, only the frames containing the part are decompressed.
+        """
+        if (compressed := self._compressed()) is not None:
+            yield lambda start, end: (compressed.read(start, end), start)
+            return
+        with _mapped(self.log_path) as data:
+            yield lambda start, end: (data, 0)
+
+    def _load(self, index_file: IO[str]) -> None:
+        """Load the index entries written since the last update, by this or another process.
+
+        The index is reset if it was built for another log file, or the log was truncated.
+        """
+        index_file.seek(0, os.SEEK_END)
+        if self.index_pos == 0 or index_file.tell() < self.index_pos:
+            index_file.seek(0)
+            try:
+                header = json.loads(index_file.readline())
+            except ValueError:
+                header = None
+            if not self._valid_header(header):
+                self._reset(index_file)
+                return
+            self.blocks = []
+        else:
+            index_file.seek(self.index_pos)
+        for line in iter(index_file.readline, ""):
+            self.blocks.append(LogBlock.from_json(json.loads(line)))
+        self.index_pos = index_file.tell()
+        if self.indexed_end > self._size():
+            self._reset(index_file)
+
+    def _reset(self, index_file: IO[str]) -> None:
+        index_file.seek(0)
+        index_file.truncate()
+        index_file.write(json.dumps(self._header()) + "\n")
+        index_file.flush()
+        self.blocks = []
+        self.index_pos = index_file.tell()
+
+    def update(self) -> None:
+        """Index the records appended to the log since the last update."""
+        with self.index_path.open("a+") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                self._load(index_file)
+                new_blocks = self._index(start=self.indexed_end)
+                index_file.writelines(block.to_json() + "\n" for block in new_blocks)
+                index_file.flush()
+                self.blocks.extend(new_blocks)
+                self.index_pos = index_file.tell()
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def _index(self, start: int) -> list[LogBlock]:
+        blocks = []
+        block_start = start
+        headers: list[re.Match[bytes]] = []
+
+        def close_block(end: int) -> None:
+            nonlocal block_start
+            timestamps = [header["timestamp"].decode() for header in headers]
+            blocks.append(LogBlock(
+                offset=block_start,
+                end=end,
+                first=timestamps[0] if timestamps else None,
+                last=timestamps[-1] if timestamps else None,
+                levels=frozenset(header["level"].decode() for header in headers),
+                loggers=frozenset(header["logger"].decode() for header in headers),
+                shards=frozenset(int(header["shard"]) for header in headers),
+            ))
+            block_start = end
+            headers.clear()
+
+        with self._reader() as read:
+            data, base = read(start, None)
+            for header in RECORD_HEADER_PATTERN.finditer(data, start - base):
+                # The previous record is complete now.
+                if base + header.start() - block_start >= BLOCK_SIZE:
+                    close_block(end=base + header.start())
+                headers.append(header)
+
+            # Don't index the last record: more lines of it may be appended yet.
+            if headers and base + headers[-1].start() > block_start:
+                last = headers.pop()
+                close_block(end=base + last.start())
+        return blocks
+
+    def query(self,
+              levels: Collection[str] | None = None,
+              loggers: Collection[str] | None = None,
+              shards: Collection[int] | None = None,
+              since: datetime | str | None = None,
+              until: datetime | str | None = None,
+              from_mark: int | None = None,
+              pattern: str | re.Pattern[str] | None = None) -> list[LogRecord]:
+        """Find records matching all given conditions: one of the log levels, loggers and shards, timestamp in
+        [since, until], starting at `from_mark` or later, and text matching the pattern."""
+        with self.lock:
+            self.update()
+            blocks = list(self.blocks)
+            indexed_end = self.indexed_end
+        since = format_timestamp(since) if since is not None else None
+        until = until_bound(until) if until is not None else None
+        levels = set(levels) if levels is not None else None
+        loggers = set(loggers) if loggers is not None else None
+        shards = {int(shard) for shard in shards} if shards is not None else None
+        pattern = re.compile(pattern) if pattern is not None else None
+        from_mark = from_mark or 0
+
+        def block_may_match(block: LogBlock) -> bool:
+            return (block.end > from_mark
+                    and block.first is not None
+                    and (levels is None or not levels.isdisjoint(block.levels))
+                    and (loggers is None or not loggers.isdisjoint(block.loggers))
+                    and (shards is None or not shards.isdisjoint(block.shards))
+                    and (since is None or block.last >= since)
+                    and (until is None or block.first <= until))
+
+        regions: list[tuple[int, int | None]] = []
+        for block in blocks:
+            if block_may_match(block):
+                # Adjacent blocks are read at once.
+                if regions and regions[-1][1] == block.offset:
+                    regions[-1] = (regions[-1][0], block.end)
+                else:
+                    regions.append((block.offset, block.end))
+        regions.append((indexed_end, None))
+        records = []
+        with self._reader() as read:
+            for region_start, region_end in regions:
+                data, base = read(region_start, region_end)
+                region_end = base + len(data) if region_end is None else region_end
+                for start, end, header in _records(data, region_start - base, region_end - base):
+                    if base + start < from_mark:
+                        continue
+                    record = LogRecord(offset=base + start,
+                                       timestamp=header["timestamp"].decode(),
+                                       level=header["level"].decode(),
+                                       shard=int(header["shard"]),
+                                       logger=header["logger"].decode(),
+                                       text="")
+                    if ((levels is not None and record.level not in levels)
+                            or (loggers is not None and record.logger not in loggers)
+                            or (shards is not None and record.shard not in shards)
+                            or (since is not None and record.timestamp < since)
+                            or (until is not None and record.timestamp > until)):
+                        continue
+                    text = data[start:end].decode("utf-8", errors="replace")
+                    if pattern is not None and not pattern.search(text):
+                        continue
+                    records.append(record._replace(text=text))
+        return records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query a Scylla log file using its index.")
+    parser.add_argument("log", type=Path, help="Scylla log file")
+    parser.add_argument("--level", action="append", help="Log level (can be repeated)")
+    parser.add_argument("--logger", action="append", help="Logger name (can be repeated)")
+    parser.add_argument("--shard", action="append", type=int, help="Shard (can be repeated)")
+    parser.add_argument("--since", help="Only records since the timestamp, e.g., '2025-01-01 12:00:00'")
+    parser.add_argument("--until", help="Only records until the timestamp")
+    parser.add_argument("--pattern", help="Regular expression the record should match")
+    args = parser.parse_args()
+
+    for record in LogIndex(args.log).query(levels=args.level, loggers=args.logger, shards=args.shard,
+                                            since=args.since, until=args.until, pattern=args.pattern):
+        sys.stdout.write(record.text)
+
+
+if __name__ == "__main__":
+    main()
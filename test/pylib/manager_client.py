@@ -89,6 +89,8 @@ class ManagerClient:
     async def stop(self):
         """Close driver"""
         self.driver_close()
+        await self.api.close()
+        await self.metrics.close()
         # remove non-running event loops from the dict
         for loop in list(self.client_for_asyncio_loop.keys()):
             if not loop.is_running():
@@ -1,8 +1,11 @@
 import asyncio
+import logging
 from typing import Generic, Callable, Awaitable, TypeVar, AsyncContextManager, Final, Optional
 
 T = TypeVar('T')
 
+logger = logging.getLogger(__name__)
+
 
 class Pool(Generic[T]):
     """Asynchronous object pool.
@@ -64,17 +67,46 @@ class Pool(Generic[T]):
         finally:
             if server:
                 await pool.put(is_dirty=dirty)
+
+
+    If building an object is slow, the pool can keep up to `spares` objects
+    ready: they are built in background tasks (using the arguments of the
+    last `get` or `replace_dirty` call) whenever an object is taken from the
+    pool or a dirty one is destroyed, as long as `max_size` allows it.  With
+    spares, `replace_dirty` hands over a ready object at once and destroys
+    the dirty one in background.  Use `drain` to wait for the background
+    tasks before the event loop is closed:
+        pool = Pool(4, start_server, destroy_server, spares=1)
+        ...
+        await pool.drain()
     """
     def __init__(self, max_size: int,
                  build: Callable[..., Awaitable[T]],
-                 destroy: Callable[[T], Awaitable[None]]):
+                 destroy: Callable[[T], Awaitable[None]],
+                 spares: int = 0):
         assert(max_size >= 0)
+        assert(0 <= spares <= max_size)
         self.max_size: Final[int] = max_size
+        self.spares: Final[int] = spares
         self.build: Final[Callable[..., Awaitable[T]]] = build
         self.destroy: Final[Callable[[T], Awaitable]] = destroy
-        self.cond: Final[asyncio.Condition] = asyncio.Condition()
+        self._cond: Optional[asyncio.Condition] = None
+        self._cond_loop: Optional[asyncio.AbstractEventLoop] = None
         self.pool: list[T] = []
-        self.total: int = 0 # len(self.pool) + leased objects
+        self.total: int = 0 # len(self.pool) + leased objects + objects being built or destroyed in background
+        self.building: int = 0 # spare objects being built in background
+        self.background: set[asyncio.Task] = set()
+        self.build_args: tuple[tuple, dict] = ((), {})
+
+    @property
+    def cond(self) -> asyncio.Condition:
+        # A pool can outlive an event loop (e.g., pytest runs a cluster manager in a separate event loop
+        # for each test module), and asyncio.Condition is bound to the loop it was first used in.
+        loop = asyncio.get_running_loop()
+        if self._cond_loop is not loop:
+            self._cond = asyncio.Condition()
+            self._cond_loop = loop
+        return self._cond
 
     async def get(self, *args, **kwargs) -> T:
         """Borrow an object from the pool.
@@ -86,12 +118,17 @@ class Pool(Generic[T]):
            or an existing one will be borrowed.
         """
         async with self.cond:
-            await self.cond.wait_for(lambda: self.pool or self.total < self.max_size)
+            self.build_args = (args, kwargs)
+            # Prefer to wait for a spare object which is being built already.
+            await self.cond.wait_for(lambda: self.pool or (self.total < self.max_size and not self.building))
             if self.pool:
-                return self.pool.pop()
+                obj = self.pool.pop()
+                self._replenish()
+                return obj
 
             # No object in pool, but total < max_size so we can construct one
             self.total += 1
+            self._replenish()
 
         return await self._build_and_get(*args, **kwargs)
 
@@ -106,6 +143,7 @@ class Pool(Generic[T]):
         async with self.cond:
             if is_dirty:
                 self.total -= 1
+                self._replenish()
             else:
                 self.pool.append(obj)
             self.cond.notify()
@@ -119,7 +157,21 @@ class Pool(Generic[T]):
            Note: the returned object might have been constructed earlier or it might
            be built right now, as in `get`.
            *args and **kwargs are used as in `get`.
+
+           If the pool keeps spares, a ready object is returned without waiting
+           for the dirty one to be destroyed, which is done in background.
         """
+        if self.spares:
+            async with self.cond:
+                self.build_args = (args, kwargs)
+                await self.cond.wait_for(lambda: self.pool or not self.building)
+                if self.pool:
+                    # The space of the dirty object is freed when it's destroyed.
+                    self._spawn(self._destroy_in_background(obj))
+                    new_obj = self.pool.pop()
+                    self._replenish()
+                    return new_obj
+
         await self.destroy(obj)
 
         async with self.cond:
@@ -151,6 +203,54 @@ class Pool(Generic[T]):
 
         return Instance(self, dirty_on_exception)
 
+    async def drain(self) -> None:
+        """Wait for all objects being built or destroyed in background."""
+        while self.background:
+            await asyncio.gather(*self.background, return_exceptions=True)
+
+    def _spawn(self, coro: Awaitable) -> None:
+        task = asyncio.create_task(coro)
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    def _replenish(self) -> None:
+        """Start building spare objects in background.
+           Precondition: self.cond is held.
+        """
+        while len(self.pool) + self.building < self.spares and self.total < self.max_size:
+            self.total += 1
+            self.building += 1
+            self._spawn(self._build_in_background())
+
+    async def _build_in_background(self) -> None:
+        args, kwargs = self.build_args
+        try:
+            obj = await self.build(*args, **kwargs)
+        except BaseException as exc:
+            async with self.cond:
+                self.total -= 1
+                self.building -= 1
+                self.cond.notify_all()
+            if not isinstance(exc, asyncio.CancelledError):
+                logger.exception("Failed to build a spare object for the pool")
+                return
+            raise
+        async with self.cond:
+            self.building -= 1
+            self.pool.append(obj)
+            self.cond.notify_all()
+
+    async def _destroy_in_background(self, obj: T) -> None:
+        try:
+            await self.destroy(obj)
+        except Exception:
+            logger.exception("Failed to destroy a dirty object of the pool")
+        finally:
+            async with self.cond:
+                self.total -= 1
+                self._replenish()
+                self.cond.notify()
+
     async def _build_and_get(self, *args, **kwargs) -> T:
         """Precondition: we allocated space for this object
            (it's included in self.total).
@@ -22,6 +22,9 @@ Classes:
 
     RandomTable
         A managed table.
+        .insert_seq() inserts a row of next sequential values.
+        .insert_seq_bulk() inserts many such rows with bounded concurrency, and .load_seq_sstables()
+        writes them into SSTables offline and loads them, for tests which need large datasets.
     Column
         Manage a table's column and generate a value from a seed.
         Usually tests should generate deterministic sequential values.
@@ -33,15 +36,20 @@ from abc import ABCMeta
 import asyncio
 import itertools
 import logging
+import os
+import pathlib
 import random
+import tempfile
 import uuid
 import time
 from typing import Optional, Type, List, Set, Union, TYPE_CHECKING
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from cassandra.cluster import Session as CassandraSession            # type: ignore
+    from test.pylib.internal_types import ServerInfo
     from test.pylib.manager_client import ManagerClient
 from test.pylib.rest_client import get_host_api_address, read_barrier
-from test.pylib.util import get_available_host
+from test.pylib.util import gather_safely, get_available_host
 
 
 logger = logging.getLogger('random_tables')
@@ -59,6 +67,10 @@ class ValueType(metaclass=ABCMeta):
         """Return next value for this type"""
         pass
 
+    def cql_literal(self, value) -> str:
+        """Return the value as a CQL literal"""
+        return str(value)
+
 
 class IntType(ValueType):
     def __init__(self):
@@ -75,6 +87,9 @@ class TextType(ValueType):
     def val(self, seed) -> str:
         return str(seed)
 
+    def cql_literal(self, value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
 
 class FloatType(ValueType):
     def __init__(self):
@@ -117,6 +132,10 @@ class Column():
         """Generate a random value"""
         return self.ctype.val(seed)
 
+    def cql_literal(self, seed) -> str:
+        """Generate a value as a CQL literal"""
+        return self.ctype.cql_literal(self.ctype.val(seed))
+
     def __str__(self):
         return self.name
 
@@ -225,6 +244,94 @@ class RandomTable():
                                                 f"VALUES ({', '.join(['%s'] * len(self.columns)) })",
                                                 parameters=[c.val(seed) for c in self.columns])
 
+    def _seq_rows(self, count: int, batch_size: int, literals: bool = False) -> Iterator[tuple]:
+        """Yield rows of the next `count` sequential values.  The values are generated for a batch of rows
+           at a time, column by column."""
+        for batch_start in range(0, count, batch_size):
+            seeds = [self.next_seq() for _ in range(min(batch_size, count - batch_start))]
+            if literals:
+                yield from zip(*([c.cql_literal(seed) for seed in seeds] for c in self.columns))
+            else:
+                yield from zip(*([c.val(seed) for seed in seeds] for c in self.columns))
+
+    async def insert_seq_bulk(self, count: int, concurrency: int = 128, batch_size: int = 1000) -> None:
+        """Insert `count` rows of next sequential values, the same rows as `count` calls of insert_seq() would.
+           A prepared statement is run by `concurrency` workers, requests are spread over all hosts."""
+        assert self.manager.cql is not None
+        cql = self.manager.cql
+        stmt = cql.prepare(f"INSERT INTO {self.full_name} ({self.all_col_names}) "
+                           f"VALUES ({', '.join(['?'] * len(self.columns))})")
+        rows = self._seq_rows(count, batch_size)
+
+        async def worker() -> None:
+            # The generator is shared by all workers, every row is inserted once.
+            for row in rows:
+                await cql.run_async(stmt, row)
+
+        started = time.time()
+        await gather_safely(*(worker() for _ in range(min(concurrency, count))))
+        logger.debug("Inserted %d rows into %s in %.1fs", count, self.full_name, time.time() - started)
+
+    async def load_seq_sstables(self, count: int, server: Optional[ServerInfo] = None,
+                                memory_limit: int = 64 * 1024 * 1024) -> None:
+        """Write `count` rows of next sequential values into SSTables offline, using `scylla sstable write`,
+           and load them through the upload directory of `server` (the first running server by default),
+           streaming them to their replicas.  Much faster than inserting many rows with CQL.
+           Counter columns are not supported."""
+        assert not any(isinstance(c.ctype, CounterType) for c in self.columns), \
+            f"Cannot write counter columns of {self.full_name} into SSTables"
+        if server is None:
+            server = (await self.manager.running_servers())[0]
+        exe = await self.manager.server_get_exe(server.server_id)
+        workdir = pathlib.Path(await self.manager.server_get_workdir(server.server_id))
+        table_dirs = list((workdir / "data" / self.keyspace).glob(f"{self.name}-" + "[0-9a-f]" * 32))
+        assert len(table_dirs) == 1, f"Cannot find the directory of {self.full_name} in {workdir}"
+        upload_dir = table_dirs[0] / "upload"
+
+        col_defs = ", ".join(c.cql for c in self.columns)
+        pk_names = ", ".join(c.name for c in self.columns[:self.pks])
+        # `scylla sstable write` creates the table in its own keyspace.
+        insert_prefix = f"INSERT INTO scylla_sstable.{self.name} ({self.all_col_names}) VALUES ("
+
+        # Create the temporary directory next to the working directory to move SSTables instead of copying.
+        with tempfile.TemporaryDirectory(dir=workdir.parent) as tmp_dir:
+            tmp_path = pathlib.Path(tmp_dir)
+            schema_file = tmp_path / "schema.cql"
+            input_file = tmp_path / "input.cql"
+            output_dir = tmp_path / "sstables"
+            output_dir.mkdir()
+
+            def write_input() -> None:
+                schema_file.write_text(f"CREATE TABLE {self.full_name} ({col_defs}, primary key({pk_names}))")
+                with input_file.open("w") as f:
+                    for row in self._seq_rows(count, batch_size=10000, literals=True):
+                        f.write(f"{insert_prefix}{', '.join(row)});\n")
+
+            started = time.time()
+            await asyncio.to_thread(write_input)
+            proc = await asyncio.create_subprocess_exec(
+                exe, "sstable", "write",
+                "--schema-file", str(schema_file),
+                "--input-file", str(input_file),
+                "--input-format", "cql",
+                "--output-dir", str(output_dir),
+                "--memory-limit", str(memory_limit),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=os.environ | {"TEMPDIR": tmp_dir},
+            )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(f"scylla sstable write failed for {self.full_name}: "
+                                   f"{stderr.decode(errors='replace').strip()}")
+            upload_dir.mkdir(exist_ok=True)
+            for sstable_file in output_dir.iterdir():
+                sstable_file.rename(upload_dir / sstable_file.name)
+            logger.debug("Wrote %d rows of %s into SSTables in %.1fs", count, self.full_name, time.time() - started)
+
+        await self.manager.api.load_new_sstables(server.ip_addr, self.keyspace, self.name, load_and_stream=True)
+        logger.debug("Loaded %d rows into %s in %.1fs", count, self.full_name, time.time() - started)
+
     async def add_index(self, column: Union[Column, str], name: str = None) -> str:
         if isinstance(column, int):
             assert column > 0, f"Cannot create secondary index " \
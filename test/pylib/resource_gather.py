@@ -13,10 +13,11 @@ import os
 import platform
 import shlex
 import subprocess
+import threading
 import time
 from abc import ABC
 from datetime import datetime
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 from types import SimpleNamespace
 from typing import TYPE_CHECKING
@@ -36,6 +37,7 @@ from test.pylib.db.writer import (
 
 if TYPE_CHECKING:
     from asyncio import Task, Event
+    from collections.abc import Callable, Iterable
     from typing import TextIO
 
     from test.pylib.suite.base import Test as TestPyTest
@@ -59,16 +61,116 @@ def get_cgroup() -> Path:
 CGROUP_INITIAL = get_cgroup()
 CGROUP_TESTS = CGROUP_INITIAL.parent / 'tests'
 
+# The cgroup of a test is sampled every MIN_SAMPLE_INTERVAL seconds while its usage changes, the interval
+# doubles up to MAX_SAMPLE_INTERVAL while it's stable.
+MIN_SAMPLE_INTERVAL = 0.25
+MAX_SAMPLE_INTERVAL = 4.0
+MEMORY_CHANGE_THRESHOLD = 0.05  # relative
+PRESSURE_CHANGE_THRESHOLD = 1.0  # percents
+PRESSURE_RESOURCES = ('cpu', 'io', 'memory')
+PROCESSES_SAMPLE_INTERVAL = 1.0
+
+
+def read_pressure(path: Path) -> dict[str, dict[str, float]] | None:
+    """Parse a PSI file (cpu.pressure, io.pressure, memory.pressure), e.g.:
+
+        some avg10=0.00 avg60=0.00 avg300=0.00 total=12345
+        full avg10=0.00 avg60=0.00 avg300=0.00 total=6789
+
+    into {'some': {'avg10': 0.0, ..., 'total': 12345.0}, 'full': {...}}.  Totals are in microseconds.
+    Return None if the file doesn't exist, e.g., the kernel is built without PSI.
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return None
+    pressure = {}
+    for line in lines:
+        kind, *fields = line.split()
+        pressure[kind] = {key: float(value) for key, value in (field.split('=') for field in fields)}
+    return pressure
+
+
+def read_io_stat(path: Path) -> tuple[int, int] | None:
+    """Return bytes read and written by the cgroup on all devices according to io.stat."""
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return None
+    read_bytes = write_bytes = 0
+    for line in lines:
+        for field in line.split()[1:]:
+            key, _, value = field.partition('=')
+            if key == 'rbytes':
+                read_bytes += int(value)
+            elif key == 'wbytes':
+                write_bytes += int(value)
+    return read_bytes, write_bytes
+
+
+@lru_cache(maxsize=None)
+def get_sqlite_writer(db_path: Path) -> SQLiteWriter:
+    """Return the writer of the metrics database, its tables are created once per process."""
+    return SQLiteWriter(db_path)
+
+
+class ProcessesMonitor:
+    """Sample memory and CPU usage of a changing set of processes, e.g., Scylla servers used by a test.
+
+    The servers are started by the cluster manager, not by the test, so they aren't in a cgroup of the test.
+    Call sample() periodically (or use run()): the memory peak is the maximal sampled total RSS of the processes,
+    CPU time is the one used since the first sample or since the process has appeared.
+    """
+
+    def __init__(self, get_pids: Callable[[], Iterable[int]]):
+        self.get_pids = get_pids
+        self.memory_peak = 0
+        self.processes: dict[int, psutil.Process] = {}
+        self.cpu_start: dict[int, tuple[float, float]] = {}
+        self.cpu_last: dict[int, tuple[float, float]] = {}
+        self.first_sample = True
+
+    def sample(self) -> None:
+        memory = 0
+        for pid in self.get_pids():
+            try:
+                if (process := self.processes.get(pid)) is None:
+                    process = self.processes[pid] = psutil.Process(pid)
+                with process.oneshot():
+                    memory += process.memory_info().rss
+                    cpu_times = process.cpu_times()
+            except psutil.Error:
+                continue
+            cpu = (cpu_times.user, cpu_times.system)
+            self.cpu_start.setdefault(pid, cpu if self.first_sample else (0.0, 0.0))
+            self.cpu_last[pid] = cpu
+        self.first_sample = False
+        self.memory_peak = max(self.memory_peak, memory)
+
+    async def run(self, stop_event: Event) -> None:
+        while not stop_event.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=PROCESSES_SAMPLE_INTERVAL)
+            except TimeoutError:
+                pass
+        self.sample()
+
+    def usage(self) -> dict[str, float]:
+        """Return memory peak (bytes) and user, system and total CPU time (seconds) in terms of Metric."""
+        user_sec = sum(last[0] - self.cpu_start[pid][0] for pid, last in self.cpu_last.items())
+        system_sec = sum(last[1] - self.cpu_start[pid][1] for pid, last in self.cpu_last.items())
+        return {
+            "memory_peak": self.memory_peak,
+            "user_sec": user_sec,
+            "system_sec": system_sec,
+            "usage_sec": user_sec + system_sec,
+        }
+
 
 class ResourceGather(ABC):
     def __init__(self, test: TestPyTest):
-        # get the event loop for the current thread or create a new one if there's none
-        try:
-            self.loop = asyncio.get_running_loop()
-            self.own_loop = False
-        except RuntimeError:
-            self.loop = asyncio.new_event_loop()
-            self.own_loop = True
+        self.own_loop = False
         self.test = test
         self.db_path = self.test.suite.log_dir.parent / DEFAULT_DB_NAME
         standardized_name = self.test.shortname.replace("/", "_")
@@ -77,6 +179,15 @@ class ResourceGather(ABC):
         )
         self.logger = logging.getLogger(__name__)
 
+    @cached_property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        # get the event loop for the current thread or create a new one if there's none
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            self.own_loop = True
+            return asyncio.new_event_loop()
+
     def __del__(self):
         if self.own_loop:
             self.loop.close()
@@ -143,7 +254,7 @@ class ResourceGatherOff(ResourceGather):
 class ResourceGatherOn(ResourceGather):
     def __init__(self, test: TestPyTest):
         super().__init__(test)
-        self.sqlite_writer = SQLiteWriter(self.db_path)
+        self.sqlite_writer = get_sqlite_writer(self.db_path)
         self.test_id: int = self.sqlite_writer.write_row_if_not_exist(
             Test(
                 host_id=HOST_ID,
@@ -154,6 +265,7 @@ class ResourceGatherOn(ResourceGather):
                 test_name=test.shortname,
             ),
             TESTS_TABLE)
+        self.pressure_max: dict[str, float] = {}
 
     def make_cgroup(self) -> None:
         os.makedirs(self.cgroup_path, exist_ok=True)
@@ -173,6 +285,17 @@ class ResourceGatherOn(ResourceGather):
         if cpu_stat.exists():
             with open(cpu_stat, 'r', ) as file:
                 self._parse_cpu_stat(file, test_metrics)
+
+        # The cgroup is created for the test, so the totals are of the test only.
+        for resource in PRESSURE_RESOURCES:
+            if pressure := read_pressure(self.cgroup_path / f'{resource}.pressure'):
+                for kind in ('some', 'full'):
+                    if kind in pressure:
+                        setattr(test_metrics, f'{resource}_pressure_{kind}_sec', pressure[kind]['total'] / 1_000_000)
+            if resource in self.pressure_max:
+                setattr(test_metrics, f'{resource}_pressure_max', self.pressure_max[resource])
+        if io_stat := read_io_stat(self.cgroup_path / 'io.stat'):
+            test_metrics.io_read_bytes, test_metrics.io_write_bytes = io_stat
         return test_metrics
 
     def run_process(self,
@@ -181,20 +304,26 @@ class ResourceGatherOn(ResourceGather):
                     output_file: Path,
                     cwd: Path | None = None,
                     env: dict | None = None) -> subprocess.Popen[str]:
-        stop_monitoring = asyncio.Event()
+        stop_monitoring = threading.Event()
 
         self.test.time_start = time.time()
-        test_resource_watcher = self.cgroup_monitor(test_event=stop_monitoring)
+        # The process is waited for synchronously, so the cgroup is sampled in a thread.
+        test_resource_watcher = threading.Thread(target=self._monitor_cgroup_in_thread,
+                                                 args=(stop_monitoring,),
+                                                 name=f"cgroup_monitor_{self.test.id}",
+                                                 daemon=True)
+        test_resource_watcher.start()
         try:
             p = super().run_process(args=args, timeout=timeout, output_file=output_file, cwd=cwd, env=env)
         finally:
             stop_monitoring.set()
             self.test.time_end = time.time()
-            self.loop.run_until_complete(asyncio.gather(test_resource_watcher))
+            test_resource_watcher.join()
         return p
 
     def write_metrics_to_db(self, metrics: Metric, success: bool = False) -> None:
         metrics.success = success
+        self.sqlite_writer.flush()
         self.sqlite_writer.write_row(metrics, METRICS_TABLE)
 
     def put_process_to_cgroup(self) -> None:
@@ -214,22 +343,66 @@ class ResourceGatherOn(ResourceGather):
     def cgroup_monitor(self, test_event: Event) -> Task:
         return self.loop.create_task(self._monitor_cgroup(test_event))
 
+    def _sample_cgroup(self) -> CgroupMetric:
+        with open(self.cgroup_path / 'memory.current', 'r') as memory_current:
+            sample = CgroupMetric(
+                test_id=self.test_id,
+                host_id=HOST_ID,
+                memory=int(memory_current.read()),
+                timestamp=datetime.now()
+            )
+        for resource in PRESSURE_RESOURCES:
+            if pressure := read_pressure(self.cgroup_path / f'{resource}.pressure'):
+                value = pressure['some']['avg10']
+                setattr(sample, f'{resource}_pressure', value)
+                self.pressure_max[resource] = max(self.pressure_max.get(resource, 0.0), value)
+        if io_stat := read_io_stat(self.cgroup_path / 'io.stat'):
+            sample.io_read_bytes, sample.io_write_bytes = io_stat
+        return sample
+
+    @staticmethod
+    def _changed(previous: CgroupMetric | None, sample: CgroupMetric) -> bool:
+        if previous is None:
+            return True
+        if abs(sample.memory - previous.memory) > MEMORY_CHANGE_THRESHOLD * max(previous.memory, 1):
+            return True
+        return any(abs((getattr(sample, f'{resource}_pressure') or 0.0)
+                       - (getattr(previous, f'{resource}_pressure') or 0.0)) > PRESSURE_CHANGE_THRESHOLD
+                   for resource in PRESSURE_RESOURCES)
+
+    def _record_sample(self, previous: CgroupMetric | None, interval: float) -> tuple[CgroupMetric, float]:
+        """Sample the cgroup, and return the sample and the interval till the next one.
+
+        The sampling rate adapts to the test: it's high while the usage changes and drops while it's stable.
+        """
+        sample = self._sample_cgroup()
+        self.sqlite_writer.queue_row(sample, CGROUP_MEMORY_METRICS_TABLE)
+        if self._changed(previous, sample):
+            return sample, MIN_SAMPLE_INTERVAL
+        return sample, min(interval * 2, MAX_SAMPLE_INTERVAL)
+
+    def _monitor_cgroup_in_thread(self, test_event: threading.Event) -> None:
+        """Same as _monitor_cgroup(), for a test which is waited for synchronously."""
+        interval = MIN_SAMPLE_INTERVAL
+        previous = None
+        try:
+            while not test_event.is_set():
+                previous, interval = self._record_sample(previous, interval)
+                test_event.wait(timeout=interval)
+        except OSError as e:
+            self.logger.warning("cgroup monitoring of %s failed: %s", self.test, e)
+
     async def _monitor_cgroup(self, test_event: Event) -> None:
-        """Continuously monitors CPU and memory utilization."""
+        """Continuously monitors memory, pressure of CPU, I/O and memory, and I/O of the test."""
+        interval = MIN_SAMPLE_INTERVAL
+        previous = None
         try:
             while not test_event.is_set():
-                with  open(self.cgroup_path / 'memory.current', 'r') as memory_current:
-                    timeline_record = CgroupMetric(
-                        test_id=self.test_id,
-                        host_id=HOST_ID,
-                        memory=int(memory_current.read()),
-                        timestamp=datetime.now()
-                    )
-
-                    self.sqlite_writer.write_row(timeline_record, CGROUP_MEMORY_METRICS_TABLE)
-
-                # Control the frequency of updates, for example, every 2 seconds
-                await asyncio.sleep(1)
+                previous, interval = self._record_sample(previous, interval)
+                try:
+                    await asyncio.wait_for(test_event.wait(), timeout=interval)
+                except TimeoutError:
+                    pass
         except asyncio.CancelledError:
             self.logger.info(f'cgroup monitoring job was cancelled')
 
@@ -321,10 +494,11 @@ async def monitor_resources(cancel_event: Event, stop_event: Event, tmpdir: Path
             timestamp=datetime.now(),
         )
 
-        sqlite_writer.write_row(timeline_record, SYSTEM_RESOURCE_METRICS_TABLE)
+        sqlite_writer.queue_row(timeline_record, SYSTEM_RESOURCE_METRICS_TABLE)
 
         # Control the frequency of updates, for example, every 2 seconds
         await asyncio.sleep(2)
+    sqlite_writer.flush()
 
 
 async def no_monitor() -> None:
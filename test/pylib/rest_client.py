@@ -7,16 +7,23 @@
 """
 from __future__ import annotations                           # Type hints as strings
 
+import asyncio
+import bisect
 import logging
 import os.path
+import re
+import sys
+import time
+from array import array
 from urllib.parse import quote
 from abc import ABCMeta
-from collections.abc import Mapping
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
 from contextlib import asynccontextmanager
 from typing import Any, Optional, AsyncIterator
 
 import pytest
-from aiohttp import request, BaseConnector, UnixConnector, ClientTimeout
+from aiohttp import BaseConnector, ClientSession, ClientTimeout, TCPConnector, UnixConnector
 from cassandra.pool import Host                          # type: ignore # pylint: disable=no-name-in-module
 
 from test.pylib.internal_types import IPAddress, HostID
@@ -40,15 +47,80 @@ class HTTPError(Exception):
                f"params: {self.params}, json: {self.json}, body:\n{self.message}"
 
 
+class RequestStats:
+    """Counters of the requests sent by a REST client"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def add(self, latency: float, failed: bool) -> None:
+        self.requests += 1
+        self.failures += failed
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def __str__(self):
+        return f"{self.requests} requests, {self.failures} failed, " \
+               f"latency mean {self.mean_latency * 1000:.1f}ms max {self.max_latency * 1000:.1f}ms"
+
+
 # TODO: support ssl and verify_ssl
 class RESTClient(metaclass=ABCMeta):
-    """Base class for sesion-free REST client"""
-    connector: Optional[BaseConnector]
+    """Base class for REST clients.
+
+    Requests are sent through a long-lived session, so connections are kept alive and reused instead of
+    connecting for every request.  The number of connections, and so the number of requests in flight, is bounded
+    by `max_connections` and `max_connections_per_host`, other requests wait for a free connection.
+
+    A session is bound to an event loop, and a client can be used from several loops (e.g., from a test and from
+    a thread running a loop of its own), so there is a session per loop.
+    """
+    connector: Optional[BaseConnector]   # shared by the sessions if set, otherwise each session has its own
     uri_scheme: str   # e.g. http, http+unix
     default_host: str
     default_port: Optional[int]
+    max_connections: int = 256
+    max_connections_per_host: int = 32
     # pylint: disable=too-many-arguments
 
+    def __init__(self):
+        self.sessions: dict[asyncio.AbstractEventLoop, ClientSession] = {}
+        self.stats = RequestStats()
+
+    def _get_session(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self.sessions.get(loop)
+        if session is None or session.closed:
+            # Forget sessions of loops which are gone, their connections can't be closed anymore.
+            for closed_loop in [l for l in self.sessions if l.is_closed()]:
+                del self.sessions[closed_loop]
+            if self.connector is not None:
+                session = ClientSession(connector=self.connector, connector_owner=False)
+            else:
+                session = ClientSession(connector=TCPConnector(limit=self.max_connections,
+                                                               limit_per_host=self.max_connections_per_host))
+            self.sessions[loop] = session
+        return session
+
+    async def close_sessions(self) -> None:
+        """Close all sessions and their connections.  A new session is opened if the client is used again."""
+        sessions, self.sessions = self.sessions, {}
+        current_loop = asyncio.get_running_loop()
+        for loop, session in sessions.items():
+            if loop is current_loop:
+                await session.close()
+            elif loop.is_running():
+                # A session can be closed only in its own loop, which runs in another thread.
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        logger.debug("%s closed: %s", type(self).__name__, self.stats)
+
     async def _fetch(self, method: str, resource: str, response_type: Optional[str] = None,
                      host: Optional[str] = None, port: Optional[int] = None,
                      params: Optional[Mapping[str, str]] = None,
@@ -67,17 +139,22 @@ class RESTClient(metaclass=ABCMeta):
         logging.debug(f"RESTClient fetching {method} {uri}")
 
         client_timeout = ClientTimeout(total = timeout if timeout is not None else 300)
-        async with request(method, uri,
-                           connector = self.connector if hasattr(self, "connector") else None,
-                           params = params, json = json, timeout = client_timeout) as resp:
-            if allow_failed:
-                return await resp.json()
-            if resp.status != 200:
-                text = await resp.text()
-                raise HTTPError(uri, resp.status, params, json, text)
-            if response_type is not None:
-                # Return response.text() or response.json()
-                return await getattr(resp, response_type)()
+        started = time.monotonic()
+        failed = True
+        try:
+            async with self._get_session().request(method, uri, params = params, json = json,
+                                                   timeout = client_timeout) as resp:
+                failed = resp.status != 200
+                if allow_failed:
+                    return await resp.json()
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise HTTPError(uri, resp.status, params, json, text)
+                if response_type is not None:
+                    # Return response.text() or response.json()
+                    return await getattr(resp, response_type)()
+        finally:
+            self.stats.add(time.monotonic() - started, failed)
         return None
 
     async def get(self, resource_uri: str, host: Optional[str] = None, port: Optional[int] = None,
@@ -131,6 +208,7 @@ class UnixRESTClient(RESTClient):
     """An async helper for REST API operations using AF_UNIX socket"""
 
     def __init__(self, sock_path: str):
+        super().__init__()
         # NOTE: using Python requests style URI for Unix domain sockets to avoid using "localhost"
         #       host parameter is ignored but set to socket name as convention
         self.uri_scheme: str = "http"
@@ -138,6 +216,7 @@ class UnixRESTClient(RESTClient):
         self.connector = UnixConnector(path=sock_path)
 
     async def shutdown(self):
+        await self.close_sessions()
         await self.connector.close()
 
 
@@ -145,15 +224,14 @@ class TCPRESTClient(RESTClient):
     """An async helper for REST API operations"""
 
     def __init__(self, port: int):
+        super().__init__()
         self.uri_scheme = "http"
         self.connector = None
         self.default_port: int = port
 
-    def close(self):
-        """Close the connector and release resources"""
-        if self.connector is not None:
-            self.connector.close()
-            self.connector = None
+    async def close(self):
+        """Close the connections and release resources"""
+        await self.close_sessions()
 
 @universalasync_typed_wrap
 class ScyllaRESTAPIClient:
@@ -616,9 +694,13 @@ class ScyllaRESTAPIClient:
         assert level in ["trace", "debug", "info", "warn", "error"]
         await self.client.post(f"/system/log", host=node_ip, params={"message": message, "level": level})
 
-    def close(self):
+    @property
+    def stats(self) -> RequestStats:
+        return self.client.stats
+
+    async def close(self):
         """Close the client and release resources (connectors, file descriptors)"""
-        self.client.close()
+        await self.client.close()
 
 
 class ScyllaMetricsLine:
@@ -643,9 +725,75 @@ class ScyllaMetricsLine:
         value = float(line[labels_finish + 2:])
         return ScyllaMetricsLine(name, labels, value)
 
+LabelSet = tuple[tuple[str, str], ...]   # sorted (name, value) pairs
+
+
+class MetricSeries:
+    """All series of a metric: interned label sets, values in an array and an index
+       of rows by (label, value) pair"""
+
+    __slots__ = ("label_sets", "values", "index")
+
+    def __init__(self):
+        self.label_sets: list[LabelSet] = []
+        self.values = array("d")
+        self.index: dict[tuple[str, str], list[int]] = defaultdict(list)
+
+    def add(self, label_set: LabelSet, value: float) -> None:
+        row = len(self.values)
+        self.label_sets.append(label_set)
+        self.values.append(value)
+        for pair in label_set:
+            self.index[pair].append(row)
+
+    def rows(self, labels: Mapping[str, Any]) -> Iterable[int]:
+        """Rows of the series having all given label values"""
+        if not labels:
+            return range(len(self.values))
+        matching: Optional[set[int]] = None
+        for key, value in labels.items():
+            rows = self.index.get((key, str(value)))
+            if not rows:
+                return []
+            matching = set(rows) if matching is None else matching.intersection(rows)
+        return sorted(matching)
+
+
 class ScyllaMetrics:
+    """A snapshot of the metrics of a node.
+
+    The page is parsed once into series indexed by metric name, so lookups don't scan
+    and re-parse the lines.  Snapshots can be subtracted: `after - before` is a snapshot
+    of the changes of the values (series missing in `before` count from zero.)
+    """
+    _LINE_PATTERN = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?P<labels>.*)\})?\s+(?P<value>\S+)')
+    _LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
     def __init__(self, lines: list[str]):
         self.lines: list[str] = lines
+        self.series: dict[str, MetricSeries] = {}
+        label_sets: dict[str, LabelSet] = {}   # interned by the text between the braces
+        for line in lines:
+            if not line or line.startswith('#'):
+                continue
+            match = self._LINE_PATTERN.match(line)
+            if match is None:
+                continue
+            try:
+                value = float(match.group('value'))
+            except ValueError:
+                continue
+            label_str = match.group('labels') or ''
+            label_set = label_sets.get(label_str)
+            if label_set is None:
+                label_set = tuple(sorted((sys.intern(k), sys.intern(v))
+                                         for k, v in self._LABEL_PATTERN.findall(label_str)))
+                label_sets[label_str] = label_set
+            name = match.group('name')
+            if (series := self.series.get(name)) is None:
+                series = self.series[name] = MetricSeries()
+            series.add(label_set, value)
+        self._names = sorted(self.series)
 
     def lines_by_prefix(self, prefix: str):
         """Returns all metrics whose name starts with a prefix, e.g.
@@ -653,8 +801,19 @@ class ScyllaMetrics:
         """
         return [l for l in self.lines if l.startswith(prefix)]
 
-    def _labels_match(self, metric_labels: dict, filter_labels: dict):
-        return all(metric_labels.get(k) == str(v) for k, v in filter_labels.items())
+    def names(self, prefix: str = '') -> list[str]:
+        """Names of the metrics starting with the prefix"""
+        first = bisect.bisect_left(self._names, prefix)
+        last = first
+        while last < len(self._names) and self._names[last].startswith(prefix):
+            last += 1
+        return self._names[first:last]
+
+    def values(self, name: str, labels: Mapping[str, Any] = {}) -> list[tuple[dict[str, str], float]]:
+        """Labels and values of the series of metrics starting with `name` and having all given label values"""
+        return [(dict(series.label_sets[row]), series.values[row])
+                for series in map(self.series.__getitem__, self.names(name))
+                for row in series.rows(labels)]
 
     def get(self, name: str, labels = {}):
         """Get the metric value by name, optionally filtering by labels.
@@ -669,13 +828,41 @@ class ScyllaMetrics:
 
         Returns the sum of all matching metric values, or None if no matches found.
         """
-        values = [
-            parsed_line.value
-            for l in self.lines_by_prefix(name)
-            if (parsed_line := ScyllaMetricsLine.from_string(l)) is not None
-            and self._labels_match(parsed_line.labels, labels)
-        ]
-        return sum(values) if values else None
+        found = False
+        total = 0.0
+        for series in map(self.series.__getitem__, self.names(name)):
+            rows = series.rows(labels)
+            if isinstance(rows, range):
+                total += sum(series.values)
+                found = found or bool(rows)
+            elif rows:
+                total += sum(series.values[row] for row in rows)
+                found = True
+        return total if found else None
+
+    def group_by(self, name: str, by: Sequence[str], labels: Mapping[str, Any] = {}) -> dict[tuple[str, ...], float]:
+        """Sum the values of the matching series (see `get()`) grouped by values of the `by` labels, e.g.
+           metrics.group_by('scylla_transport_requests_served', ['shard'])
+           returns {('0',): 10.0, ('1',): 12.0}.  A missing label is grouped as ''.
+        """
+        groups: dict[tuple[str, ...], float] = defaultdict(float)
+        for series in map(self.series.__getitem__, self.names(name)):
+            for row in series.rows(labels):
+                label_dict = dict(series.label_sets[row])
+                groups[tuple(label_dict.get(label, '') for label in by)] += series.values[row]
+        return dict(groups)
+
+    def __sub__(self, before: ScyllaMetrics) -> ScyllaMetrics:
+        delta = ScyllaMetrics([])
+        for name, series in self.series.items():
+            before_values: dict[LabelSet, float] = {}
+            if (before_series := before.series.get(name)) is not None:
+                before_values = dict(zip(before_series.label_sets, before_series.values))
+            delta_series = delta.series[name] = MetricSeries()
+            for label_set, value in zip(series.label_sets, series.values):
+                delta_series.add(label_set, value - before_values.get(label_set, 0.0))
+        delta._names = list(self._names)
+        return delta
 
 class ScyllaMetricsClient:
     """Async Scylla Metrics API client"""
@@ -687,6 +874,10 @@ class ScyllaMetricsClient:
         data = await self.client.get_text('/metrics', host=server_ip)
         return ScyllaMetrics(data.split('\n'))
 
+    async def close(self):
+        """Close the client and release resources (connectors, file descriptors)"""
+        await self.client.close()
+
 
 class InjectionHandler():
     """An async client for communicating with injected code by REST API"""
@@ -13,12 +13,15 @@ import pathlib
 import platform
 import random
 import sys
+import time
 from argparse import BooleanOptionalAction
 from collections import defaultdict
+from contextlib import nullcontext
 from itertools import chain, count, product
 from functools import cache, cached_property
 from pathlib import Path
 from random import randint
+from types import SimpleNamespace
 from typing import TYPE_CHECKING, Callable
 
 import pytest
@@ -28,6 +31,16 @@ from _pytest.junitxml import xml_key
 
 
 from test import ALL_MODES, DEBUG_MODES, TEST_RUNNER, TOP_SRC_DIR, TESTPY_PREPARED_ENVIRONMENT, HOST_ID
+from test.pylib.db.reader import read_test_history
+from test.pylib.resource_gather import get_resource_gather
+from test.pylib.scheduling import (
+    ResourceAdmission,
+    ResourceEstimate,
+    WorkUnit,
+    get_default_resource_estimate,
+    get_memory_budget,
+    plan_by_history,
+)
 from test.pylib.scylla_cluster import merge_cmdline_options
 from test.pylib.suite.base import (
     SUITE_CONFIG_FILENAME,
@@ -45,6 +58,7 @@ if TYPE_CHECKING:
     import _pytest.nodes
     import _pytest.scope
 
+    from test.pylib.db.model import TestHistory
     from test.pylib.suite.base import Test
 
 
@@ -55,6 +69,11 @@ REPEATING_FILES = pytest.StashKey[set[pathlib.Path]]()
 BUILD_MODE = pytest.StashKey[str]()
 RUN_ID = pytest.StashKey[int]()
 PYTEST_LOG_FILE = pytest.StashKey[str]()
+TEST_FAILED = pytest.StashKey[bool]()
+TESTS_HISTORY = pytest.StashKey[dict[str, dict[tuple[str, str], "TestHistory"]]]()
+ADMISSION = pytest.StashKey[ResourceAdmission]()
+# Memory and CPU usage of Scylla servers used by the test, the servers are not in its cgroup.
+SERVERS_RESOURCES = pytest.StashKey[dict[str, float]]()
 
 EXIT_MAXFAIL_REACHED = 11
 
@@ -76,6 +95,16 @@ def pytest_addoption(parser: pytest.Parser) -> None:
                      help='Switch on gathering cgroup metrics')
     parser.addoption('--random-seed', action="store",
                      help="Random number generator seed to be used by boost tests")
+    parser.addoption("--schedule-by-history", action=BooleanOptionalAction, default=False,
+                     help="Order test files using durations and memory peaks of the previous runs stored in the "
+                          "metrics database: the longest files start first and memory-heavy files are spread over "
+                          "the run.  Use with --dist=load to start them on the workers in this order")
+    parser.addoption("--admission-control", action=BooleanOptionalAction, default=False,
+                     help="Start a test only when the memory and CPUs it is expected to use (declared with the "
+                          "`resources` mark or learned from the metrics database) are available.  Memory-heavy tests "
+                          "wait for each other instead of running together in different workers, and the memory of "
+                          "pooled clusters is reserved while they live, so more workers than memory would allow can "
+                          "be used")
 
     # Following option is to use with bare pytest command.
     #
@@ -100,6 +129,21 @@ def pytest_addoption(parser: pytest.Parser) -> None:
     parser.addoption("--cluster-pool-size", type=int,
                      help="Set the pool_size for PythonTest and its descendants.  Alternatively environment variable "
                           "CLUSTER_POOL_SIZE can be used to achieve the same")
+    parser.addoption("--cluster-pool-spares", type=int,
+                     help="Number of clean clusters the cluster pool keeps booted in background (up to pool_size), "
+                          "so tests don't wait for a cluster to start.  Alternatively environment variable "
+                          "CLUSTER_POOL_SPARES can be used to achieve the same")
+    parser.addoption("--cluster-template", action="store_true", default=False,
+                     help="Bootstrap the first cluster of a suite once, save its data as a template and clone new "
+                          "clusters from it instead of bootstrapping them from empty.  Alternatively environment "
+                          "variable CLUSTER_TEMPLATE=1 can be used to achieve the same")
+    parser.addoption("--compress-artifacts", action="store_true", default=False,
+                     help="Compress the logs and data directories of Scylla servers kept after the run (e.g., of failed "
+                          "suites) with zstd in the background.  Alternatively environment variable COMPRESS_ARTIFACTS=1 "
+                          "can be used to achieve the same")
+    parser.addoption("--coverage-map", action="store", default=None,
+                     help="Run every test case of C++ tests in `coverage` mode with its own raw profile, to update a "
+                          "per-test coverage map with them (see `test-impact` commands of test/pylib/coverage_utils.py)")
     parser.addoption("--extra-scylla-cmdline-options", default='',
                      help="Passing extra scylla cmdline options for all tests.  Options should be space separated:"
                           " '--logger-log-level raft=trace --default-log-level error'")
@@ -175,7 +219,7 @@ def scylla_binary(testpy_test) -> Path:
     return testpy_test.suite.scylla_exe
 
 
-def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
     for item in items:
         modify_pytest_item(item=item)
 
@@ -187,6 +231,131 @@ def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
 
     items.sort(key=sort_key)
 
+    if config.getoption("--schedule-by-history"):
+        sort_items_by_history(config=config, items=items)
+
+
+def get_tests_history(config: pytest.Config) -> dict[str, dict[tuple[str, str], TestHistory]]:
+    """Tests history by build mode, read from the metrics database once per pytest process."""
+    if TESTS_HISTORY not in config.stash:
+        tmpdir = pathlib.Path(config.getoption("--tmpdir")).absolute()
+        config.stash[TESTS_HISTORY] = {mode: read_test_history(tmpdir=tmpdir, mode=mode) for mode in config.build_modes}
+    return config.stash[TESTS_HISTORY]
+
+
+def get_history_key(item: pytest.Item) -> tuple[str, str]:
+    """Return (directory, test_name) the item is stored with in the metrics database."""
+    name = item.name.removesuffix(f".{item.stash[BUILD_MODE]}.{item.stash[RUN_ID]}")
+    if item.get_closest_marker("cpp"):
+        # See CppTestCase.make_testpy_test_object_mock()
+        return item.path.stem, name
+    suite = item.stash[TEST_SUITE]
+    return suite.name if suite else item.path.parent.name, f"{item.path.stem}::{name}"
+
+
+def sort_items_by_history(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Reorder test files according to the plan built from the metrics database (see test/pylib/scheduling.py.)
+
+    Test cases of a file are kept together to not pay for module-scoped fixtures more than once, and files from
+    `run_first` lists are kept in front.  The order must be the same in all xdist workers, so it depends on the
+    collected items and the database content only.
+    """
+    history = get_tests_history(config=config)
+    if not any(history.values()):
+        logger.info("No tests history found, keep the default order")
+        return
+
+    files: dict[pytest.Stash, list[pytest.Item]] = {}
+    for item in items:
+        files.setdefault(get_params_stash(node=item), []).append(item)
+    groups = list(files.values())
+
+    units = []
+    for index, group in enumerate(groups):
+        records = [history[item.stash[BUILD_MODE]].get(get_history_key(item)) for item in group]
+        known = [record for record in records if record is not None]
+        units.append(WorkUnit(
+            index=index,
+            duration=sum(record.time_taken for record in known) * len(records) / len(known) if known else None,
+            memory=max((record.memory_peak for record in known if record.memory_peak is not None), default=None),
+        ))
+    workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 0)) or getattr(config.option, "numprocesses", None) or 1
+    order = {index: position for position, index in enumerate(
+        plan_by_history(units=units, workers=int(workers), memory_budget=get_memory_budget())
+    )}
+
+    def sort_key(index: int) -> tuple[bool, int]:
+        item = groups[index][0]
+        suite = item.stash[TEST_SUITE]
+        return bool(suite) and item.path.stem not in suite.cfg.get("run_first", []), order[index]
+
+    items[:] = chain.from_iterable(groups[index] for index in sorted(range(len(groups)), key=sort_key))
+    logger.info("%d test files ordered by history of %d tests", len(groups), sum(map(len, history.values())))
+
+
+def get_resource_estimate(item: pytest.Item) -> ResourceEstimate:
+    """Memory and CPUs the test is expected to use: declared with `resources` mark, learned from the metrics
+    database, or the default for the build mode."""
+    build_mode = item.stash[BUILD_MODE]
+    resources = get_default_resource_estimate(is_debug=build_mode in DEBUG_MODES)
+    if record := get_tests_history(config=item.config)[build_mode].get(get_history_key(item)):
+        if record.memory_peak:
+            resources.memory = record.memory_peak
+        if record.cpus:
+            resources.cpus = record.cpus
+    if mark := item.get_closest_marker("resources"):
+        resources.memory = int(mark.kwargs.get("memory", resources.memory))
+        resources.cpus = float(mark.kwargs.get("cpus", resources.cpus))
+    return resources
+
+
+def write_test_metrics(item: pytest.Item, time_start: float) -> None:
+    directory, test_name = get_history_key(item)
+    resource_gather = get_resource_gather(is_switched_on=True, test=SimpleNamespace(
+        time_start=time_start,
+        time_end=time.time(),
+        id=item.stash[RUN_ID],
+        mode=item.stash[BUILD_MODE],
+        success=not item.stash.get(TEST_FAILED, False),
+        shortname=test_name,
+        suite=SimpleNamespace(
+            log_dir=pathlib.Path(item.config.getoption("--tmpdir")).joinpath(item.stash[BUILD_MODE]).absolute(),
+            name=directory,
+        ),
+    ))
+    metrics = resource_gather.get_test_metrics()
+    for field, value in item.stash.get(SERVERS_RESOURCES, {}).items():
+        setattr(metrics, field, value)
+    resource_gather.write_metrics_to_db(
+        metrics=metrics,
+        success=not item.stash.get(TEST_FAILED, False),
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item: pytest.Item, nextitem: pytest.Item | None) -> Generator[None, object, object]:
+    """Wait for resources if admission control is enabled and store duration of Python tests (and usage of Scylla
+    servers they use) to the metrics database.  C++ tests store their metrics by themselves."""
+    if not item.config.getoption("--test-py-init"):
+        return (yield)
+
+    if item.config.getoption("--admission-control"):
+        admission = item.config.stash.setdefault(ADMISSION, ResourceAdmission(
+            tmpdir=pathlib.Path(item.config.getoption("--tmpdir")).absolute(),
+        ))
+        TestSuite.admission = admission
+        admitted = admission.admit(name=item.nodeid, resources=get_resource_estimate(item=item))
+    else:
+        admitted = nullcontext()
+
+    with admitted:
+        time_start = time.time()
+        try:
+            return (yield)
+        finally:
+            if item.config.getoption("--gather-metrics") and not item.get_closest_marker("cpp"):
+                write_test_metrics(item=item, time_start=time_start)
+
 
 def pytest_sessionstart(session: pytest.Session) -> None:
     # test.py starts S3 mock and create/cleanup testlog by itself. Also, if we run with --collect-only option,
@@ -206,6 +375,9 @@ def pytest_sessionstart(session: pytest.Session) -> None:
         init_testsuite_globals()
         TestSuite.artifacts.add_exit_artifact(None, TestSuite.hosts.cleanup)
 
+    if not is_xdist_worker and session.config.getoption("--admission-control"):
+        ResourceAdmission.reset(tmpdir=pathlib.Path(session.config.getoption("--tmpdir")).absolute())
+
     # Run stuff just once for the main pytest process (not in xdist workers).
     # Only prepare the environment if it hasn't been prepared by test.py
     if not is_xdist_worker and TESTPY_PREPARED_ENVIRONMENT not in os.environ:
@@ -381,6 +553,8 @@ def pytest_runtest_makereport(item, call):
 
     if _pytest_config.getoption("--test-py-init"):
         rep = outcome.get_result()
+        if rep.failed:
+            item.stash[TEST_FAILED] = True
         # we only look at actual failing test calls, not setup/teardown
         pytest_tests_logs = pathlib.Path(_pytest_config.getoption("--tmpdir")).absolute() / PYTEST_TESTS_LOGS_FOLDER
         if rep.failed or _pytest_config.getoption("--save-log-on-success"):
@@ -0,0 +1,261 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+"""Schedule tests using the history of previous runs stored in the metrics database.
+
+Ordering.  The runner gets a list of work units (tests which should run one after another on the same worker, i.e.,
+all test cases of a test file) with their expected duration and memory peak, and the plan is built by
+simulating `workers` parallel workers: the longest units start first (LPT scheduling), but a unit is not
+started while the units already running on the other workers would exceed the memory budget together with it.
+The result is the order in which the units should be handed over to the workers.
+
+Admission control.  The number of workers is not limited by memory when admission control is enabled: every
+worker asks ResourceAdmission for the memory and CPUs the test is expected to use before running it and waits
+while the tests running in the other workers have reserved the machine.  Reservations are kept in a JSON
+ledger shared by all workers and protected by a file lock.  Clusters kept in the cluster pools (and the spare
+ones) outlive tests, so their memory is reserved for as long as they live.  The cluster used by a test is
+a part of the test's memory estimate, so a worker reserves the larger of the memory of its test and of its
+clusters.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import heapq
+import json
+import logging
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from attr import define
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+    from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+MIN_SYSTEM_MEMORY_RESERVE = 5e9
+MAX_SYSTEM_MEMORY_RESERVE = 8e9
+SYSTEM_MEMORY_RESERVE_FRACTION = 16
+
+DEFAULT_TEST_MEMORY = 4e9
+DEBUG_TEST_MEMORY_MULTIPLIER = 1.5
+DEFAULT_TEST_CPUS = 1.0
+DEBUG_TEST_CPUS = 1.5
+
+ADMISSION_LEDGER_FILENAME = "admission.json"
+CLUSTER_RESERVATION_SEPARATOR = ":"
+ADMISSION_POLL_INTERVAL = 0.5
+
+
+@define
+class WorkUnit:
+    index: int
+    duration: float | None = None
+    memory: int | None = None
+
+
+def get_system_memory() -> int:
+    return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+
+
+def get_memory_budget(system_memory: int | None = None) -> int:
+    """Memory available for tests: the system memory without the reserve for the OS and test.py itself."""
+    if system_memory is None:
+        system_memory = get_system_memory()
+    reserve = min(
+        max(system_memory / SYSTEM_MEMORY_RESERVE_FRACTION, MIN_SYSTEM_MEMORY_RESERVE),
+        MAX_SYSTEM_MEMORY_RESERVE,
+    )
+    return int(max(0, system_memory - reserve))
+
+
+def fill_unknown(units: Iterable[WorkUnit]) -> list[WorkUnit]:
+    """Use a median of known values for units without history."""
+    units = list(units)
+    durations = [unit.duration for unit in units if unit.duration is not None]
+    memories = [unit.memory for unit in units if unit.memory is not None]
+    default_duration = statistics.median(durations) if durations else 0.0
+    default_memory = int(statistics.median(memories)) if memories else 0
+    for unit in units:
+        if unit.duration is None:
+            unit.duration = default_duration
+        if unit.memory is None:
+            unit.memory = default_memory
+    return units
+
+
+def plan_by_history(units: Iterable[WorkUnit], workers: int, memory_budget: int) -> list[int]:
+    """Return indexes of the work units in the order they should be started in."""
+    pending = sorted(fill_unknown(units), key=lambda unit: (-unit.duration, unit.index))
+    free_workers = [(0.0, worker) for worker in range(max(1, workers))]
+    running: list[tuple[float, int]] = []  # (end time, memory) of the units started
+    memory_used = 0
+    order = []
+
+    while pending:
+        now, worker = heapq.heappop(free_workers)
+        while running and running[0][0] <= now:
+            memory_used -= heapq.heappop(running)[1]
+
+        # The longest unit which fits into the budget.  If nothing is running, take the longest
+        # unit anyway, otherwise it never starts.
+        for position, unit in enumerate(pending):
+            if not running or memory_used + unit.memory <= memory_budget:
+                break
+        else:
+            # Wait for the next unit to finish and try again.
+            heapq.heappush(free_workers, (running[0][0], worker))
+            continue
+
+        del pending[position]
+        order.append(unit.index)
+        heapq.heappush(running, (now + unit.duration, unit.memory))
+        memory_used += unit.memory
+        heapq.heappush(free_workers, (now + unit.duration, worker))
+
+    return order
+
+
+@define
+class ResourceEstimate:
+    memory: int
+    cpus: float
+
+
+def parse_memory_size(size: str) -> int:
+    """Parse a seastar memory size, e.g., 512M or 1G, into bytes."""
+    suffixes = "KMGT"
+    if size and size[-1].upper() in suffixes:
+        return int(float(size[:-1]) * 1024 ** (suffixes.index(size[-1].upper()) + 1))
+    return int(size)
+
+
+def get_available_memory() -> int:
+    with open("/proc/meminfo") as meminfo:
+        for line in meminfo:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    return get_system_memory()
+
+
+def get_default_resource_estimate(is_debug: bool) -> ResourceEstimate:
+    if is_debug:
+        return ResourceEstimate(memory=int(DEFAULT_TEST_MEMORY * DEBUG_TEST_MEMORY_MULTIPLIER), cpus=DEBUG_TEST_CPUS)
+    return ResourceEstimate(memory=int(DEFAULT_TEST_MEMORY), cpus=DEFAULT_TEST_CPUS)
+
+
+class ResourceAdmission:
+    """Admit tests to run while the reserved memory and CPUs fit into the machine.
+
+    A test is always admitted if no other test is running, so a test which needs more than the whole budget
+    still runs, alone, and tests don't wait forever for the clusters kept by idle workers.
+    """
+
+    def __init__(self, tmpdir: Path, memory_budget: int | None = None, cpu_budget: float | None = None):
+        self.ledger_path = tmpdir / ADMISSION_LEDGER_FILENAME
+        self.memory_budget = get_memory_budget() if memory_budget is None else memory_budget
+        self.cpu_budget = len(os.sched_getaffinity(0)) if cpu_budget is None else cpu_budget
+        self.key = str(os.getpid())
+
+    @staticmethod
+    def reset(tmpdir: Path) -> None:
+        """Drop reservations left by previous runs, e.g., by killed workers whose pids are reused now."""
+        (tmpdir / ADMISSION_LEDGER_FILENAME).unlink(missing_ok=True)
+
+    @contextmanager
+    def _ledger(self) -> Generator[dict[str, dict]]:
+        self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.ledger_path.open("a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                ledger = json.loads(content) if content else {}
+
+                # Drop reservations of workers which are gone (e.g., crashed.)
+                for key in list(ledger):
+                    try:
+                        os.kill(int(key.partition(CLUSTER_RESERVATION_SEPARATOR)[0]), 0)
+                    except ProcessLookupError:
+                        del ledger[key]
+
+                yield ledger
+
+                f.seek(0)
+                f.truncate()
+                json.dump(ledger, f)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _memory_reserved(ledger: dict[str, dict]) -> dict[str, int]:
+        """Memory reserved by every worker: the larger of the memory of its test and of its clusters."""
+        tests: dict[str, int] = {}
+        clusters: dict[str, int] = {}
+        for key, reservation in ledger.items():
+            worker, separator, _ = key.partition(CLUSTER_RESERVATION_SEPARATOR)
+            reserved = clusters if separator else tests
+            reserved[worker] = reserved.get(worker, 0) + reservation["memory"]
+        return {worker: max(tests.get(worker, 0), clusters.get(worker, 0)) for worker in tests.keys() | clusters.keys()}
+
+    def try_acquire(self, name: str, resources: ResourceEstimate) -> bool:
+        with self._ledger() as ledger:
+            ledger.pop(self.key, None)
+            tests_running = any(CLUSTER_RESERVATION_SEPARATOR not in key for key in ledger)
+            memory_reserved = self._memory_reserved(ledger)
+            memory_reserved[self.key] = max(memory_reserved.get(self.key, 0), resources.memory)
+            cpus_reserved = sum(reservation["cpus"] for reservation in ledger.values())
+            if tests_running and (sum(memory_reserved.values()) > self.memory_budget
+                                  or cpus_reserved + resources.cpus > self.cpu_budget
+                                  or resources.memory > get_available_memory()):
+                return False
+            ledger[self.key] = {"name": name, "memory": resources.memory, "cpus": resources.cpus}
+            return True
+
+    def acquire(self, name: str, resources: ResourceEstimate) -> float:
+        """Wait until the test can be started.  Return the time waited."""
+        started = time.monotonic()
+        while not self.try_acquire(name=name, resources=resources):
+            time.sleep(ADMISSION_POLL_INTERVAL)
+        waited = time.monotonic() - started
+        if waited > ADMISSION_POLL_INTERVAL:
+            logger.info("Test %s (memory=%d, cpus=%.1f) waited %.1fs for resources",
+                        name, resources.memory, resources.cpus, waited)
+        return waited
+
+    def release(self) -> None:
+        with self._ledger() as ledger:
+            ledger.pop(self.key, None)
+
+    def _cluster_key(self, cluster: str) -> str:
+        return f"{self.key}{CLUSTER_RESERVATION_SEPARATOR}{cluster}"
+
+    def reserve_cluster(self, cluster: str, memory: int) -> None:
+        """Reserve the memory of a cluster kept by this worker until release_cluster() is called.
+
+        The cluster is started already (by an admitted test or as a spare), so this doesn't wait: other tests
+        do, until they fit together with it.
+        """
+        with self._ledger() as ledger:
+            ledger[self._cluster_key(cluster)] = {"name": cluster, "memory": memory, "cpus": 0}
+
+    def release_cluster(self, cluster: str) -> None:
+        with self._ledger() as ledger:
+            ledger.pop(self._cluster_key(cluster), None)
+
+    @contextmanager
+    def admit(self, name: str, resources: ResourceEstimate) -> Generator[None]:
+        self.acquire(name=name, resources=resources)
+        try:
+            yield
+        finally:
+            self.release()
@@ -28,8 +28,12 @@ from io import BufferedWriter
 import importlib
 
 from test import TOP_SRC_DIR, TEST_DIR
+from test.pylib.cluster_template import ClusterTemplate, TemplateHosts, copy_tree
+from test.pylib.compressed_artifacts import ArtifactCompressor, remove_compressed
 from test.pylib.host_registry import Host, HostRegistry
+from test.pylib.log_index import INDEX_SUFFIX
 from test.pylib.pool import Pool
+from test.pylib.resource_gather import ProcessesMonitor
 from test.pylib.rest_client import ScyllaRESTAPIClient, HTTPError
 from test.pylib.util import LogPrefixAdapter, read_last_line, gather_safely, get_xdist_worker_id, scale_timeout_by_mode
 from test.pylib.driver_utils import safe_driver_shutdown
@@ -587,9 +591,10 @@ class ScyllaServer:
         if not os.access(self.exe, os.X_OK):
             raise RuntimeError(f"{self.exe} is not executable")
 
-    async def install(self) -> None:
+    async def install(self, template: Optional[pathlib.Path] = None) -> None:
         """Create a working directory with all subdirectories, initialize
-        a configuration file."""
+        a configuration file.  If `template` is given, the working directory
+        starts as a copy of it (a node of a cluster template)."""
 
         self.check_scylla_executable()
 
@@ -599,6 +604,8 @@ class ScyllaServer:
         await async_rmtree(self.workdir, ignore_errors=True)
 
         try:
+            if template is not None:
+                await copy_tree(template, self.workdir)
             self.workdir.mkdir(parents=True, exist_ok=True)
             self.config_filename.parent.mkdir(parents=True, exist_ok=True)
             self._write_config_file()
@@ -960,13 +967,15 @@ class ScyllaServer:
             return
 
         # Dump the profile if exists and supported by the API.
+        api = ScyllaRESTAPIClient()
         try:
-            api = ScyllaRESTAPIClient()
             await api.dump_llvm_profile(self.ip_addr)
         except:
             # since it is not part of the test functionality, allow
             # this step to fail unconditionally.
             pass
+        finally:
+            await api.close()
         await self.shutdown_control_connection()
 
         if self.cmd.returncode is not None:
@@ -1042,6 +1051,9 @@ class ScyllaServer:
         except FileNotFoundError:
             pass
         self.log_filename.unlink(missing_ok=True)
+        self.log_filename.with_name(self.log_filename.name + INDEX_SUFFIX).unlink(missing_ok=True)
+        remove_compressed(self.log_filename)
+        remove_compressed(self.workdir)
         self.log_file = None
 
     def write_log_marker(self, msg) -> None:
@@ -1089,13 +1101,21 @@ class ScyllaCluster:
 
     def __init__(self, logger: Union[logging.Logger, logging.LoggerAdapter],
                  host_registry: HostRegistry, replicas: int,
-                 create_server: Callable[[CreateServerParams], ScyllaServer]) -> None:
+                 create_server: Callable[[CreateServerParams], ScyllaServer],
+                 template: Optional[ClusterTemplate] = None,
+                 compressor: Optional[ArtifactCompressor] = None) -> None:
         self.logger = logger
         self.host_registry = host_registry
         self.leased_ips = set[IPAddress]()
         self.name = str(uuid.uuid1())
+        # The cluster_name in scylla.yaml.  Differs from self.name if the cluster is cloned
+        # from a template: the nodes keep the name saved in their system tables.
+        self.scylla_cluster_name = self.name
         self.replicas = replicas
         self.create_server = create_server
+        self.template = template
+        # If set, the logs and working directories left by the servers are compressed.
+        self.compressor = compressor
         # Every ScyllaServer is in one of self.running, self.stopped.
         # These dicts are disjoint.
         # A server ID present in self.removed may be either in self.running or in self.stopped.
@@ -1112,6 +1132,8 @@ class ScyllaCluster:
         self.is_dirty: bool = False
         self.start_exception: Optional[Exception] = None
         self.keyspace_count = 0
+        # Durations of the stages of the last staged boot (see _add_servers_staged).
+        self.boot_timings: dict[str, float] = {}
         self.api = ScyllaRESTAPIClient()
         self.stop_lock = asyncio.Lock()
         self.logger.info("Created new cluster %s", self.name)
@@ -1121,7 +1143,9 @@ class ScyllaCluster:
            Catch and save any startup exception"""
         try:
             if self.replicas > 0:
-                await self.add_servers(self.replicas)
+                if not await self._start_from_template():
+                    if not await self._capture_template() or not await self._start_from_template():
+                        await self.add_servers(self.replicas)
                 self.keyspace_count = self._get_keyspace_count()
         except Exception as exc:
             # If start fails, swallow the error to throw later,
@@ -1131,15 +1155,91 @@ class ScyllaCluster:
         self.logger.info("Created cluster %s", self)
         self.is_dirty = False
 
+    async def _start_from_template(self) -> bool:
+        """Clone the initial servers from the cluster template and start them.
+           Return False if there is no usable template or cloning failed."""
+        if self.template is None or (manifest := self.template.load()) is None:
+            return False
+        started = time.monotonic()
+        ip_addrs = []
+        for _ in manifest["nodes"]:
+            ip_addr = IPAddress(await self.host_registry.lease_host())
+            self.leased_ips.add(ip_addr)
+            ip_addrs.append(ip_addr)
+        servers = [self.create_server(ScyllaCluster.CreateServerParams(
+            logger = self.logger,
+            cluster_name = manifest["cluster_name"],
+            ip_addr = ip_addr,
+            seeds = ip_addrs,
+            property_file = None,
+            config_from_test = {},
+            server_encryption = "none",
+            cmdline_from_test = [],
+            version = None,
+        )) for ip_addr in ip_addrs]
+        self.starting.update((server.server_id, server) for server in servers)
+        try:
+            await gather_safely(*(server.install(template=self.template.node_path(i))
+                                  for i, server in enumerate(servers)))
+            # Nodes of a cluster restarted as a whole wait for each other (group0 needs a majority),
+            # so start them all at once.
+            await gather_safely(*(server.start(self.api) for server in servers))
+        except Exception as exc:
+            self.logger.warning("Cluster %s failed to start from template %s, bootstrapping from empty: %s",
+                                self.name, self.template.path, exc)
+            self.template.disabled = True
+            await gather_safely(*(server.stop() for server in servers))
+            await gather_safely(*(server.uninstall() for server in servers))
+            await self.release_ips()
+            return False
+        finally:
+            for server in servers:
+                del self.starting[server.server_id]
+        self.running.update((server.server_id, server) for server in servers)
+        self.initial_seed = ip_addrs[0]
+        self.scylla_cluster_name = manifest["cluster_name"]
+        self.logger.info("Cluster %s started from template %s in %.1fs",
+                         self.name, self.template.path, time.monotonic() - started)
+        return True
+
+    async def _capture_template(self) -> bool:
+        """Boot a throwaway cluster, save it as the cluster template and destroy it.
+           Return False if the template is not captured by this cluster."""
+        if self.template is None or self.template.disabled or self.template.capturing:
+            return False
+        self.template.capturing = True
+        hosts = TemplateHosts()
+        cluster = ScyllaCluster(self.logger, hosts, self.replicas, self.create_server)
+        # Let stop_gracefully() and uninstall() stop the servers.
+        cluster.is_running = True
+        try:
+            await cluster.add_servers(self.replicas)
+            await cluster.stop_gracefully()
+            await self.template.capture(cluster.scylla_cluster_name,
+                                        [(server.ip_addr, server.workdir) for server in cluster.stopped.values()])
+        except Exception as exc:
+            self.logger.warning("Cluster %s failed to capture template %s: %s",
+                                self.name, self.template.path, exc)
+            self.template.disabled = True
+            return False
+        finally:
+            await cluster.uninstall()
+            hosts.close()
+            self.template.capturing = False
+        return True
+
     async def uninstall(self) -> None:
         """Stop running servers and uninstall all servers"""
         self.is_dirty = True
         self.logger.info("Uninstalling cluster %s", self)
         await self.stop()
+        if self.compressor is not None:
+            for srv in self.stopped.values():
+                self.compressor.discard(srv.log_filename)
         await gather_safely(*(srv.uninstall() for srv in self.stopped.values()))
         # Close API client to release connector resources
         if self.api is not None:
-            self.api.close()
+            await self.api.close()
             self.api = None
         await gather_safely(*(self.host_registry.release_host(Host(ip))
                                for ip in self.leased_ips))
@@ -1153,6 +1253,22 @@ class ScyllaCluster:
             ip = self.leased_ips.pop()
             await self.host_registry.release_host(Host(ip))
 
+    async def compress_logs(self) -> None:
+        """Compress the parts of the server logs written so far, so only their tails are left to compress
+        when the cluster is destroyed."""
+        if self.compressor is not None:
+            await gather_safely(*(self.compressor.compress_available(server.log_filename)
+                                  for server in self.servers.values()))
+
+    async def compress_artifacts(self) -> None:
+        """Compress the logs and the working directories left by the stopped servers, if any.
+        Call this function only if the cluster is stopped and will not be started again."""
+        assert not self.running
+        if self.compressor is not None:
+            await gather_safely(*itertools.chain.from_iterable(
+                (self.compressor.compress_file(server.log_filename), self.compressor.compress_tree(server.workdir))
+                for server in self.stopped.values()))
+
     async def stop(self) -> None:
         """Stop all running servers ASAP"""
         # FIXME: the lock is necessary because test.py calls `stop()` and `uninstall()` concurrently
@@ -1239,7 +1355,7 @@ class ScyllaCluster:
 
         params = ScyllaCluster.CreateServerParams(
             logger = self.logger,
-            cluster_name = self.name,
+            cluster_name = self.scylla_cluster_name,
             ip_addr = ip_addr,
             seeds = seeds,
             property_file = property_file,
@@ -1306,9 +1422,52 @@ class ScyllaCluster:
                 assert type(property_file) is list and len(property_file) == servers_num
                 return property_file[i]
 
+        # Only an empty cluster is booted in stages: servers added to a cluster with stopped servers must
+        # join it through self.initial_seed, like the servers added by add_server().
+        if not self.servers and start and not seeds and not expected_error and servers_num > 1:
+            return await self._add_servers_staged(servers_num, cmdline, config, version, get_property_file,
+                                                  server_encryption)
+
         return await gather_safely(*(self.add_server(None, cmdline, config, version, get_property_file(i), start, seeds, server_encryption, expected_error)
                                       for i in range(servers_num)))
 
+    async def _add_servers_staged(self, servers_num: int,
+                                  cmdline: Optional[List[str]],
+                                  config: Optional[dict[str, Any]],
+                                  version: Optional[ScyllaVersionDescription],
+                                  get_property_file: Callable[[int], Optional[dict[str, Any]]],
+                                  server_encryption: str) -> List[ServerInfo]:
+        """Boot servers of an empty cluster in stages: install all working directories concurrently, start
+           the first server which bootstraps the cluster, then start the rest concurrently.  Only the joins
+           themselves are serialized, by the Raft-based topology coordinator; the rest of the boot of the
+           joining servers overlaps.  Stage timings are saved in self.boot_timings."""
+        self.boot_timings = {}
+        stage_started = time.monotonic()
+
+        def end_stage(stage: str) -> None:
+            nonlocal stage_started
+            now = time.monotonic()
+            self.boot_timings[stage] = now - stage_started
+            stage_started = now
+
+        servers = await gather_safely(*(self.add_server(None, cmdline, config, version, get_property_file(i),
+                                                        start=False, server_encryption=server_encryption)
+                                        for i in range(servers_num)))
+        end_stage("install")
+
+        seed, *joining = servers
+        # The cluster is empty (see add_servers()), so the first server starts it.
+        self.initial_seed = seed.ip_addr
+        await self.server_start(seed.server_id, seeds=[seed.ip_addr])
+        end_stage("seed")
+
+        await gather_safely(*(self.server_start(server.server_id, seeds=[seed.ip_addr]) for server in joining))
+        end_stage("join")
+
+        self.logger.info("Cluster %s booted %d servers: %s", self, servers_num,
+                         ", ".join(f"{stage} {duration:.1f}s" for stage, duration in self.boot_timings.items()))
+        return [self.servers[server.server_id].server_info() for server in servers]
+
     def endpoint(self) -> str:
         """Get a server id (IP) from running servers"""
         return next(server.ip_addr for server in self.running.values())
@@ -1655,6 +1814,10 @@ class ScyllaClusterManager:
         self.tasks_history = dict()
         self.server_broken_event = asyncio.Event()
         self.server_broken_reason = ""
+        # Memory and CPU usage of the servers during the current test case, see _after_test()
+        self.servers_monitor: ProcessesMonitor | None = None
+        self.servers_monitor_task: asyncio.Task | None = None
+        self.servers_monitor_stop = asyncio.Event()
 
     def repr_tasks_history(self):
         out = "Cluster_history"
@@ -1697,14 +1860,33 @@ class ScyllaClusterManager:
         self.cluster.before_test(self.current_test_case_full_name)
         self.is_before_test_ok = True
         self.cluster.take_log_savepoint()
+        self.servers_monitor = ProcessesMonitor(
+            get_pids=lambda: [server.cmd.pid for server in self.cluster.running.values() if server.cmd])
+        self.servers_monitor_stop.clear()
+        self.servers_monitor_task = asyncio.create_task(self.servers_monitor.run(self.servers_monitor_stop))
         return str(self.cluster)
 
+    async def _stop_servers_monitor(self) -> dict[str, float] | None:
+        """Stop sampling of the servers and return their usage during the test case."""
+        if self.servers_monitor_task is None:
+            return None
+        self.servers_monitor_stop.set()
+        try:
+            await self.servers_monitor_task
+        except Exception as exc:
+            self.logger.warning("Failed to sample resource usage of servers: %s", exc)
+            return None
+        finally:
+            self.servers_monitor_task = None
+        return self.servers_monitor.usage()
+
     async def stop(self) -> None:
         """Stop, cycle last cluster if not dirty and present"""
         self.logger.info("ScyllaManager stopping for test %s", self.test_uname)
         if self.site:
             await self.site.stop()
             self.site = None
+        await self._stop_servers_monitor()
         if self.cluster:
             if not self.cluster.is_dirty:
                 self.logger.info("Returning Scylla cluster %s for test %s", self.cluster, self.test_uname)
@@ -1714,6 +1896,9 @@ class ScyllaClusterManager:
                                 self.cluster, self.test_uname)
                 await self.clusters.put(self.cluster, is_dirty=True)
             self.cluster = None
+        # Spare clusters are built and dirty ones are destroyed in background, wait for them
+        # since the event loop can be closed after the manager is stopped.
+        await self.clusters.drain()
         if os.path.exists(self.manager_dir):
             await async_rmtree(self.manager_dir)
         self.is_running = False
@@ -1859,6 +2044,7 @@ class ScyllaClusterManager:
         if self.tasks_history:
             self.break_manager(f"tasks leakage found  {self.tasks_history}", self.current_test_case_full_name)
 
+        resources = await self._stop_servers_monitor()
         success = _request.match_info["success"] == "True"
         self.logger.info("Test %s %s, cluster: %s", self.current_test_case_full_name,
                          "SUCCEEDED" if success else "FAILED", self.cluster)
@@ -1869,10 +2055,12 @@ class ScyllaClusterManager:
             if success:
                 pathlib.Path(self.test_case_log_fh.baseFilename).unlink()
             self.current_test_case_full_name = ''
+        await self.cluster.compress_logs()
         self.is_after_test_ok = True
         cluster_str = str(self.cluster)
 
-        return {"cluster_str":cluster_str, "server_broken":self.server_broken_event.is_set(), "message": self.server_broken_reason }
+        return {"cluster_str":cluster_str, "server_broken":self.server_broken_event.is_set(), "message": self.server_broken_reason,
+                "resources": resources}
 
     def break_manager(self, reason, test):
         # make ScyllaClusterManager not operatable from client side
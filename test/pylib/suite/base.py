@@ -39,6 +39,8 @@ if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
     from typing import Any, List
 
+    from test.pylib.scheduling import ResourceAdmission
+
 
 SUITE_CONFIG_FILENAME = "suite.yaml"
 TEST_CONFIG_FILENAME = "test_config.yaml"
@@ -86,6 +88,8 @@ class TestSuite(ABC):
 
     artifacts: ArtifactRegistry
     hosts: HostRegistry
+    # Set by the pytest runner when admission control is enabled.
+    admission: ResourceAdmission | None = None
 
     FLAKY_RETRIES = 5
 
@@ -17,8 +17,17 @@ from typing import TYPE_CHECKING
 
 from scripts import coverage
 from test import path_to
+from test.pylib.cluster_template import ClusterTemplate
+from test.pylib.compressed_artifacts import zstd_available
 from test.pylib.pool import Pool
-from test.pylib.scylla_cluster import ScyllaCluster, ScyllaServer, merge_cmdline_options, get_current_version_description
+from test.pylib.scheduling import parse_memory_size
+from test.pylib.scylla_cluster import (
+    SCYLLA_CMDLINE_OPTIONS,
+    ScyllaCluster,
+    ScyllaServer,
+    get_current_version_description,
+    merge_cmdline_options,
+)
 from test.pylib.suite.base import Test, TestSuite, read_log, run_test
 from test.pylib.util import LogPrefixAdapter
 
@@ -30,6 +39,16 @@ if TYPE_CHECKING:
     from pytest import Parser
 
 
+def get_server_memory(cmdline_options: list[str]) -> int:
+    """Memory of a Scylla server, as given by the `-m`/`--memory` command line option."""
+    memory = None
+    for i, option in enumerate(cmdline_options):
+        name, _, value = option.partition("=")
+        if name in ("-m", "--memory"):
+            memory = value or cmdline_options[i + 1]
+    return parse_memory_size(memory) if memory else 0
+
+
 class PythonTestSuite(TestSuite):
     """A collection of Python pytests against a single Scylla instance"""
 
@@ -52,7 +71,45 @@ class PythonTestSuite(TestSuite):
             pool_size = int(env_pool_size)
         else:
             pool_size = cfg.get("pool_size", 2)
+        env_pool_spares = os.getenv("CLUSTER_POOL_SPARES")
+        if getattr(options, "cluster_pool_spares", None) is not None:
+            pool_spares = options.cluster_pool_spares
+        elif env_pool_spares is not None:
+            pool_spares = int(env_pool_spares)
+        else:
+            pool_spares = cfg.get("pool_spares", 0)
+        pool_spares = min(pool_spares, pool_size)
+        env_cluster_template = os.getenv("CLUSTER_TEMPLATE")
+        if getattr(options, "cluster_template", False):
+            use_cluster_template = True
+        elif env_cluster_template is not None:
+            use_cluster_template = env_cluster_template.lower() in ("1", "true", "yes")
+        else:
+            use_cluster_template = cfg.get("cluster_template", False)
+        env_compress_artifacts = os.getenv("COMPRESS_ARTIFACTS")
+        if getattr(options, "compress_artifacts", False):
+            self.compress_artifacts = True
+        elif env_compress_artifacts is not None:
+            self.compress_artifacts = env_compress_artifacts.lower() in ("1", "true", "yes")
+        else:
+            self.compress_artifacts = cfg.get("compress_artifacts", False)
+        if self.compress_artifacts and not zstd_available():
+            logging.warning("zstd is not installed, artifacts of %s won't be compressed", self.name)
+            self.compress_artifacts = False
+        self.cluster_template = None
+        if use_cluster_template and cluster_size > 0:
+            self.cluster_template = ClusterTemplate(
+                path=self.log_dir / "cluster-templates" / self.name,
+                scylla_exe=self.scylla_exe,
+                size=cluster_size,
+                options={
+                    "config_options": self.cfg.get("extra_scylla_config_options", {}),
+                    "cmdline_options": self.get_cmdline_options(options),
+                },
+            )
         self.dirties_cluster = set(cfg.get("dirties_cluster", []))
+        self.server_memory = get_server_memory(
+            merge_cmdline_options(SCYLLA_CMDLINE_OPTIONS, self.get_cmdline_options(options)))
 
         self.create_cluster = self.get_cluster_factory(cluster_size, options)
         async def recycle_cluster(cluster: ScyllaCluster) -> None:
@@ -68,19 +125,27 @@ class PythonTestSuite(TestSuite):
             await cluster.stop()
             # Close API client to release connector resources
             if cluster.api is not None:
-                cluster.api.close()
+                await cluster.api.close()
                 cluster.api = None
             await cluster.release_ips()
+            if self.admission is not None:
+                self.admission.release_cluster(cluster.name)
+            # The cluster is gone, whatever it left behind is compressed now: the pool is drained when
+            # the cluster manager stops, also in xdist workers, which don't run exit artifacts.
+            await cluster.compress_artifacts()
+
+        self.clusters = Pool(pool_size, self.create_cluster, recycle_cluster, spares=pool_spares)
 
-        self.clusters = Pool(pool_size, self.create_cluster, recycle_cluster)
+    def get_cmdline_options(self, options: argparse.Namespace, cmdline_from_test: list[str] | None = None) -> list[str]:
+        cmdline_options = self.cfg.get("extra_scylla_cmdline_options", [])
+        if type(cmdline_options) == str:
+            cmdline_options = [cmdline_options]
+        cmdline_options = merge_cmdline_options(cmdline_options, cmdline_from_test or [])
+        return merge_cmdline_options(cmdline_options, options.extra_scylla_cmdline_options.split())
 
     def get_cluster_factory(self, cluster_size: int, options: argparse.Namespace) -> Callable[..., Awaitable]:
         def create_server(create_cfg: ScyllaCluster.CreateServerParams):
-            cmdline_options = self.cfg.get("extra_scylla_cmdline_options", [])
-            if type(cmdline_options) == str:
-                cmdline_options = [cmdline_options]
-            cmdline_options = merge_cmdline_options(cmdline_options, create_cfg.cmdline_from_test)
-            cmdline_options = merge_cmdline_options(cmdline_options, options.extra_scylla_cmdline_options.split())
+            cmdline_options = self.get_cmdline_options(options, create_cfg.cmdline_from_test)
             # There are multiple sources of config options, with increasing priority
             # (if two sources provide the same config option, the higher priority one wins):
             # 1. the defaults
@@ -111,7 +176,8 @@ class PythonTestSuite(TestSuite):
             return server
 
         async def create_cluster(logger: Union[logging.Logger, logging.LoggerAdapter]) -> ScyllaCluster:
-            cluster = ScyllaCluster(logger, self.hosts, cluster_size, create_server)
+            cluster = ScyllaCluster(logger, self.hosts, cluster_size, create_server, self.cluster_template,
+                                    self.artifacts.compressor if self.compress_artifacts else None)
 
             async def stop() -> None:
                 await cluster.stop()
@@ -125,7 +191,15 @@ class PythonTestSuite(TestSuite):
                     await cluster.uninstall()
 
                 self.artifacts.add_suite_artifact(self, uninstall)
-            self.artifacts.add_exit_artifact(self, stop)
+            if self.compress_artifacts:
+                # Whatever is left after the suite is kept as an artifact of the run.
+                async def stop_and_compress() -> None:
+                    await cluster.stop()
+                    await cluster.compress_artifacts()
+
+                self.artifacts.add_exit_artifact(self, stop_and_compress)
+            else:
+                self.artifacts.add_exit_artifact(self, stop)
 
             await cluster.install_and_start()
             # If cluster failed to start, raise the exception immediately
@@ -141,6 +215,9 @@ class PythonTestSuite(TestSuite):
                 except:
                     pass  # Ignore cleanup errors
                 raise cluster.start_exception
+            if self.admission is not None:
+                # Pooled clusters outlive the tests, their memory is reserved until they are destroyed.
+                self.admission.reserve_cluster(cluster.name, self.server_memory * len(cluster.running))
             return cluster
 
         return create_cluster
@@ -265,6 +342,7 @@ class PythonTest(Test):
             if self.shortname in self.suite.dirties_cluster:
                 cluster.is_dirty = True
             cluster.after_test(self.uname, self.success)
+            await cluster.compress_logs()
             self.is_after_test_ok = True
         except Exception as e:
             if not self.is_before_test_ok:
@@ -0,0 +1,52 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+from test.pylib.cluster_template import ClusterTemplate, TemplateHosts
+
+
+def make_workdir(path):
+    for table in ("peers-37f71aca7dc2383ba70672528af04d4f", "local-7ad54392bcdd35a684174e047860b377"):
+        (path / "data" / "system" / table).mkdir(parents=True)
+        (path / "data" / "system" / table / "me-1-big-Data.db").write_text("data")
+    return path
+
+
+async def test_cluster_template(tmp_path):
+    scylla_exe = tmp_path / "scylla"
+    scylla_exe.write_text("")
+    options = {"config_options": {"tablets": True}, "cmdline_options": ["--smp", "2"]}
+    template = ClusterTemplate(path=tmp_path / "template", scylla_exe=scylla_exe, size=2, options=options)
+    assert template.load() is None
+
+    await template.capture("name", [("127.255.1.1", make_workdir(tmp_path / "1")),
+                                    ("127.255.1.2", make_workdir(tmp_path / "2"))])
+    manifest = template.load()
+    assert manifest["cluster_name"] == "name"
+    assert [node["ip_addr"] for node in manifest["nodes"]] == ["127.255.1.1", "127.255.1.2"]
+    # The IPs of the other nodes are not in the template.
+    for node in range(2):
+        system = template.node_path(node) / "data" / "system"
+        assert not any(system.glob("peers-*/*"))
+        assert any(system.glob("local-*/*"))
+
+    # A template booted with other options or executable is not used.
+    assert ClusterTemplate(path=template.path, scylla_exe=scylla_exe, size=2,
+                           options={**options, "cmdline_options": ["--smp", "1"]}).load() is None
+    assert ClusterTemplate(path=template.path, scylla_exe=scylla_exe, size=3, options=options).load() is None
+    scylla_exe.write_text("rebuilt")
+    assert template.load() is None
+
+
+async def test_template_hosts():
+    hosts = TemplateHosts()
+    other = TemplateHosts()
+    try:
+        first, second = await hosts.lease_host(), await hosts.lease_host()
+        assert first.startswith("127.255.") and first != second
+        assert (await other.lease_host()).rpartition(".")[0] != first.rpartition(".")[0]
+    finally:
+        hosts.close()
+        other.close()
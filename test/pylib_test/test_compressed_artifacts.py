@@ -0,0 +1,107 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import json
+import re
+import subprocess
+
+import pytest
+
+from test.pylib import compressed_artifacts
+from test.pylib.compressed_artifacts import (ArtifactCompressor, CompressedFile, StreamingCompressor, compress_file,
+                                             remove_compressed, zstd_available)
+from test.pylib.log_browsing import grep_log_for_errors, search_log
+
+pytestmark = pytest.mark.skipif(not zstd_available(), reason="zstd is not installed")
+
+FRAME_SIZE = 100
+DATA = bytes(range(256)) * 2 + b"tail"  # 5 complete frames and an incomplete one
+
+
+@pytest.fixture(autouse=True)
+def small_frames(monkeypatch):
+    monkeypatch.setattr(compressed_artifacts, "FRAME_SIZE", FRAME_SIZE)
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "scylla.log"
+    path.write_bytes(DATA)
+    return path
+
+
+def test_index_format(log):
+    compressed = compress_file(log)
+    assert compressed.name == "scylla.log.zst" and not log.exists()
+    frames = [json.loads(line) for line in log.with_name("scylla.log.zst.idx").read_text().splitlines()]
+    # [offset, size, compressed offset, compressed size] of every frame.
+    assert [(offset, size) for offset, size, _, _ in frames] == [
+        (0, 100), (100, 100), (200, 100), (300, 100), (400, 100), (500, 16)]
+    assert frames[0][2] == 0
+    assert all(a[2] + a[3] == b[2] for a, b in zip(frames, frames[1:]))
+    assert frames[-1][2] + frames[-1][3] == compressed.stat().st_size
+    # The frames form a valid zstd file.
+    assert subprocess.run(["zstd", "-d", "-c", str(compressed)], capture_output=True, check=True).stdout == DATA
+
+
+@pytest.mark.parametrize("start, end", [
+    (0, None), (0, 1), (0, 100), (99, 101), (100, 200), (150, 450), (499, None), (515, None), (516, None),
+    (600, None), (250, 250),
+])
+def test_read_range(log, start, end):
+    compress_file(log)
+    compressed = CompressedFile(log)
+    assert compressed.size == len(DATA)
+    assert compressed.read(start, end) == DATA[start:end]
+
+
+def test_read_without_index(log):
+    compressed = compress_file(log)
+    log.with_name("scylla.log.zst.idx").unlink()
+    assert CompressedFile(compressed).frames is None
+    assert CompressedFile(compressed).read(150, 450) == DATA[150:450]
+
+
+def test_streaming(log):
+    compressor = StreamingCompressor(log)
+    compressor.compress_available()
+    assert compressor.pos == 500
+    with log.open("ab") as f:
+        f.write(b"x" * 200)
+    compressor.compress_available()
+    assert compressor.pos == 700
+    compress_file(log, compressor)
+    assert CompressedFile(log).read() == DATA + b"x" * 200
+    assert CompressedFile(log).frames[-1].size == 16
+
+
+async def test_artifact_compressor(log, tmp_path):
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    (workdir / "scylla.yaml").write_text("")
+    compressor = ArtifactCompressor(max_workers=2)
+    await compressor.compress_available(log)
+    await compressor.compress_file(log)
+    await compressor.compress_tree(workdir)
+    assert not compressor.streaming
+    assert CompressedFile(log).read() == DATA
+    assert not workdir.exists() and tmp_path.joinpath("workdir.tar.zst").is_file()
+
+    remove_compressed(log)
+    remove_compressed(workdir)
+    assert not list(tmp_path.iterdir())
+
+
+def test_log_browsing(tmp_path):
+    log = tmp_path / "scylla.log"
+    lines = [f"INFO  2025-01-01 12:00:00,{i:03} [shard 0:main] init - line {i}\n" for i in range(10)]
+    lines[7] = "ERROR 2025-01-01 12:00:00,007 [shard 0:main] init - failed\n"
+    log.write_text("".join(lines))
+    compress_file(log)
+    mark = len("".join(lines[:5]))
+    match, = search_log(log, [re.compile("line 6")], from_mark=mark)
+    assert match.offset == len("".join(lines[:6])) and match.line == lines[6]
+    assert grep_log_for_errors(log, distinct_errors=True, from_mark=mark) == [lines[7]]
@@ -0,0 +1,346 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import json
+import os
+import re
+import shutil
+import struct
+import subprocess
+import sys
+from asyncio import Semaphore
+from pathlib import Path
+
+import pytest
+import unidiff
+
+# coverage_utils imports lcov_utils as a top level module.
+from test.pylib import coverage_utils
+from test.pylib.coverage_utils import (RAW_PROFILE_MAGIC, BinaryIdsCache, CoverageMap, FileType, _line_ranges,
+                                       _ranges_intersect, changed_lines_from_patch, get_binary_ids_map,
+                                       group_profiles_by_binary_ids, lcov_combine_traces, lcov_utils,
+                                       read_elf_build_id, read_elf_sections, read_raw_profile_binary_ids)
+
+PATCH = """\
+diff --git a/db/modified.cc b/db/modified.cc
+index 1111111..2222222 100644
+--- a/db/modified.cc
++++ b/db/modified.cc
+@@ -10,2 +10,3 @@ void f() {
+-    old();
+-    old();
++    new();
++    new();
++    new();
+@@ -20,0 +22,2 @@ void g() {
++    inserted();
++    inserted();
+@@ -30 +33 @@ void h() {
+-    x = 1;
++    x = 2;
+diff --git a/db/added.cc b/db/added.cc
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/db/added.cc
+@@ -0,0 +1,2 @@
++int added() {
++}
+diff --git a/db/deleted.cc b/db/deleted.cc
+deleted file mode 100644
+index 4444444..0000000
+--- a/db/deleted.cc
++++ /dev/null
+@@ -1,3 +0,0 @@
+-int deleted() {
+-    return 0;
+-}
+diff --git a/db/top.hh b/db/top.hh
+index 5555555..6666666 100644
+--- a/db/top.hh
++++ b/db/top.hh
+@@ -0,0 +1 @@
++#pragma once
+"""
+
+
+def test_changed_lines_from_patch():
+    changed = changed_lines_from_patch(unidiff.PatchSet(PATCH))
+    assert changed == {
+        # A pure insertion after line 20 changes no original line, the lines around it are taken.
+        "db/modified.cc": {10, 11, 20, 21, 30},
+        "db/added.cc": set(),
+        "db/deleted.cc": {1, 2, 3},
+        # An insertion at the beginning of an existing file is after "line 0".
+        "db/top.hh": {0, 1},
+    }
+
+
+def test_line_ranges():
+    assert _line_ranges([]) == []
+    assert _line_ranges([5]) == [[5, 5]]
+    assert _line_ranges([1, 2, 3, 5, 7, 8]) == [[1, 3], [5, 5], [7, 8]]
+
+
+@pytest.mark.parametrize("lines, expected", [
+    ([], False),
+    ([9], False),
+    ([10], True),
+    ([12], True),
+    ([13], False),
+    ([19], False),
+    ([20], True),
+    ([30], True),
+    ([31], False),
+    ([1, 13, 25, 40], True),
+    ([1, 13, 19, 31], False),
+])
+def test_ranges_intersect(lines, expected):
+    assert _ranges_intersect([[10, 12], [20, 20], [25, 30]], lines) == expected
+
+
+def test_ranges_intersect_no_ranges():
+    assert not _ranges_intersect([], [1, 2, 3])
+
+
+def write_lcov(path, records):
+    path.write_text("".join(
+        f"SF:{source}\n" + "".join(f"DA:{line},{hits}\n" for line, hits in lines.items()) + "end_of_record\n"
+        for source, lines in records.items()))
+    return lcov_utils.LcovFile(path)
+
+
+@pytest.fixture
+def coverage_map(tmp_path):
+    source_root = tmp_path / "scylla"
+    coverage_map = CoverageMap(tmp_path / "coverage_map.json", source_root=source_root)
+    first = write_lcov(tmp_path / "first.info", {
+        source_root / "db/modified.cc": {10: 1, 11: 1, 12: 0, 30: 2},
+        source_root / "db/deleted.cc": {2: 1},
+    })
+    first.tag_with_test("test/boost/first_test.cc::case")
+    coverage_map.update(first)
+    second = write_lcov(tmp_path / "second.info", {
+        source_root / "db/modified.cc": {20: 0, 21: 3, 22: 3},
+        source_root / "db/other.hh": {1: 1},
+    })
+    second.tag_with_test("test/boost/second_test.cc::case")
+    coverage_map.update(second)
+    return coverage_map
+
+
+def test_coverage_map_update(coverage_map, tmp_path):
+    assert coverage_map.tests == {
+        "test/boost/first_test.cc::case": {"db/modified.cc": [[10, 11], [30, 30]], "db/deleted.cc": [[2, 2]]},
+        "test/boost/second_test.cc::case": {"db/modified.cc": [[21, 22]], "db/other.hh": [[1, 1]]},
+    }
+
+    # New coverage of a test replaces the old one.
+    rerun = write_lcov(tmp_path / "rerun.info", {coverage_map.source_root / "db/other.hh": {5: 1}})
+    rerun.tag_with_test("test/boost/second_test.cc::case")
+    coverage_map.update(rerun)
+    assert coverage_map.tests["test/boost/second_test.cc::case"] == {"db/other.hh": [[5, 5]]}
+
+    coverage_map.save()
+    assert json.loads(coverage_map.path.read_text())["version"] == CoverageMap.VERSION
+    assert CoverageMap(coverage_map.path).tests == coverage_map.tests
+
+
+def test_coverage_map_ignores_other_versions(tmp_path):
+    path = tmp_path / "coverage_map.json"
+    path.write_text(json.dumps({"version": CoverageMap.VERSION + 1, "tests": {"test": {}}}))
+    assert CoverageMap(path).tests == {}
+
+
+def test_coverage_map_select(coverage_map):
+    first, second = "test/boost/first_test.cc::case", "test/boost/second_test.cc::case"
+
+    def selected(changed, **kwargs):
+        return coverage_map.select(changed, **kwargs).tests
+
+    assert selected({"db/modified.cc": [10]}) == [first]
+    assert selected({"db/modified.cc": [12]}) == []
+    assert selected({"db/modified.cc": [21, 30]}) == [first, second]
+    # An insertion between lines 20 and 21 (the changed lines of an insertion are the lines around it.)
+    assert selected(changed_lines_from_patch(unidiff.PatchSet(PATCH))) == [first, second]
+    assert selected({"db/deleted.cc": [1, 2, 3]}) == [first]
+    assert selected({"docs/readme.md": [1]}) == []
+
+    # An added (or not covered) source file can affect any test.
+    selection = coverage_map.select({"db/added.cc": set(), "db/modified.cc": {12}})
+    assert selection.tests == [first, second]
+    assert selection.unmapped_files == ["db/added.cc"]
+    assert selection.total_tests == 2 and selection.changed_lines == 1
+    assert selection.changed_files == ["db/added.cc", "db/modified.cc"]
+    assert selected({"db/added.cc": set(), "db/modified.cc": {12}}, ignore_unmapped=True) == []
+
+
+def write_trace(path, test_name, records):
+    path.write_text("".join(
+        f"TN:{test_name}\nSF:{source}\n"
+        + "".join(f"FN:{line},{function}\nFNDA:{hits},{function}\n" for function, (line, hits) in functions.items())
+        + "".join(f"DA:{line},{hits}\n" for line, hits in lines.items())
+        + "end_of_record\n"
+        for source, functions, lines in records))
+    return path
+
+
+@pytest.fixture
+def traces(tmp_path):
+    # The same test and source file in several traces, and several times in one trace.
+    return [
+        write_trace(tmp_path / "a.info", "test_a", [
+            ("/src/a.cc", {"f": (1, 1)}, {1: 1, 2: 0, 3: 1}),
+            ("/src/b.cc", {}, {10: 2}),
+            ("/src/a.cc", {"f": (1, 2)}, {1: 2, 2: 4, 5: 1}),
+        ]),
+        write_trace(tmp_path / "b.info", "test_a", [
+            ("/src/a.cc", {"f": (1, 1), "g": (7, 0)}, {1: 1, 7: 0}),
+        ]),
+        write_trace(tmp_path / "c.info", "test_b", [
+            ("/src/a.cc", {}, {1: 3}),
+            ("/src/c.cc", {}, {4: 1}),
+        ]),
+    ]
+
+
+@pytest.mark.parametrize("concurrency, files_per_chunk", [(1, None), (2, None), (2, 1), (4, 2)])
+async def test_lcov_combine_traces(traces, concurrency, files_per_chunk):
+    expected = lcov_utils.LcovFile()
+    for trace in traces:
+        for (test_name, source_file), record in lcov_utils.LcovFile(trace).records.items():
+            if (test_name, source_file) in expected.records:
+                expected.records[test_name, source_file].union(record)
+            else:
+                expected.records[test_name, source_file] = record
+    output = traces[0].with_name("combined.info")
+    await lcov_combine_traces(lcovs=traces, output_lcov=output, files_per_chunk=files_per_chunk,
+                              semaphore=Semaphore(concurrency))
+    # Every test and source file has a single record in the output.
+    assert output.read_text().count("end_of_record") == len(expected.records) == 4
+    combined = lcov_utils.LcovFile(output)
+    assert combined == expected
+    a = combined.records["test_a", lcov_utils.Path("/src/a.cc")]
+    assert a.line_hits[2] == 4 and a.line_hits[7] == 0
+
+
+SYSTEM_BINARY = Path(os.path.realpath(sys.executable))
+
+
+@pytest.mark.skipif(not shutil.which("readelf"), reason="readelf is not installed")
+def test_read_elf_build_id():
+    notes = subprocess.run(["readelf", "-n", SYSTEM_BINARY], capture_output=True, text=True, check=True).stdout
+    build_id = re.search(r"Build ID: ([0-9a-f]+)", notes)
+    assert read_elf_build_id(SYSTEM_BINARY) == (build_id and build_id[1])
+    sections = read_elf_sections(SYSTEM_BINARY)
+    assert ".text" in [section.name for section in sections]
+    assert read_elf_build_id(SYSTEM_BINARY, sections) == read_elf_build_id(SYSTEM_BINARY)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x7fELF", b"#!/bin/sh\necho not an elf file\n" * 10,
+                                  b"\x7fELF\x03\x01" + bytes(100)])
+def test_read_elf_not_elf(tmp_path, data):
+    path = tmp_path / "script"
+    path.write_bytes(data)
+    assert read_elf_sections(path) is None
+    assert read_elf_build_id(path) is None
+
+
+def raw_profile(path, version, ids, order="<", header_fields=None):
+    """Write the header and the binary ids of a raw profile, the rest of the header is zeros."""
+    binary_ids = b"".join(struct.pack(order + "Q", len(id)) + id + bytes(-len(id) % 8) for id in ids)
+    header = struct.pack(order + "QQQ", RAW_PROFILE_MAGIC, version, len(binary_ids))
+    header += bytes(8 * (header_fields or coverage_utils.RAW_PROFILE_HEADER_FIELDS[version]) - len(header))
+    path.write_bytes(header + binary_ids + b"counters and data")
+    return path
+
+
+BUILD_ID = bytes.fromhex("15dfff3239aa7c3b16a71e6b2e3b6e4009dab998")
+OTHER_BUILD_ID = bytes.fromhex("c89156ebdabf859f")
+
+
+@pytest.mark.parametrize("version, header_fields", [(8, 11), (9, 14), (10, 16)])
+@pytest.mark.parametrize("order", "<>")
+def test_read_raw_profile_binary_ids(tmp_path, version, header_fields, order):
+    path = raw_profile(tmp_path / "test.profraw", version, [BUILD_ID, OTHER_BUILD_ID], order, header_fields)
+    assert read_raw_profile_binary_ids(path) == [BUILD_ID.hex(), OTHER_BUILD_ID.hex()]
+    # The flags in the high bits of the version are ignored.
+    path = raw_profile(tmp_path / "flags.profraw", version | (1 << 56), [BUILD_ID], order, header_fields)
+    assert read_raw_profile_binary_ids(path) == [BUILD_ID.hex()]
+
+
+def test_read_raw_profile_binary_ids_invalid(tmp_path):
+    # Version 5 has no binary ids: the field after the version is the size of the data.
+    assert read_raw_profile_binary_ids(raw_profile(tmp_path / "v5.profraw", 5, [BUILD_ID], header_fields=11)) is None
+    assert read_raw_profile_binary_ids(raw_profile(tmp_path / "v11.profraw", 11, [BUILD_ID], header_fields=16)) is None
+    assert read_raw_profile_binary_ids(raw_profile(tmp_path / "empty.profraw", 10, [])) is None
+    path = raw_profile(tmp_path / "truncated.profraw", 10, [BUILD_ID])
+    path.write_bytes(path.read_bytes()[:8 * 16 + 12])
+    assert read_raw_profile_binary_ids(path) is None
+    path = tmp_path / "not_profile"
+    path.write_bytes(bytes(200))
+    assert read_raw_profile_binary_ids(path) is None
+
+
+async def test_group_profiles_by_binary_ids(tmp_path):
+    first = raw_profile(tmp_path / "first.profraw", 10, [BUILD_ID])
+    second = raw_profile(tmp_path / "second.profraw", 9, [BUILD_ID])
+    both = raw_profile(tmp_path / "both.profraw", 10, [OTHER_BUILD_ID, BUILD_ID])
+    # A profile given twice is merged once.
+    assert await group_profiles_by_binary_ids(profiles=[first, str(second), both, first]) == {
+        (BUILD_ID.hex(),): [first, second],
+        tuple(sorted([BUILD_ID.hex(), OTHER_BUILD_ID.hex()])): [both],
+    }
+
+
+async def test_binary_ids_cache(tmp_path, monkeypatch):
+    binary = tmp_path / "bin" / "test"
+    binary.parent.mkdir()
+    shutil.copy(SYSTEM_BINARY, binary)
+    build_id = read_elf_build_id(SYSTEM_BINARY)
+    read = []
+
+    async def get_binary_id(*, path, logger=None):
+        read.append(Path(path))
+        return read_elf_build_id(path)
+
+    monkeypatch.setattr(coverage_utils, "get_binary_id", get_binary_id)
+
+    assert await get_binary_ids_map(paths=[binary.parent]) == {binary: build_id}
+    assert read == [binary]
+    assert BinaryIdsCache(binary.parent).get(binary)[0] == build_id
+
+    # A cache hit, also in a new process (the cache is saved in the directory.)
+    assert await get_binary_ids_map(paths=[binary.parent]) == {binary: build_id}
+    assert await get_binary_ids_map(paths=[binary]) == {binary: build_id}
+    assert read == [binary]
+
+    # Touched.
+    stat = binary.stat()
+    os.utime(binary, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert BinaryIdsCache(binary.parent).get(binary) is None
+    assert await get_binary_ids_map(paths=[binary.parent]) == {binary: build_id}
+    assert read == [binary, binary]
+
+    # Relinked: a new file with the same size and mtime is a new inode.
+    relinked = binary.with_name("relinked")
+    shutil.copy(binary, relinked)
+    os.utime(relinked, ns=(binary.stat().st_atime_ns, binary.stat().st_mtime_ns))
+    relinked.replace(binary)
+    assert BinaryIdsCache(binary.parent).get(binary) is None
+    assert await get_binary_ids_map(paths=[binary.parent]) == {binary: build_id}
+    assert read == [binary, binary, binary]
+
+
+def test_binary_ids_cache_corrupted(tmp_path):
+    (tmp_path / coverage_utils.BINARY_IDS_CACHE_NAME).write_text("{")
+    cache = BinaryIdsCache(tmp_path)
+    assert cache.entries == {}
+    binary = tmp_path / "binary"
+    binary.write_text("")
+    cache.set(binary, None, FileType.UNRECOGNIZED)
+    cache.save()
+    assert BinaryIdsCache(tmp_path).get(binary) == (None, FileType.UNRECOGNIZED)
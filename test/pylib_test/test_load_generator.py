@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import random
+
+import pytest
+
+from test.pylib.load_generator import LatencyHistogram
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0 and histogram.mean == 0.0
+
+    rng = random.Random(1)
+    latencies = [rng.uniform(0.0001, 2.0) for _ in range(10000)]
+    for latency in latencies:
+        histogram.record(latency)
+    latencies.sort()
+    assert histogram.count == len(latencies)
+    assert histogram.max == latencies[-1]
+    assert histogram.mean == pytest.approx(sum(latencies) / len(latencies))
+    for p in (1, 50, 90, 99, 99.9):
+        exact = latencies[int(p / 100 * len(latencies)) - 1]
+        assert histogram.percentile(p) == pytest.approx(exact, rel=0.04)
+    assert histogram.percentile(100) == latencies[-1]
+
+
+def test_latency_histogram_small_values():
+    histogram = LatencyHistogram()
+    for micros in (0, 1, 2, 3):
+        histogram.record(micros / 1e6)
+    # Values below 2^SUB_BUCKET_BITS microseconds are exact.
+    assert [histogram.percentile(p) for p in (25, 50, 75, 100)] == [0.0, 1e-6, 2e-6, 3e-6]
+
+
+def test_latency_histogram_merge():
+    first, second, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(1, 1001):
+        (first if i % 3 else second).record(i / 1000)
+        both.record(i / 1000)
+    first.merge(second)
+    assert first.counts == both.counts
+    assert first.count == both.count == 1000
+    assert first.total == pytest.approx(both.total)
+    assert first.max == both.max == 1.0
+    assert first.percentile(50) == both.percentile(50) == pytest.approx(0.5, rel=0.03)
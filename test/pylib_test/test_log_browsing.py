@@ -0,0 +1,160 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from test.pylib import compressed_artifacts
+from test.pylib.compressed_artifacts import compress_file, zstd_available
+from test.pylib.log_browsing import (LogTailer, LogWaiter, _candidate_lines, find_log_backtraces, grep_log_for_errors,
+                                     search_log)
+
+
+async def test_tailer_reads_lines_appended_before_watch(tmp_path):
+    log = tmp_path / "scylla.log"
+    log.write_text("INFO  starting\n")
+    with ThreadPoolExecutor(max_workers=1) as thread_pool:
+        pos = LogTailer._last_line_start(log)
+        # Appended after the position is found, but before the tailer watches the file.
+        with log.open("a") as f:
+            f.write("INFO  init - serving\n")
+        tailer = LogTailer(log, thread_pool, pos)
+        waiter = LogWaiter(patterns=[re.compile("serving")], from_mark=pos)
+        waiter.pending = None
+        tailer.add_waiter(waiter)
+        try:
+            # Nothing is written to the log anymore.
+            assert await asyncio.wait_for(waiter.future, timeout=5) == log.stat().st_size
+        finally:
+            tailer.remove_waiter(waiter)
+
+
+LINES = [
+    "INFO  2025-01-01 12:00:00,000 [shard 0:main] init - starting\n",
+    "INFO  2025-01-01 12:00:00,001 [shard 0:main] init - ключ пространства: ks\n",
+    "WARN  2025-01-01 12:00:00,002 [shard 1:main] compaction - compacting ks.t\n",
+    "ERROR 2025-01-01 12:00:00,003 [shard 1:main] compaction - failed: ошибка\n",
+    "  with more details\n",
+    "INFO  2025-01-01 12:00:00,004 [shard 0:main] init - done\n",
+    "ERROR 2025-01-01 12:00:00,005 [shard 0:main] init - failed: ошибка\n",
+    "ERROR 2025-01-01 12:00:00,006 [shard 1:main] compaction - failed: ошибка\n",
+    "Backtrace:\n",
+    "  0x1234\n",
+    "  0x5678\n",
+    "INFO  2025-01-01 12:00:00,007 [shard 0:main] init - compaction finished",
+]
+
+
+def offset(line_no: int) -> int:
+    """Byte offset of the line: differs from the character offset after the non-ASCII lines."""
+    return len("".join(LINES[:line_no]).encode())
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "scylla.log"
+    path.write_text("".join(LINES))
+    return path
+
+
+def found(matches):
+    return [(offset, line, match.group()) for offset, line, match in matches]
+
+
+def test_search_log_several_patterns(log):
+    matches = search_log(log, [re.compile("compaction - [a-z]+"), re.compile("ошибка"), re.compile("нет")])
+    # A line matching several patterns is returned for each of them.
+    assert found(matches) == [
+        (offset(2), LINES[2], "compaction - compacting"),
+        (offset(3), LINES[3], "compaction - failed"),
+        (offset(3), LINES[3], "ошибка"),
+        (offset(6), LINES[6], "ошибка"),
+        (offset(7), LINES[7], "compaction - failed"),
+        (offset(7), LINES[7], "ошибка"),
+    ]
+    assert found(search_log(log, [re.compile("ошибка")], filter_pattern=re.compile("shard 0"), max_count=1)) == [
+        (offset(3), LINES[3], "ошибка"),
+    ]
+    assert search_log(log, []) == []
+
+
+def test_search_log_from_mark(log):
+    # The offsets are in bytes, as returned by ScyllaLogFile.mark().
+    matches = search_log(log, [re.compile("ошибка"), re.compile("finished")], from_mark=offset(4))
+    assert found(matches) == [
+        (offset(6), LINES[6], "ошибка"),
+        (offset(7), LINES[7], "ошибка"),
+        (offset(11), LINES[11], "finished"),
+    ]
+    assert search_log(log, [re.compile("ошибка")], from_mark=offset(12)) == []
+
+
+def test_search_log_anchors(log):
+    assert found(search_log(log, [re.compile(r"\A  "), re.compile(r"finished\Z")])) == [
+        (offset(4), LINES[4], "  "),
+        (offset(9), LINES[9], "  "),
+        (offset(10), LINES[10], "  "),
+        # Lines contain the trailing newline, only the last, incomplete one ends with the word.
+        (offset(11), LINES[11], "finished"),
+    ]
+
+
+def test_candidate_lines():
+    text = "".join(LINES)
+    starts = [len("".join(LINES[:i])) for i in range(len(LINES))]
+    assert list(_candidate_lines(text, [re.compile("ошибка", re.MULTILINE)])) == [starts[3], starts[6], starts[7]]
+    assert list(_candidate_lines(text, [re.compile("^ERROR", re.MULTILINE), re.compile("done", re.MULTILINE),
+                                        re.compile("^Backtrace:$", re.MULTILINE)])) == [
+        starts[3], starts[5], starts[6], starts[7], starts[8]]
+    # A pattern with anchors is checked in every line.
+    assert list(_candidate_lines(text, [re.compile("нет", re.MULTILINE), None])) == starts
+    assert list(_candidate_lines("", [None])) == []
+    assert list(_candidate_lines(text, [re.compile("нет", re.MULTILINE)])) == []
+
+
+def test_grep_log_for_errors(log):
+    assert grep_log_for_errors(log, distinct_errors=True) == [LINES[3], LINES[6], LINES[7]]
+    # The message continues till the next INFO message.
+    assert grep_log_for_errors(log) == [LINES[3:5], LINES[6:11]]
+    assert grep_log_for_errors(log, distinct_errors=True, from_mark=offset(4)) == [LINES[6], LINES[7]]
+    assert grep_log_for_errors(log, from_mark=offset(12)) == []
+
+
+def test_find_log_backtraces(log):
+    assert find_log_backtraces(log) == ["".join(LINES[8:11])]
+    assert find_log_backtraces(log, from_mark=offset(9)) == []
+
+
+def test_find_log_backtraces_at_eof(tmp_path):
+    log = tmp_path / "scylla.log"
+    log.write_text("ERROR 2025-01-01 12:00:00,000 [shard 0:main] init - failed\nBacktrace:\n  0x1234\n  0x5678")
+    assert find_log_backtraces(log) == ["Backtrace:\n  0x1234\n  0x5678"]
+    log.write_text("Backtrace:")
+    assert find_log_backtraces(log) == ["Backtrace:"]
+
+
+def test_empty_log(tmp_path):
+    log = tmp_path / "scylla.log"
+    log.touch()
+    assert search_log(log, [re.compile("ERROR")]) == []
+    assert grep_log_for_errors(log) == []
+    assert find_log_backtraces(log) == []
+
+
+@pytest.mark.skipif(not zstd_available(), reason="zstd is not installed")
+def test_compressed_log(log, monkeypatch):
+    monkeypatch.setattr(compressed_artifacts, "FRAME_SIZE", 100)
+    compress_file(log)
+    assert not log.exists()
+    assert found(search_log(log, [re.compile("ошибка")], from_mark=offset(4))) == [
+        (offset(6), LINES[6], "ошибка"),
+        (offset(7), LINES[7], "ошибка"),
+    ]
+    assert grep_log_for_errors(log, from_mark=offset(4)) == [LINES[6:11]]
+    assert find_log_backtraces(log) == ["".join(LINES[8:11])]
@@ -0,0 +1,127 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import json
+from datetime import datetime
+
+import pytest
+
+from test.pylib import compressed_artifacts, log_index
+from test.pylib.compressed_artifacts import compress_file, zstd_available
+from test.pylib.log_index import LogIndex
+
+LOG = [
+    "Scylla version 2025.1 starting ...\n",
+    "INFO  2025-01-01 12:00:00,100 [shard 0:main] init - starting\n",
+    "INFO  2025-01-01 12:00:00,900 [shard 1:main] raft - group0 started\n",
+    "WARN  2025-01-01 12:00:01,500 [shard 0:strm] raft_topology - slow\n",
+    "ERROR 2025-01-01 12:00:02,000 [shard 1:main] storage_service - failed\nBacktrace:\n  0x1\n",
+    "INFO  2025-01-01 12:00:03,000 [shard 0:main] init - serving\n",
+]
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_index, "BLOCK_SIZE", 100)
+    path = tmp_path / "scylla.log"
+    path.write_text("".join(LOG))
+    return path
+
+
+def index_entries(log):
+    lines = log.with_name(log.name + ".index").read_text().splitlines()
+    return json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+
+
+def test_index_build(log):
+    index = LogIndex(log)
+    index.update()
+    header, blocks = index_entries(log)
+    assert header["version"] == log_index.INDEX_VERSION and header["inode"] == log.stat().st_ino
+    # Blocks cover the log up to the last record, which may be continued yet.
+    assert len(blocks) > 1
+    assert blocks[0]["offset"] == 0 and blocks[-1]["end"] == log.read_text().rindex("INFO  2025-01-01 12:00:03")
+    assert all(a["end"] == b["offset"] for a, b in zip(blocks, blocks[1:]))
+    assert blocks[0]["first"] == "2025-01-01 12:00:00,100"
+    assert set().union(*(block["levels"] for block in blocks)) == {"INFO", "WARN", "ERROR"}
+    assert set().union(*(block["shards"] for block in blocks)) == {0, 1}
+
+    # Updates index only the appended records.
+    with log.open("a") as f:
+        f.write("INFO  2025-01-01 12:00:04,000 [shard 0:main] init - done\n")
+    index.update()
+    _, updated = index_entries(log)
+    assert updated[:len(blocks)] == blocks
+    assert updated[-1]["last"] == "2025-01-01 12:00:03,000"
+
+    # Another instance (e.g., another process) loads the index instead of building it.
+    other = LogIndex(log)
+    other.update()
+    assert other.blocks == index.blocks
+    assert index_entries(log)[1] == updated
+
+
+def test_index_invalidation(log):
+    index = LogIndex(log)
+    index.update()
+    assert index.blocks
+
+    # The log is truncated and rewritten.
+    log.write_text(LOG[1] + LOG[5])
+    index.update()
+    assert index.indexed_end == len(LOG[1])
+    assert [block["end"] for block in index_entries(log)[1]] == [len(LOG[1])]
+
+    # The log is replaced by another file.
+    replacement = log.with_name("new.log")
+    replacement.write_text("".join(LOG))
+    replacement.rename(log)
+    assert LogIndex(log).query(levels=["ERROR"])[0].logger == "storage_service"
+    assert index_entries(log)[0]["inode"] == log.stat().st_ino
+
+
+def test_query(log):
+    index = LogIndex(log)
+
+    def loggers(**kwargs):
+        return [record.logger for record in index.query(**kwargs)]
+
+    assert loggers() == ["init", "raft", "raft_topology", "storage_service", "init"]
+    assert loggers(levels=["WARN", "ERROR"]) == ["raft_topology", "storage_service"]
+    assert loggers(loggers=["init"], shards=[0]) == ["init", "init"]
+    assert loggers(shards=[1]) == ["raft", "storage_service"]
+    assert loggers(since="2025-01-01 12:00:01,500", until=datetime(2025, 1, 1, 12, 0, 2)) == [
+        "raft_topology", "storage_service"]
+    # A timestamp without milliseconds covers the whole second.
+    assert loggers(until="2025-01-01 12:00:00") == ["init", "raft"]
+    assert loggers(since="2025-01-01 12:00:01", until="2025-01-01 12:00:02") == ["raft_topology", "storage_service"]
+    assert loggers(pattern="Backtrace") == ["storage_service"]
+    assert loggers(from_mark=len("".join(LOG[:4]))) == ["storage_service", "init"]
+
+    error, = index.query(levels=["ERROR"])
+    assert error.text == LOG[4] and error.shard == 1 and error.timestamp == "2025-01-01 12:00:02,000"
+    assert error.offset == len("".join(LOG[:4]))
+
+
+@pytest.mark.skipif(not zstd_available(), reason="zstd is not installed")
+def test_query_compressed(log, monkeypatch):
+    monkeypatch.setattr(compressed_artifacts, "FRAME_SIZE", 100)
+    LogIndex(log).update()
+    blocks = index_entries(log)[1]
+    compress_file(log)
+
+    index = LogIndex(log)
+    assert [record.logger for record in index.query(levels=["WARN", "ERROR"])] == ["raft_topology", "storage_service"]
+    # The index of the original log is used.
+    assert [block.to_json() for block in index.blocks] == [json.dumps(block) for block in blocks]
+    error, = index.query(levels=["ERROR"], from_mark=len("".join(LOG[:4])))
+    assert error.text == LOG[4] and error.offset == len("".join(LOG[:4]))
+    assert [record.logger for record in index.query(since="2025-01-01 12:00:03")] == ["init"]
+
+    # Without the index of the original log, it's built from the compressed one.
+    log.with_name(log.name + ".index").unlink()
+    assert [record.logger for record in LogIndex(log).query(shards=[1])] == ["raft", "storage_service"]
+    assert index_entries(log)[0] == {"version": log_index.INDEX_VERSION}
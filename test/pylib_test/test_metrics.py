@@ -0,0 +1,53 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+from test.pylib.rest_client import ScyllaMetrics
+
+
+PAGE = """\
+# HELP scylla_transport_requests_served Counts a number of served requests.
+# TYPE scylla_transport_requests_served counter
+scylla_transport_requests_served{shard="0"} 10
+scylla_transport_requests_served{shard="1"} 12
+# TYPE scylla_transport_cql_errors_total counter
+scylla_transport_cql_errors_total{shard="0",type="protocol_error"} 1
+scylla_transport_cql_errors_total{shard="1",type="protocol_error"} 2
+scylla_transport_cql_errors_total{shard="1",type="unavailable"} 4
+scylla_transport_cql_errors_total_other{shard="0",type="unavailable"} 8
+scylla_storage_proxy_coordinator_reads{scheduling_group_name="sl:default",shard="0"} 3.5
+"""
+
+
+def test_get():
+    metrics = ScyllaMetrics(PAGE.split('\n'))
+    assert metrics.get('scylla_transport_requests_served') == 22
+    assert metrics.get('scylla_transport_requests_served', {'shard': 1}) == 12
+    assert metrics.get('scylla_transport_cql_errors_total', {'type': 'protocol_error'}) == 3
+    # The name is a prefix.
+    assert metrics.get('scylla_transport_cql_errors_total', {'type': 'unavailable'}) == 12
+    assert metrics.get('scylla_transport_cql_errors_total', {'shard': '1', 'type': 'unavailable'}) == 4
+    assert metrics.get('scylla_storage_proxy_coordinator_reads', {'scheduling_group_name': 'sl:default'}) == 3.5
+    assert metrics.get('scylla_transport_cql_errors_total', {'type': 'other'}) is None
+    assert metrics.get('scylla_no_such_metric') is None
+    assert metrics.lines_by_prefix('scylla_transport_requests_served') == PAGE.split('\n')[2:4]
+
+
+def test_group_by():
+    metrics = ScyllaMetrics(PAGE.split('\n'))
+    assert metrics.group_by('scylla_transport_cql_errors_total', ['shard']) == {('0',): 9, ('1',): 6}
+    assert metrics.group_by('scylla_transport_cql_errors_total', ['type'], {'shard': 1}) == \
+        {('protocol_error',): 2, ('unavailable',): 4}
+
+
+def test_diff():
+    before = ScyllaMetrics(PAGE.split('\n'))
+    after = ScyllaMetrics(PAGE.replace('{shard="1"} 12', '{shard="1"} 20').split('\n')
+                          + ['scylla_transport_requests_served{shard="2"} 5'])
+    delta = after - before
+    assert delta.get('scylla_transport_requests_served', {'shard': 0}) == 0
+    assert delta.get('scylla_transport_requests_served', {'shard': 1}) == 8
+    assert delta.get('scylla_transport_requests_served', {'shard': 2}) == 5
+    assert delta.get('scylla_transport_cql_errors_total') == 0
@@ -0,0 +1,127 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import json
+import math
+
+import pytest
+
+from test.perf.perf_runner import (HIGHER_IS_BETTER, LOWER_IS_BETTER, _ci_rank, _u_distribution, compare_samples,
+                                   mann_whitney_u, metric_direction, parse_results)
+
+# The --json-output document of seastar's perf_tests: results of every test case in its group.
+PERF_TESTS_OUTPUT = """
+{
+  "results": {
+    "combined": {
+      "one_row": {"runs": 5, "total_iterations": 1250000, "median": 412.5, "mad": 1.25, "min": 409.0,
+                  "max": 420.75, "allocs": 3.0, "tasks": 0.0, "inst": 2581.0, "cycles": 1402.5},
+      "many_rows": {"runs": 5, "total_iterations": 3200, "median": 152310.0, "mad": 310.0, "min": 151800.0,
+                    "max": 153950.0, "allocs": 1024.0, "tasks": 2.0, "inst": 913240.0, "cycles": 520311.0}
+    },
+    "memtable": {
+      "one_partition": {"runs": 5, "total_iterations": 980000, "median": 1021.0, "mad": 4.0, "min": 1012.0,
+                        "max": 1035.0, "allocs": 7.0, "tasks": 1.0, "inst": 6120.0, "cycles": 3390.0}
+    }
+  }
+}
+"""
+
+# The --json-result document of perf::write_json_result() (e.g., perf-simple-query).
+STATS_OUTPUT = """
+{
+  "parameters": {"concurrency": 100, "partitions": 10000, "cpus": 1, "duration_in_seconds": 5},
+  "stats": {"median tps": 183453.2, "allocs_per_op": 59.1, "logallocs_per_op": 0.0, "tasks_per_op": 8.3,
+            "instructions_per_op": 41320.5, "cpu_cycles_per_op": 21123.0, "mad tps": 812.4, "max tps": 185120.0,
+            "min tps": 180021.7},
+  "test_properties": {"type": "read"},
+  "versions": {"scylla-server": {"version": "2025.4.0~dev", "commit_id": "0123456789", "date": "20251001"}}
+}
+"""
+
+
+def test_parse_perf_tests_results():
+    metrics = parse_results(json.loads(PERF_TESTS_OUTPUT), "perf_tests")
+    assert metrics == {
+        f"{case}: {metric}": value
+        for case, values in [("combined.one_row", [412.5, 3.0, 0.0, 2581.0, 1402.5]),
+                             ("combined.many_rows", [152310.0, 1024.0, 2.0, 913240.0, 520311.0]),
+                             ("memtable.one_partition", [1021.0, 7.0, 1.0, 6120.0, 3390.0])]
+        for metric, value in zip(["median", "allocs", "tasks", "inst", "cycles"], values)
+    }
+    assert all(metric_direction("perf_tests", metric) == LOWER_IS_BETTER for metric in metrics)
+
+
+def test_parse_stats_results():
+    metrics = parse_results(json.loads(STATS_OUTPUT), "stats")
+    assert metrics == {"median tps": 183453.2, "allocs_per_op": 59.1, "logallocs_per_op": 0.0, "tasks_per_op": 8.3,
+                       "instructions_per_op": 41320.5, "cpu_cycles_per_op": 21123.0}
+    assert metric_direction("stats", "median tps") == HIGHER_IS_BETTER
+    assert metric_direction("stats", "allocs_per_op") == LOWER_IS_BETTER
+
+
+def test_u_distribution():
+    # The number of arrangements with U == u is the number of partitions of u into at most n parts of at most m.
+    assert [round(p * 252) for p in _u_distribution(5, 5)[:5]] == [1, 2, 4, 7, 12]
+    assert [round(p * 35) for p in _u_distribution(3, 4)[:4]] == [1, 2, 4, 7]
+    cdf = _u_distribution(4, 6)
+    assert len(cdf) == 25 and cdf[-1] == pytest.approx(1)
+    # The distribution is symmetric.
+    assert all(cdf[u] == pytest.approx(1 - cdf[24 - u - 1]) for u in range(24))
+
+
+def test_mann_whitney_u_exact():
+    # Fully separated samples: only 2 of the C(10, 5) = 252 arrangements are as extreme.
+    assert mann_whitney_u([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == (0, pytest.approx(2 / 252))
+    assert mann_whitney_u([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]) == (25, pytest.approx(2 / 252))
+    # U = 2 is the critical value of n = m = 5 at alpha = 0.05 (two-sided), U = 3 is not significant.
+    assert mann_whitney_u([1, 2, 3, 5, 6], [4, 7, 8, 9, 10]) == (2, pytest.approx(8 / 252))
+    assert mann_whitney_u([1, 2, 4, 5, 6], [3, 7, 8, 9, 10]) == (3, pytest.approx(14 / 252))
+    assert mann_whitney_u([1, 2, 3, 4], [5, 6, 7]) == (0, pytest.approx(2 / 35))
+    assert mann_whitney_u([1, 3, 5], [2, 4, 6]) == (3, pytest.approx(14 / 20))
+
+
+def test_mann_whitney_u_normal_approximation():
+    # Ties: average ranks and the tie correction of the variance.
+    u, p = mann_whitney_u([1, 2, 2, 3], [2, 3, 3, 4])
+    assert u == 3
+    assert p == pytest.approx(2 * (1 - 0.5 * math.erfc(-4.5 / math.sqrt(228 / 21) / math.sqrt(2))))
+    assert p == pytest.approx(0.17203, abs=1e-5)
+    # All values are the same.
+    assert mann_whitney_u([1, 1, 1], [1, 1, 1]) == (4.5, 1.0)
+    # Large samples.
+    u, p = mann_whitney_u(list(range(30)), list(range(100, 130)))
+    assert u == 0 and p < 1e-9
+    u, p = mann_whitney_u(list(range(0, 60, 2)), list(range(1, 61, 2)))
+    assert u == 435 and p > 0.5
+
+
+def test_ci_rank():
+    # The 3rd smallest and largest pairwise differences bound the 95% interval of n = m = 5.
+    assert _ci_rank(5, 5, 0.95) == 3
+    assert _ci_rank(5, 5, 0.99) == 1
+    # Too small to reach the confidence level.
+    assert _ci_rank(2, 2, 0.95) == 0
+    assert _ci_rank(30, 30, 0.95) == 317
+
+
+def test_compare_samples():
+    baseline = [100.0, 101.0, 102.0, 103.0, 104.0]
+    candidate = [110.0, 111.0, 112.0, 113.0, 114.0]
+    c = compare_samples("b", "median", LOWER_IS_BETTER, baseline, candidate, confidence=0.95)
+    assert c.p_value == pytest.approx(2 / 252)
+    assert c.change == pytest.approx(112 / 102 - 1)
+    assert (c.change_low, c.change_high) == (pytest.approx(110 / 103 - 1), pytest.approx(114 / 101 - 1))
+    assert c.regressed(alpha=0.05, threshold=0.05)
+    assert not c.regressed(alpha=0.05, threshold=0.1)
+    assert not c.regressed(alpha=0.001, threshold=0.05)
+    assert compare_samples("b", "median tps", HIGHER_IS_BETTER, baseline, candidate, 0.95).improved(0.05, 0.05)
+
+    # Non-positive values: differences relative to the baseline median.
+    c = compare_samples("b", "tasks", LOWER_IS_BETTER, [0.0, 1.0, 2.0], [2.0, 3.0, 4.0], confidence=0.95)
+    assert c.change == pytest.approx(2.0)
+    # Too few samples for the confidence level.
+    assert (c.change_low, c.change_high) == (-math.inf, math.inf)
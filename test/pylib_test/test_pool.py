@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import asyncio
+
+from test.pylib.pool import Pool
+
+
+class FakeBuilder:
+    """Builds numbered objects, a build waits for `ready` to be set."""
+
+    def __init__(self):
+        self.built = 0
+        self.destroyed = []
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self.fail = False
+
+    async def build(self) -> int:
+        await self.ready.wait()
+        if self.fail:
+            raise RuntimeError("build failed")
+        self.built += 1
+        return self.built
+
+    async def destroy(self, obj: int) -> None:
+        self.destroyed.append(obj)
+
+
+async def test_get_put_with_spares():
+    builder = FakeBuilder()
+    pool = Pool(3, builder.build, builder.destroy, spares=1)
+
+    first = await pool.get()
+    await pool.drain()
+    # A spare is built in background when an object is taken.
+    assert pool.pool == [2] and pool.total == 2
+
+    second = await pool.get()
+    assert second == 2
+    await pool.drain()
+    assert pool.pool == [3] and pool.total == 3
+
+    # max_size is reached, no more spares.
+    third = await pool.get()
+    await pool.drain()
+    assert third == 3 and pool.pool == [] and pool.total == 3
+
+    await pool.put(first, is_dirty=False)
+    await pool.put(second, is_dirty=True)
+    await pool.drain()
+    # The returned object is a spare already, so the space freed by the dirty one isn't used.
+    assert builder.destroyed == [2]
+    assert pool.pool == [1] and pool.total == 2
+    await pool.put(third, is_dirty=True)
+    await pool.drain()
+    assert pool.pool == [1] and pool.total == 1
+
+    # Once the spare is taken, a new one is built.
+    assert await pool.get() == 1
+    await pool.drain()
+    assert pool.pool == [4] and pool.total == 2
+
+
+async def test_replace_dirty_with_spares():
+    builder = FakeBuilder()
+    pool = Pool(2, builder.build, builder.destroy, spares=1)
+
+    obj = await pool.get()
+    await pool.drain()
+    assert pool.pool == [2]
+
+    # The spare is handed over at once, the dirty object is destroyed and a new spare is built in background.
+    builder.ready.clear()
+    new_obj = await pool.replace_dirty(obj)
+    assert new_obj == 2
+    builder.ready.set()
+    await pool.drain()
+    assert builder.destroyed == [1]
+    assert pool.pool == [3] and pool.total == 2
+
+
+async def test_get_waits_for_spare_being_built():
+    builder = FakeBuilder()
+    pool = Pool(2, builder.build, builder.destroy, spares=1)
+
+    obj = await pool.get()
+    builder.ready.clear()
+    await asyncio.sleep(0)
+    assert pool.building == 1
+
+    # The spare being built is preferred over building another object.
+    getter = asyncio.create_task(pool.get())
+    await asyncio.sleep(0.01)
+    assert not getter.done()
+    builder.ready.set()
+    assert await getter == 2
+    await pool.put(obj, is_dirty=False)
+    await pool.put(2, is_dirty=False)
+    assert builder.built == 2 and pool.total == 2
+
+
+async def test_drain_waits_for_build():
+    builder = FakeBuilder()
+    pool = Pool(2, builder.build, builder.destroy, spares=1)
+
+    builder.ready.clear()
+    getter = asyncio.create_task(pool.get())
+    await asyncio.sleep(0)
+    draining = asyncio.create_task(pool.drain())
+    await asyncio.sleep(0.01)
+    assert not draining.done()
+
+    builder.ready.set()
+    await draining
+    assert not pool.background and pool.building == 0
+    assert await getter in (1, 2)
+    assert len(pool.pool) == 1 and pool.total == 2
+
+
+async def test_failed_spare_build_frees_space():
+    builder = FakeBuilder()
+    pool = Pool(2, builder.build, builder.destroy, spares=1)
+
+    obj = await pool.get()
+    await pool.drain()
+    builder.fail = True
+    await pool.put(obj, is_dirty=True)
+    await pool.drain()
+    # The failure is logged, and the space of the object which failed to build is free.
+    assert pool.pool == [2] and pool.total == 1 and pool.building == 0
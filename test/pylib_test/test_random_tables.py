@@ -0,0 +1,28 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+from test.pylib.random_tables import Column, FloatType, IntType, RandomTable, TextType, UUIDType
+
+
+def make_table():
+    return RandomTable(manager=None, keyspace="ks", columns=[
+        Column("pk", IntType), Column("c_01", TextType), Column("v_01", FloatType), Column("v_02", UUIDType)])
+
+
+def test_seq_rows():
+    # The rows are the values insert_seq() would insert, in the same order.
+    table = make_table()
+    assert list(table._seq_rows(5, batch_size=2)) == [tuple(c.val(seed) for c in table.columns) for seed in range(1, 6)]
+    assert list(table._seq_rows(1, batch_size=2)) == [tuple(c.val(6) for c in table.columns)]
+    assert table.next_seq() == 7
+
+
+def test_seq_rows_literals():
+    table = make_table()
+    assert list(table._seq_rows(2, batch_size=10, literals=True)) == [
+        ("1", "'1'", "1.0", "00000000-0000-0000-0000-000000000001"),
+        ("2", "'2'", "2.0", "00000000-0000-0000-0000-000000000002"),
+    ]
@@ -0,0 +1,109 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+import subprocess
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+from test.pylib import resource_gather
+from test.pylib.db.model import CgroupMetric
+from test.pylib.resource_gather import ProcessesMonitor, ResourceGatherOn, read_io_stat, read_pressure
+
+
+def test_processes_monitor() -> None:
+    pids = []
+    monitor = ProcessesMonitor(get_pids=lambda: pids)
+    monitor.sample()
+    assert monitor.usage() == {"memory_peak": 0, "user_sec": 0, "system_sec": 0, "usage_sec": 0}
+
+    # A process which appears after the first sample is accounted from its start.
+    process = subprocess.Popen([sys.executable, "-c", "import sys, time\n"
+                                                      "deadline = time.process_time() + 0.3\n"
+                                                      "while time.process_time() < deadline: pass\n"
+                                                      "sys.stdin.read()"],
+                               stdin=subprocess.PIPE)
+    try:
+        pids.append(process.pid)
+        while True:
+            monitor.sample()
+            if monitor.usage()["usage_sec"] >= 0.2:
+                break
+        usage = monitor.usage()
+        assert usage["memory_peak"] > 0
+        assert usage["usage_sec"] == usage["user_sec"] + usage["system_sec"]
+    finally:
+        process.communicate()
+
+    # Exited processes keep the usage of their last sample.
+    monitor.sample()
+    assert monitor.usage() == usage
+
+
+def test_read_pressure(tmp_path) -> None:
+    path = tmp_path / "io.pressure"
+    path.write_text("some avg10=1.50 avg60=0.25 avg300=0.00 total=12345\n"
+                    "full avg10=0.00 avg60=0.00 avg300=0.00 total=678\n")
+    assert read_pressure(path) == {
+        "some": {"avg10": 1.5, "avg60": 0.25, "avg300": 0.0, "total": 12345.0},
+        "full": {"avg10": 0.0, "avg60": 0.0, "avg300": 0.0, "total": 678.0},
+    }
+    # cpu.pressure has no "full" line on older kernels.
+    path.write_text("some avg10=0.00 avg60=0.00 avg300=0.00 total=1\n")
+    assert read_pressure(path) == {"some": {"avg10": 0.0, "avg60": 0.0, "avg300": 0.0, "total": 1.0}}
+    assert read_pressure(tmp_path / "missing") is None
+
+
+def test_read_io_stat(tmp_path) -> None:
+    path = tmp_path / "io.stat"
+    path.write_text("8:0 rbytes=1024 wbytes=4096 rios=1 wios=2 dbytes=0 dios=0\n"
+                    "259:0 rbytes=1 wbytes=2 rios=1 wios=1 dbytes=0 dios=0\n")
+    assert read_io_stat(path) == (1025, 4098)
+    path.write_text("")
+    assert read_io_stat(path) == (0, 0)
+    assert read_io_stat(tmp_path / "missing") is None
+
+
+def cgroup_sample(memory: int, **pressure: float) -> CgroupMetric:
+    sample = CgroupMetric(test_id=1, host_id="host", memory=memory, timestamp=datetime.now())
+    for resource, value in pressure.items():
+        setattr(sample, f"{resource}_pressure", value)
+    return sample
+
+
+def test_changed() -> None:
+    changed = ResourceGatherOn._changed
+    previous = cgroup_sample(1000, cpu=10.0)
+    assert changed(None, previous)
+    assert not changed(previous, cgroup_sample(1050, cpu=10.0))
+    assert changed(previous, cgroup_sample(1051, cpu=10.0))
+    assert changed(previous, cgroup_sample(949, cpu=10.0))
+    assert not changed(previous, cgroup_sample(1000, cpu=11.0))
+    assert changed(previous, cgroup_sample(1000, cpu=11.5))
+    # Pressure appears when the kernel starts reporting it.
+    assert changed(previous, cgroup_sample(1000, cpu=10.0, io=2.0))
+    # Samples of an empty cgroup without pressure files.
+    assert not changed(cgroup_sample(0), cgroup_sample(0))
+
+
+def test_run_process_samples_cgroup(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(resource_gather, "MIN_SAMPLE_INTERVAL", 0.01)
+    monkeypatch.setattr(resource_gather, "MAX_SAMPLE_INTERVAL", 0.01)
+    monkeypatch.setattr(resource_gather, "CGROUP_TESTS", tmp_path / "cgroup")
+    test = SimpleNamespace(id=1, mode="dev", shortname="test_sampling", success=True,
+                           suite=SimpleNamespace(log_dir=tmp_path / "dev", name="pylib_test"))
+    gather = ResourceGatherOn(test)
+    gather.make_cgroup()
+    (gather.cgroup_path / "memory.current").write_text("4096\n")
+    samples = []
+    monkeypatch.setattr(gather.sqlite_writer, "queue_row", lambda row, table: samples.append(row))
+
+    process = gather.run_process(args=[sys.executable, "-c", "import time; time.sleep(0.5)"], timeout=10,
+                                 output_file=tmp_path / "output.log")
+    assert process.returncode == 0
+    # Sampled while the process was running, not only once it was done.
+    assert len(samples) > 1
+    assert all(sample.memory == 4096 for sample in samples)
+    assert test.time_end - test.time_start >= 0.5
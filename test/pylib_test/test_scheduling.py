@@ -0,0 +1,118 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import os
+
+import pytest
+
+from test.pylib.scheduling import ResourceAdmission, ResourceEstimate, WorkUnit, parse_memory_size, plan_by_history
+from test.pylib.suite.python import get_server_memory
+
+
+def test_plan_by_history_longest_first():
+    units = [WorkUnit(index=0, duration=1), WorkUnit(index=1, duration=10), WorkUnit(index=2, duration=5)]
+    assert plan_by_history(units=units, workers=2, memory_budget=100) == [1, 2, 0]
+
+
+def test_plan_by_history_unknown_units_get_median():
+    units = [WorkUnit(index=0), WorkUnit(index=1, duration=10), WorkUnit(index=2, duration=2), WorkUnit(index=3, duration=5)]
+    assert plan_by_history(units=units, workers=1, memory_budget=100) == [1, 0, 3, 2]
+
+
+def test_plan_by_history_respects_memory_budget():
+    # Two memory-heavy units can't run together: the second one is postponed after the light ones
+    # which fit into the budget.
+    units = [
+        WorkUnit(index=0, duration=10, memory=60),
+        WorkUnit(index=1, duration=9, memory=60),
+        WorkUnit(index=2, duration=3, memory=10),
+        WorkUnit(index=3, duration=3, memory=10),
+    ]
+    assert plan_by_history(units=units, workers=2, memory_budget=100) == [0, 2, 3, 1]
+
+
+def test_plan_by_history_starts_unit_over_budget():
+    units = [WorkUnit(index=0, duration=1, memory=1000), WorkUnit(index=1, duration=1, memory=1000)]
+    assert plan_by_history(units=units, workers=2, memory_budget=100) == [0, 1]
+
+
+def test_resource_admission(tmp_path):
+    first = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    second = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    second.key = str(os.getppid())  # reservations are per process, pretend to be another worker
+
+    # The test which doesn't fit into the budget is admitted if nothing else is running.
+    assert first.try_acquire(name="huge", resources=ResourceEstimate(memory=1000, cpus=1))
+    assert not second.try_acquire(name="small", resources=ResourceEstimate(memory=1, cpus=1))
+    first.release()
+
+    assert first.try_acquire(name="first", resources=ResourceEstimate(memory=60, cpus=1))
+    assert not second.try_acquire(name="second", resources=ResourceEstimate(memory=60, cpus=1))
+    assert not second.try_acquire(name="second", resources=ResourceEstimate(memory=10, cpus=4))
+    assert second.try_acquire(name="second", resources=ResourceEstimate(memory=40, cpus=3))
+    first.release()
+    second.release()
+
+
+def test_resource_admission_reset(tmp_path):
+    stale = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    stale.key = str(os.getppid())  # a live process, as if a pid of a killed worker is reused
+    assert stale.try_acquire(name="stale", resources=ResourceEstimate(memory=100, cpus=4))
+
+    ResourceAdmission.reset(tmpdir=tmp_path)
+    ResourceAdmission.reset(tmpdir=tmp_path)  # no ledger is fine too
+    admission = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    assert admission.try_acquire(name="test", resources=ResourceEstimate(memory=100, cpus=4))
+    admission.release()
+
+
+def test_resource_admission_reserves_clusters(tmp_path):
+    first = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    second = ResourceAdmission(tmpdir=tmp_path, memory_budget=100, cpu_budget=4)
+    second.key = str(os.getppid())
+
+    # Clusters kept in the pool of the second worker.
+    second.reserve_cluster("a", memory=30)
+    second.reserve_cluster("b", memory=30)
+
+    # Nothing is running, so a test is admitted even though it doesn't fit together with the clusters.
+    assert first.try_acquire(name="first", resources=ResourceEstimate(memory=60, cpus=1))
+    # The test of the second worker uses its clusters, so it's accounted once: max(60, 30 + 30) + 60 > 100.
+    assert not second.try_acquire(name="second", resources=ResourceEstimate(memory=10, cpus=1))
+    first.release()
+
+    assert first.try_acquire(name="first", resources=ResourceEstimate(memory=40, cpus=1))
+    assert second.try_acquire(name="second", resources=ResourceEstimate(memory=60, cpus=1))
+    first.release()
+    second.release()
+    # The clusters of the second worker are reserved even when its test needs less memory.
+    assert second.try_acquire(name="second", resources=ResourceEstimate(memory=10, cpus=1))
+    assert not first.try_acquire(name="first", resources=ResourceEstimate(memory=50, cpus=1))
+
+    second.release_cluster("a")
+    assert first.try_acquire(name="first", resources=ResourceEstimate(memory=50, cpus=1))
+    first.release()
+    second.release()
+    second.release_cluster("b")
+    second.release_cluster("b")  # releasing twice is fine
+
+
+@pytest.mark.parametrize("size, expected", [
+    ("1000", 1000), ("512K", 512 * 1024), ("512M", 512 * 1024 ** 2), ("1G", 1024 ** 3), ("1.5g", 3 * 1024 ** 3 // 2),
+])
+def test_parse_memory_size(size, expected):
+    assert parse_memory_size(size) == expected
+
+
+@pytest.mark.parametrize("options, expected", [
+    ([], 0),
+    (["--smp", "2"], 0),
+    (["-m", "1G", "--smp", "2"], 1024 ** 3),
+    (["--memory", "512M"], 512 * 1024 ** 2),
+    (["--memory=2G"], 2 * 1024 ** 3),
+])
+def test_get_server_memory(options, expected):
+    assert get_server_memory(options) == expected
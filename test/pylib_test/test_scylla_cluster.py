@@ -0,0 +1,72 @@
+#
+# Copyright (C) 2025-present ScyllaDB
+#
+# SPDX-License-Identifier: LicenseRef-ScyllaDB-Source-Available-1.0
+#
+
+import asyncio
+import itertools
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from test.pylib.scylla_cluster import ScyllaCluster
+
+
+class FakeServer(SimpleNamespace):
+    def server_info(self):
+        return self
+
+
+@pytest.fixture
+def cluster():
+    """A cluster which records how servers are added and started instead of running them."""
+    cluster = ScyllaCluster(logger=logging.getLogger(__name__), host_registry=None, replicas=3,
+                            create_server=None)
+    cluster.added, cluster.started = [], []
+    server_ids = itertools.count(1)
+
+    async def add_server(replace_cfg=None, cmdline=None, config=None, version=None, property_file=None,
+                         start=True, seeds=None, server_encryption="none", expected_error=None):
+        server_id = next(server_ids)
+        server = FakeServer(server_id=server_id, ip_addr=f"127.0.0.{server_id}")
+        if not cluster.initial_seed and start:
+            cluster.initial_seed = server.ip_addr
+        cluster.added.append((server.ip_addr, start, seeds or cluster._seeds() or [server.ip_addr]))
+        await asyncio.sleep(0)  # the servers are added concurrently
+        (cluster.running if start else cluster.stopped)[server_id] = server
+        return server
+
+    async def server_start(server_id, seeds=None):
+        cluster.running[server_id] = cluster.stopped.pop(server_id)
+        cluster.started.append((cluster.running[server_id].ip_addr, seeds or cluster._seeds()))
+
+    cluster.add_server = add_server
+    cluster.server_start = server_start
+    return cluster
+
+
+async def test_add_servers_to_empty_cluster(cluster):
+    servers = await cluster.add_servers(3)
+    assert [server.ip_addr for server in servers] == ["127.0.0.1", "127.0.0.2", "127.0.0.3"]
+    # The servers are installed first, the first one starts the cluster and the rest join it.
+    assert cluster.added == [(ip, False, [ip]) for ip in ("127.0.0.1", "127.0.0.2", "127.0.0.3")]
+    assert cluster.started == [(ip, ["127.0.0.1"]) for ip in ("127.0.0.1", "127.0.0.2", "127.0.0.3")]
+    assert cluster.initial_seed == "127.0.0.1"
+    assert list(cluster.boot_timings) == ["install", "seed", "join"]
+
+
+async def test_add_servers_to_stopped_cluster(cluster):
+    await cluster.add_servers(2)
+    # E.g., the whole cluster is stopped by a test.
+    cluster.stopped.update(cluster.running)
+    cluster.running.clear()
+    cluster.added.clear()
+    cluster.started.clear()
+
+    await cluster.add_servers(2)
+    # The new servers join the existing cluster instead of starting another one.
+    assert cluster.added == [("127.0.0.3", True, ["127.0.0.1"]), ("127.0.0.4", True, ["127.0.0.1"])]
+    assert cluster.started == []
+    assert cluster.initial_seed == "127.0.0.1"
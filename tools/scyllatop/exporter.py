@@ -0,0 +1,65 @@
+import http.server
+import logging
+import threading
+import livedata
+import views.export
+
+
+class _ExportLoop:
+    def __init__(self, liveData, iterations):
+        self._iterations = iterations
+        self._liveData = liveData
+
+    def draw_screen(self):
+        if self._iterations is None:
+            return
+
+        self._iterations -= 1
+        if self._iterations == 0:
+            self._liveData.stop()
+
+
+def _handler(exportView):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = exportView.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug('exporter: {}'.format(format % args))
+
+    return Handler
+
+
+def exportJsonLines(metricPatterns, interval, metric_source, iterations, ttl=None):
+    exportView = views.export.JsonLines()
+    liveData = livedata.LiveData(metricPatterns, interval, metric_source, ttl)
+    liveData.addView(exportView)
+
+    loop = _ExportLoop(liveData, iterations)
+    liveData.go(loop)
+
+
+def exportPrometheus(metricPatterns, interval, metric_source, iterations, ttl=None, address='localhost', port=9181):
+    exportView = views.export.PrometheusText()
+    liveData = livedata.LiveData(metricPatterns, interval, metric_source, ttl)
+    liveData.addView(exportView)
+
+    server = http.server.ThreadingHTTPServer((address, port), _handler(exportView))
+    logging.info('exporting aggregated metrics on http://{}:{}/metrics'.format(address, port))
+    serverThread = threading.Thread(target=server.serve_forever)
+    serverThread.daemon = True
+    serverThread.start()
+    try:
+        loop = _ExportLoop(liveData, iterations)
+        liveData.go(loop)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -15,6 +15,7 @@ import views.simple
 import views.aggregate
 import userinput
 import dumptostdout
+import exporter
 import urwid
 
 
@@ -81,6 +82,10 @@ if __name__ == '__main__':
     parser.add_argument('-n', '--iterations', type=int, default=None, help="Exit after a given number of iterations. This is only relevant if output is redirected")
     parser.add_argument('-b', '--batch', action='store_true', help="batch mode - dump metrics to stdout instead of using an interactive user session")
     parser.add_argument('-t', '--ttl', type=int, default=60, help="Keep absent metrics for ttl seconds (default=60)")
+    parser.add_argument('-e', '--export', choices=['json', 'prometheus'], default=None,
+                        help="headless exporter mode - aggregate metrics over shards and emit them as JSON lines to stdout (json) or serve them in the Prometheus text format (prometheus)")
+    parser.add_argument('--export-address', default='localhost', help="address to serve aggregated metrics on in prometheus export mode, default: localhost")
+    parser.add_argument('--export-port', type=int, default=9181, help="port to serve aggregated metrics on in prometheus export mode, default: 9181")
     arguments = parser.parse_args()
     stream_log = logging.StreamHandler()
     stream_log.setLevel(logging.ERROR)
@@ -116,7 +121,12 @@ if __name__ == '__main__':
 
     logging.debug('arguments={} isatty={}'.format(arguments, sys.stdout.isatty()))
     try:
-        if not sys.stdout.isatty() or arguments.batch:
+        if arguments.export == 'json':
+            exporter.exportJsonLines(arguments.metricPattern, arguments.interval, metric_source, arguments.iterations, arguments.ttl)
+        elif arguments.export == 'prometheus':
+            exporter.exportPrometheus(arguments.metricPattern, arguments.interval, metric_source, arguments.iterations, arguments.ttl,
+                                      arguments.export_address, arguments.export_port)
+        elif not sys.stdout.isatty() or arguments.batch:
             dumptostdout.dumpToStdout(arguments.metricPattern, arguments.interval, metric_source, arguments.iterations, arguments.ttl)
         else:
             fancyUserInterface(arguments.metricPattern, arguments.interval, metric_source, arguments.ttl)
@@ -0,0 +1,136 @@
+import json
+import re
+import sys
+import time
+import threading
+import logging
+
+
+class Series(object):
+    _HEAD_PATTERN = re.compile(r'^([^-]+)-\d+/')
+    _SHARD_PATTERN = re.compile(r',?shard="\d+"')
+    _NAME_PATTERN = re.compile(r'^(?P<name>[^{]+)(\{(?P<labels>.*)\})?$')
+    _INVALID_NAME_CHARACTERS = re.compile('[^a-zA-Z0-9_:]')
+
+    def __init__(self, label, key):
+        self._label = label
+        self._key = key
+        self._values = []
+
+    @classmethod
+    def collapse(cls, name):
+        collapsed = cls._HEAD_PATTERN.sub(r'\1-*/', name)
+        collapsed = cls._SHARD_PATTERN.sub('', collapsed)
+        return collapsed.replace('{,', '{').replace('{}', '')
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def size(self):
+        return len(self._values)
+
+    def add(self, value):
+        try:
+            self._values.append(float(value))
+        except ValueError:
+            pass
+
+    def total(self):
+        return sum(self._values)
+
+    def mean(self):
+        if len(self._values) == 0:
+            return None
+        return self.total() / len(self._values)
+
+    def prometheusName(self):
+        match = self._NAME_PATTERN.match(self._label)
+        name = self._INVALID_NAME_CHARACTERS.sub('_', match.group('name'))
+        if self._key not in ('value', self._label):
+            name = '{}_{}'.format(name, self._INVALID_NAME_CHARACTERS.sub('_', self._key))
+        return name, match.group('labels')
+
+
+class Export(object):
+    def __init__(self):
+        self._previous = {}
+        self._previousTime = None
+        self._lock = threading.Lock()
+        self._snapshot = []
+
+    def update(self, liveData):
+        now = time.time()
+        series = self._aggregate(liveData.measurements)
+        snapshot = []
+        for (label, key), current in sorted(series.items()):
+            entry = {'series': label,
+                     'key': key,
+                     'size': current.size,
+                     'sum': current.total(),
+                     'avg': current.mean(),
+                     'rate': None}
+            previous = self._previous.get((label, key))
+            if previous is not None and now > self._previousTime:
+                entry['rate'] = (entry['sum'] - previous) / (now - self._previousTime)
+            snapshot.append((current, entry))
+        self._previous = {(entry['series'], entry['key']): entry['sum'] for _, entry in snapshot}
+        self._previousTime = now
+        logging.debug('export: {} measurements aggregated into {} series'.format(len(liveData.measurements), len(snapshot)))
+        with self._lock:
+            self._snapshot = snapshot
+        self.publish(now)
+
+    def _aggregate(self, measurements):
+        series = {}
+        for metric in measurements:
+            if metric.is_absent:
+                continue
+            label = Series.collapse(metric.symbol)
+            for key, value in metric.status.items():
+                key = Series.collapse(key)
+                if key == label:
+                    key = 'value'
+                series.setdefault((label, key), Series(label, key))
+                series[(label, key)].add(value)
+        return series
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._snapshot)
+
+    def publish(self, now):
+        pass
+
+
+class JsonLines(Export):
+    def __init__(self, stream=sys.stdout):
+        Export.__init__(self)
+        self._stream = stream
+
+    def publish(self, now):
+        for _, entry in self.snapshot():
+            line = dict(entry, time=now)
+            self._stream.write(json.dumps(line, sort_keys=True))
+            self._stream.write('\n')
+        self._stream.flush()
+
+
+class PrometheusText(Export):
+    def render(self):
+        lines = []
+        for series, entry in self.snapshot():
+            name, labels = series.prometheusName()
+            labels = '{},'.format(labels) if labels else ''
+            for aggregate in ['sum', 'avg', 'rate']:
+                if entry[aggregate] is None:
+                    continue
+                lines.append('{name}{{{labels}aggregate="{aggregate}"}} {value!r}'.format(
+                    name=name, labels=labels, aggregate=aggregate, value=entry[aggregate]))
+        lines.append('')
+        return '\n'.join(lines)